@@ -0,0 +1,547 @@
+"""
+analytics.py
+------------
+Cohort analytics for the admin reports (group by grade, PASS/FAIL partition).
+
+CohortAnalytics copies the overall marks and pass/fail flags of all students
+into arrays once, then answers every question with whole-array operations:
+  - grades of every student at once (one searchsorted over the grade cutoffs)
+  - grade histogram and per-grade membership
+  - PASS / FAIL partition
+  - mean, standard deviation and percentiles of the overall mark
+
+Grades come from the grade policy in force (grading.py), so changing the
+bands or the pass mark changes every report.
+
+NumPy is used when it is installed (imported when the first CohortAnalytics is
+made, so start-up does not pay for it). Without it the same results come from
+plain Python (bisect, sorted, statistics), so NumPy stays optional.
+
+CohortStats is the cheap alternative kept inside Database: running totals that
+are updated on every add/enrol/drop/remove (O(1) each), so grade counts, pass
+rate and mean are available without looking at every student again.
+
+SubjectStats is the per-subject report (students, marks and fail rate of each
+subject). It is counted when asked for; big cohorts are split into chunks that
+are counted in separate processes, and the partial counts are added up.
+
+RankingIndex is kept next to it: students sorted by overall, updated on the
+same events, so the ranking report, top-k / bottom-k, pages and mark ranges
+never sort the whole cohort.
+"""
+
+import bisect
+import json
+import math
+import statistics
+from collections import Counter
+
+import grading
+
+np = None       # NumPy if installed; imported by the first CohortAnalytics (grading.numpy_or_none)
+
+
+def grade_codes(marks, policy=None):
+    """Index into the policy's labels for every mark (default policy: 0=Z ... 4=HD)."""
+    return (policy or grading.policy()).codes(marks)
+
+
+def _as_list(values) -> list:
+    """NumPy array -> list of Python numbers (fast to index one by one)."""
+    return values.tolist() if np is not None and hasattr(values, "tolist") else values
+
+
+class CohortAnalytics:
+    """
+    Arrays (one entry per student, same order as Database.students):
+      names, ids  : lists of str (only needed for rendering)
+      overall     : float marks
+      status      : True = PASS
+      grade       : grade code per student (index into labels)
+    """
+
+    def __init__(self, names: list, ids: list, overall, status):
+        global np
+        np = grading.numpy_or_none()
+        self.names = names
+        self.ids = ids
+        self.policy = grading.policy()
+        self.labels = self.policy.labels
+        if np is not None:
+            self.overall = np.asarray(overall, dtype=float)
+            self.status = np.asarray(status, dtype=bool)
+        else:
+            self.overall = list(overall)
+            self.status = list(status)
+        self.grade = self.policy.codes(self.overall)
+
+    @staticmethod
+    def from_students(students: list) -> "CohortAnalytics":
+        return CohortAnalytics(
+            names=[s.name for s in students],
+            ids=[s.id for s in students],
+            overall=[s.overall for s in students],
+            status=[s.status for s in students],
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # -----------------------------
+    # statistics
+    # -----------------------------
+    def grade_histogram(self) -> dict:
+        """{"Z": n, "P": n, "C": n, "D": n, "HD": n}"""
+        if np is not None:
+            counts = np.bincount(self.grade, minlength=len(self.labels))
+        else:
+            counts = [0] * len(self.labels)
+            for g in self.grade:
+                counts[g] += 1
+        return {label: int(c) for label, c in zip(self.labels, counts)}
+
+    def members_by_grade(self) -> dict:
+        """{"Z": [row, ...], ...}: rows of each grade, lowest overall first."""
+        order = self.order_by_overall()
+        grade = self.grade
+        if np is not None:
+            return {label: order[grade[order] == code].tolist()
+                    for code, label in enumerate(self.labels)}
+        groups = {label: [] for label in self.labels}
+        for row in order:
+            groups[self.labels[grade[row]]].append(row)
+        return groups
+
+    def order_by_overall(self):
+        """Rows sorted by overall, lowest first (stable, like sorted())."""
+        if np is not None:
+            return np.argsort(self.overall, kind="stable")
+        return sorted(range(len(self.overall)), key=self.overall.__getitem__)
+
+    def partition(self) -> tuple[list, list]:
+        """(fail_rows, pass_rows), each in student order."""
+        if np is not None:
+            return np.flatnonzero(~self.status).tolist(), np.flatnonzero(self.status).tolist()
+        fails, passes = [], []
+        for row, ok in enumerate(self.status):
+            (passes if ok else fails).append(row)
+        return fails, passes
+
+    def pass_count(self) -> int:
+        if np is not None:
+            return int(np.count_nonzero(self.status))
+        return sum(self.status)
+
+    def mean_std(self) -> tuple[float, float]:
+        """Mean and (population) standard deviation of the overall marks."""
+        if len(self) == 0:
+            return 0.0, 0.0
+        if np is not None:
+            return float(self.overall.mean()), float(self.overall.std())
+        return statistics.fmean(self.overall), statistics.pstdev(self.overall)
+
+    def percentiles(self, qs=(25, 50, 75, 90)) -> dict:
+        """{q: overall mark at the q-th percentile} (linear interpolation)."""
+        if len(self) == 0:
+            return {q: 0.0 for q in qs}
+        if np is not None:
+            return {q: float(v) for q, v in zip(qs, np.percentile(self.overall, qs))}
+        data = sorted(self.overall)
+        out = {}
+        for q in qs:
+            pos = (len(data) - 1) * q / 100
+            lo = int(pos)
+            hi = min(lo + 1, len(data) - 1)
+            out[q] = data[lo] + (data[hi] - data[lo]) * (pos - lo)
+        return out
+
+    # -----------------------------
+    # plain data (for the HTTP API)
+    # -----------------------------
+    def rows_as_dicts(self, rows) -> list[dict]:
+        """[{"id", "name", "grade", "overall", "status"}] for the given rows."""
+        grade, overall, status = _as_list(self.grade), _as_list(self.overall), _as_list(self.status)
+        return [{"id": self.ids[r], "name": self.names[r], "grade": self.labels[grade[r]],
+                 "overall": overall[r], "status": "PASS" if status[r] else "FAIL"}
+                for r in _as_list(rows)]
+
+    # -----------------------------
+    # rendering (same text as the original show_students loops)
+    # -----------------------------
+    def _lines(self, rows) -> list[str]:
+        """'name : : id --> GRADE: g - MARK: m' for each row (arrays read as lists once)."""
+        labels = [self.labels[g] for g in _as_list(self.grade)]
+        overall = _as_list(self.overall)
+        names, ids = self.names, self.ids
+        return [f"{names[r]} : : {ids[r]} --> GRADE: {labels[r]} - MARK: {overall[r]}"
+                for r in _as_list(rows)]
+
+    def render_grade_groups(self) -> list[str]:
+        """show_students(2): every student by overall, lowest first, with the grade."""
+        order = _as_list(self.order_by_overall())
+        grade = _as_list(self.grade)
+        return [f"{self.labels[grade[r]]} --> [{line}]"
+                for r, line in zip(order, self._lines(order))]
+
+    def render_partition(self) -> list[str]:
+        """show_students(3): FAIL list then PASS list."""
+        fails, passes = self.partition()
+        return [f"FAIL --> {self._lines(fails)}",
+                f"PASS --> {self._lines(passes)}"]
+
+    def render_summary(self) -> list[str]:
+        """Short cohort summary printed under the admin g/p reports."""
+        mean, std = self.mean_std()
+        hist = self.grade_histogram()
+        pct = self.percentiles()
+        passed = self.pass_count()
+        failed = len(self) - passed
+        total = len(self) or 1
+        return [
+            "Grades: " + "  ".join(f"{g}={hist[g]}" for g in reversed(self.labels)),
+            f"PASS={passed} ({passed / total:.0%})  FAIL={failed} ({failed / total:.0%})",
+            f"Mean={mean:.2f}  Std={std:.2f}  " + "  ".join(f"P{q}={v:.2f}" for q, v in pct.items()),
+        ]
+
+
+# ---------------------------------------------------------------------
+# running totals (kept up to date by Database)
+# ---------------------------------------------------------------------
+def _percentile_from_counts(counts: Counter, total: int, q: float) -> float:
+    """q-th percentile (linear interpolation, like np.percentile) of a value -> count table."""
+    pos = (total - 1) * q / 100
+    lo = int(pos)
+    lo_value = hi_value = None
+    seen = 0
+    for value in sorted(counts):
+        seen += counts[value]
+        if lo_value is None and seen > lo:
+            lo_value = value
+        if seen > lo + 1 or seen == total:
+            hi_value = value
+            break
+    return lo_value + (hi_value - lo_value) * (pos - lo)
+
+
+class CohortStats:
+    """
+    Running totals over all students. Overall marks are counted in hundredths
+    (ints), so adding and taking away students never drifts.
+      count          : number of students
+      grades         : students per overall grade (labels of the policy in force when created)
+      passed         : students with status PASS
+      overall_sum    : sum of overall marks, in hundredths
+      overall_sq     : sum of squared overall marks, in hundredths^2 (for std)
+      overall_counts : overall mark (hundredths) -> students (for percentiles)
+      subject_marks  : subject mark -> number of enrolments with that mark
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.policy = grading.policy()
+        self.grades = dict.fromkeys(self.policy.labels, 0)
+        self.passed = 0
+        self.overall_sum = 0
+        self.overall_sq = 0
+        self.overall_counts: Counter = Counter()
+        self.subject_marks: Counter = Counter()
+
+    def _apply(self, overall: float, status: bool, marks, sign: int) -> None:
+        cents = round(overall * 100)
+        self.count += sign
+        self.grades[self.policy.grade(overall)] += sign
+        self.passed += sign if status else 0
+        self.overall_sum += sign * cents
+        self.overall_sq += sign * cents * cents
+        self.overall_counts[cents] += sign
+        if not self.overall_counts[cents]:
+            del self.overall_counts[cents]
+        for mark in marks:
+            self.subject_marks[mark] += sign
+            if not self.subject_marks[mark]:
+                del self.subject_marks[mark]
+
+    def add(self, overall: float, status: bool, marks) -> None:
+        """Count one student (overall, PASS flag, subject marks)."""
+        self._apply(overall, status, marks, 1)
+
+    def discard(self, overall: float, status: bool, marks) -> None:
+        """Take one student (as it was counted) back out."""
+        self._apply(overall, status, marks, -1)
+
+    def add_student(self, student) -> None:
+        self.add(student.overall, student.status, [sub.mark for sub in student.subjects])
+
+    def discard_student(self, student) -> None:
+        self.discard(student.overall, student.status, [sub.mark for sub in student.subjects])
+
+    def add_record(self, rec: dict) -> None:
+        """Count a raw storage record (no Student built)."""
+        self.add(float(rec.get("overall", 0)), bool(rec.get("status", False)),
+                 [int(sub["mark"]) for sub in rec.get("subjects", [])])
+
+    # -----------------------------
+    # results
+    # -----------------------------
+    def mean_std(self) -> tuple[float, float]:
+        """Mean and (population) standard deviation of the overall marks."""
+        if self.count == 0:
+            return 0.0, 0.0
+        n = self.count
+        variance = max(n * self.overall_sq - self.overall_sum ** 2, 0) / (n * n)
+        return self.overall_sum / n / 100, math.sqrt(variance) / 100
+
+    def percentiles(self, qs=(25, 50, 75, 90)) -> dict:
+        """{q: overall mark at the q-th percentile}, from the mark counts (no sort of students)."""
+        if self.count == 0:
+            return {q: 0.0 for q in qs}
+        return {q: _percentile_from_counts(self.overall_counts, self.count, q) / 100 for q in qs}
+
+    def as_dict(self) -> dict:
+        """Plain-data copy (what Database.stats() returns)."""
+        mean, _std = self.mean_std()
+        return {
+            "students": self.count,
+            "grades": dict(self.grades),
+            "pass": self.passed,
+            "fail": self.count - self.passed,
+            "overall_sum": self.overall_sum / 100,
+            "overall_mean": mean,
+            "enrolments": sum(self.subject_marks.values()),
+            "subject_marks": dict(sorted(self.subject_marks.items())),
+        }
+
+    def render_summary(self) -> list[str]:
+        """Same lines as CohortAnalytics.render_summary, from the running totals."""
+        mean, std = self.mean_std()
+        pct = self.percentiles()
+        passed = self.passed
+        failed = self.count - passed
+        total = self.count or 1
+        return [
+            "Grades: " + "  ".join(f"{g}={self.grades[g]}" for g in reversed(self.policy.labels)),
+            f"PASS={passed} ({passed / total:.0%})  FAIL={failed} ({failed / total:.0%})",
+            f"Mean={mean:.2f}  Std={std:.2f}  " + "  ".join(f"P{q}={v:.2f}" for q, v in pct.items()),
+        ]
+
+
+# ---------------------------------------------------------------------
+# per-subject report (counted on demand, in parallel for big cohorts)
+# ---------------------------------------------------------------------
+_SUBJECTS_KEY = '"subjects":'
+_decode_at = json.JSONDecoder().raw_decode
+
+
+def _count_subject_marks(chunk) -> Counter:
+    """
+    (subject id, mark) -> enrolments over one chunk of students. Each item is a
+    student's JSON text or a list of (subject id, mark) pairs. Only the
+    "subjects" list of the text is parsed (about half the time of the whole
+    record; a quote inside a JSON string is always escaped, so the key cannot
+    be matched inside a name). Module level so a process pool can run it.
+    """
+    pairs = []
+    for rec in chunk:
+        if rec.__class__ is str:
+            at = rec.find(_SUBJECTS_KEY)
+            if at < 0:
+                continue
+            at += len(_SUBJECTS_KEY)
+            while rec[at] == " ":
+                at += 1
+            pairs.extend((sub["id"], sub["mark"]) for sub in _decode_at(rec, at)[0])
+        else:
+            pairs.extend(rec)
+    return Counter(pairs)
+
+
+class SubjectStats:
+    """
+    Enrolments seen from the subject's side: (subject id, mark) -> enrolments.
+    Partial counts from several chunks are merged by adding them up, so the
+    work can be split over processes (count_chunks) and put back together.
+    """
+
+    def __init__(self, counts: Counter | None = None):
+        self.counts: Counter = counts if counts is not None else Counter()
+        self.policy = grading.policy()
+
+    def merge(self, other) -> None:
+        """Add another SubjectStats (or Counter of the same shape) into this one."""
+        self.counts.update(other.counts if isinstance(other, SubjectStats) else other)
+
+    @staticmethod
+    def count_chunks(chunks: list, workers: int = 1) -> "SubjectStats":
+        """Count every chunk (in a process pool when workers > 1) and merge the partial counts."""
+        stats = SubjectStats()
+        if workers > 1 and len(chunks) > 1:
+            from concurrent.futures import ProcessPoolExecutor     # loads multiprocessing: only when used
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+                for part in pool.map(_count_subject_marks, chunks):
+                    stats.merge(part)
+        else:
+            for chunk in chunks:
+                stats.merge(_count_subject_marks(chunk))
+        return stats
+
+    def rows(self) -> list[dict]:
+        """
+        One dict per subject, by subject id:
+        {"subject", "students", "mean", "min", "median", "max", "fail", "fail_rate", "grades"}
+        (fail = mark below the pass mark; grades = students per grade of the policy in force)
+        """
+        by_subject: dict[str, Counter] = {}
+        for (sub, mark), n in self.counts.items():
+            by_subject.setdefault(sub, Counter())[mark] += n
+        policy = self.policy
+        rows = []
+        for sub in sorted(by_subject):
+            marks = by_subject[sub]
+            students = sum(marks.values())
+            grades = dict.fromkeys(policy.labels, 0)
+            fail = 0
+            for mark, n in marks.items():
+                grades[policy.grade(mark)] += n
+                if not policy.passed(mark):
+                    fail += n
+            rows.append({
+                "subject": sub,
+                "students": students,
+                "mean": sum(mark * n for mark, n in marks.items()) / students,
+                "min": min(marks),
+                "median": _percentile_from_counts(marks, students, 50),
+                "max": max(marks),
+                "fail": fail,
+                "fail_rate": fail / students,
+                "grades": grades,
+            })
+        return rows
+
+    @staticmethod
+    def render_row(row: dict) -> str:
+        """One admin report line for a rows() entry."""
+        grades = "  ".join(f"{g}={n}" for g, n in reversed(row["grades"].items()))
+        return (f"Subject::{row['subject']} -- students = {row['students']} -- "
+                f"mean = {row['mean']:.2f}  min = {row['min']}  median = {row['median']:g}  "
+                f"max = {row['max']} -- fail = {row['fail']} ({row['fail_rate']:.0%}) -- {grades}")
+
+
+# ---------------------------------------------------------------------
+# ranking by overall (kept up to date by Database)
+# ---------------------------------------------------------------------
+def cents_range(low: float, high: float) -> tuple[int, int]:
+    """Overall marks low..high (both included) as hundredths: 59.498 -> up to 59.49, not 59.50."""
+    return math.ceil(round(low * 100, 6)), math.floor(round(high * 100, 6))
+
+
+class RankingIndex:
+    """
+    Students ordered by overall mark, as ONE sorted list of ints:
+        key = overall in hundredths * ID_SPAN + student id
+    so ties are ordered by id and a key never needs a tuple. add/discard are a
+    bisect plus a list insert/delete (a memmove, fast even at 1M students);
+    top/bottom/page/between only touch the rows they return.
+    Rows come back as (overall, "000123").
+    """
+    ID_SPAN = 1_000_000     # student ids are 000001..999999
+
+    def __init__(self):
+        self._keys: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _key(self, overall: float, student_id) -> int:
+        return round(overall * 100) * self.ID_SPAN + int(student_id)
+
+    def _row(self, key: int) -> tuple[float, str]:
+        cents, sid = divmod(key, self.ID_SPAN)
+        return cents / 100, f"{sid:06d}"
+
+    def add(self, overall: float, student_id) -> None:
+        bisect.insort(self._keys, self._key(overall, student_id))
+
+    def discard(self, overall: float, student_id) -> None:
+        """Take one student (with the overall it was added with) back out."""
+        key = self._key(overall, student_id)
+        i = bisect.bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    def copy(self) -> "RankingIndex":
+        """Independent copy (one list copy; Database copies on write while a snapshot uses it)."""
+        other = RankingIndex()
+        other._keys = self._keys.copy()
+        return other
+
+    def add_student(self, student) -> None:
+        self.add(student.overall, student._id)
+
+    def discard_student(self, student) -> None:
+        self.discard(student.overall, student._id)
+
+    def add_many(self, rows) -> None:
+        """Add many (overall, student id) rows with one sort (used to build the index)."""
+        self._keys.extend(self._key(overall, sid) for overall, sid in rows)
+        self._keys.sort()
+
+    # -----------------------------
+    # reading
+    # -----------------------------
+    def ascending(self, start: int = 0):
+        """Yield rows lowest overall first, from position 'start'."""
+        keys = self._keys
+        for i in range(start, len(keys)):
+            yield self._row(keys[i])
+
+    def descending(self, start: int = 0):
+        """Yield rows highest overall first, skipping the first 'start'."""
+        keys = self._keys
+        for i in range(len(keys) - 1 - start, -1, -1):
+            yield self._row(keys[i])
+
+    def bottom(self, k: int) -> list[tuple[float, str]]:
+        """The k lowest overall marks."""
+        return [self._row(key) for key in self._keys[:max(k, 0)]]
+
+    def top(self, k: int) -> list[tuple[float, str]]:
+        """The k highest overall marks, best first."""
+        k = max(k, 0)
+        return [self._row(key) for key in reversed(self._keys[len(self._keys) - k:])] if k else []
+
+    def page(self, number: int, size: int, descending: bool = False) -> list[tuple[float, str]]:
+        """Page 'number' (1 = first) of 'size' rows, lowest first (or highest first)."""
+        if number < 1 or size < 1:
+            return []
+        start = (number - 1) * size
+        if not descending:
+            return [self._row(key) for key in self._keys[start:start + size]]
+        end = len(self._keys) - start
+        return [self._row(key) for key in reversed(self._keys[max(end - size, 0):max(end, 0)])]
+
+    def page_count(self, size: int) -> int:
+        return -(-len(self._keys) // size) if size > 0 else 0
+
+    def between(self, low: float, high: float):
+        """Yield rows with low <= overall <= high, lowest first."""
+        start, end = self._range(low, high)
+        keys = self._keys
+        for i in range(start, end):
+            yield self._row(keys[i])
+
+    def ids_between(self, low: float, high: float) -> list[int]:
+        """Student ids (ints) with low <= overall <= high, lowest overall first."""
+        start, end = self._range(low, high)
+        span = self.ID_SPAN
+        return [key % span for key in self._keys[start:end]]
+
+    def count_between(self, low: float, high: float) -> int:
+        start, end = self._range(low, high)
+        return max(end - start, 0)
+
+    def _range(self, low: float, high: float) -> tuple[int, int]:
+        """Positions [start, end) of the keys with low <= overall <= high."""
+        low_cents, high_cents = cents_range(low, high)
+        keys = self._keys
+        return (bisect.bisect_left(keys, low_cents * self.ID_SPAN),
+                bisect.bisect_left(keys, (high_cents + 1) * self.ID_SPAN))
@@ -0,0 +1,435 @@
+"""
+api_server.py
+-------------
+HTTP/JSON API over controllers.py, using only the standard library (asyncio).
+
+Run:
+    python api_server.py                      # http://127.0.0.1:8080, admin endpoints off
+    python api_server.py --port 9000 --admin-key s3cret
+
+Endpoints (request and response bodies are JSON):
+  POST   /register             {"email", "password", "name"}  -> {"ok", "message"}
+  POST   /login                {"email", "password"}          -> {"ok", "token", "student"}
+  POST   /logout               (student token)
+  GET    /me/subjects          (student token)                -> {"ok", "subjects"}
+  POST   /me/enrol             (student token)                -> {"ok", "message"}
+  DELETE /me/subjects/<id>     (student token)                -> {"ok", "message"}
+  POST   /me/password          {"new_password"}               -> {"ok", "message"}
+  GET    /admin/students?mode=1|2|3                           -> {"ok", "students"}
+  GET    /admin/ranking?page=1&size=20&order=asc|desc         -> {"ok", "page", "pages", "size", "students"}
+  GET    /admin/search?name=&grade=&status=&min=&max=&subject=&limit=
+                                                              -> {"ok", "count", "students"}
+  GET    /admin/stats                                         -> {"ok", "stats"}
+  GET    /admin/subjects?subject=042                          -> {"ok", "subjects"}
+  DELETE /admin/students/<id>                                 -> {"ok", "message"}
+  POST   /admin/clear                                         -> {"ok", "message"}
+
+Student token: send "Authorization: Bearer <token>" (token comes from /login).
+A token ends after SESSION_IDLE seconds without a request; at most MAX_SESSIONS
+are kept (logging in past that ends the least recently used one).
+Admin endpoints need "X-Admin-Key: <key>", the key the server was started with
+(--admin-key or STUDENTS_ADMIN_KEY). Without a key they answer 403 to everybody.
+
+Design:
+- One event loop handles every connection (HTTP/1.1 keep-alive), so thousands
+  of open student sessions only cost a coroutine each.
+- controllers/Database are NOT thread-safe and saving touches the disk, so every
+  controllers call runs on ONE worker thread (run_in_executor). The event loop
+  never waits for the disk, and database calls never overlap.
+- The long admin reports (/admin/students, /admin/subjects) run on a second
+  thread: they only hold controllers.db_lock to take a snapshot, then build the
+  answer from it while the database thread carries on with enrolments.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import controllers
+
+MAX_BODY = 64 * 1024            # bytes
+MAX_HEADERS = 100
+KEEPALIVE_TIMEOUT = 30          # seconds a connection may stay idle
+SESSION_IDLE = 8 * 60 * 60      # seconds a login token lives without being used
+MAX_SESSIONS = 100_000          # tokens kept at most (least recently used dropped first)
+ADMIN_KEY_ENV = "STUDENTS_ADMIN_KEY"
+
+STATUS_TEXT = {200: "OK", 201: "Created", 400: "Bad Request", 401: "Unauthorized",
+               403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ApiServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080, admin_key: str | None = None):
+        self.host = host
+        self.port = port
+        self.admin_key = admin_key
+        # token -> [student id, last used (time.monotonic)], least recently used first
+        self.sessions: dict[str, list] = {}
+        self.db_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db")
+        # long admin reports read a snapshot on their own thread, so enrolments don't queue behind them
+        self.report_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="report")
+        self.server: asyncio.AbstractServer | None = None
+        self._open: dict[asyncio.Task, asyncio.StreamWriter] = {}     # live connections
+        # (method, regex) -> handler(request, *groups)
+        self.routes = [
+            ("POST", re.compile(r"/register"), self.register),
+            ("POST", re.compile(r"/login"), self.login),
+            ("POST", re.compile(r"/logout"), self.logout),
+            ("GET", re.compile(r"/me/subjects"), self.list_subjects),
+            ("POST", re.compile(r"/me/enrol"), self.enrol),
+            ("DELETE", re.compile(r"/me/subjects/(\w+)"), self.remove_subject),
+            ("POST", re.compile(r"/me/password"), self.change_password),
+            ("GET", re.compile(r"/admin/students"), self.list_students),
+            ("GET", re.compile(r"/admin/ranking"), self.ranking_page),
+            ("GET", re.compile(r"/admin/search"), self.find_students),
+            ("GET", re.compile(r"/admin/stats"), self.cohort_stats),
+            ("GET", re.compile(r"/admin/subjects"), self.subject_report),
+            ("DELETE", re.compile(r"/admin/students/(\w+)"), self.remove_student),
+            ("POST", re.compile(r"/admin/clear"), self.clear_all),
+        ]
+
+    # -----------------------------
+    # start / stop
+    # -----------------------------
+    async def start(self) -> None:
+        await self._db(controllers.open_database)      # read the data before the first request
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port,
+                                                 backlog=4096)
+        self.port = self.server.sockets[0].getsockname()[1]     # real port if 0 was given
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        print(f"Serving CLIUniApp API on http://{self.host}:{self.port}")
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self) -> None:
+        """Stop accepting, close idle keep-alive connections, wait for the DB thread."""
+        if self.server is not None:
+            self.server.close()
+        for writer in list(self._open.values()):
+            writer.close()      # the handler sees EOF and returns
+        await asyncio.gather(*self._open, return_exceptions=True)
+        if self.server is not None:
+            await self.server.wait_closed()
+        self.db_worker.shutdown(wait=True)
+        self.report_worker.shutdown(wait=True)
+
+    async def _db(self, fn, *args):
+        """Run a controllers call on the single database thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.db_worker, fn, *args)
+
+    async def _report(self, fn, *args):
+        """Run a snapshot report (controllers.students_report / subject_report) on the report thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.report_worker, fn, *args)
+
+    # -----------------------------
+    # HTTP plumbing
+    # -----------------------------
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._open[task] = writer
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), KEEPALIVE_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except HttpError as e:
+                    await self._send(writer, e.status, {"ok": False, "message": e.message}, False)
+                    break
+                if request is None:
+                    break
+                keep_alive = request["keep_alive"]
+                try:
+                    status, body = await self._dispatch(request)
+                except HttpError as e:
+                    status, body = e.status, {"ok": False, "message": e.message}
+                except Exception as e:      # never kill the server for one bad request
+                    status, body = 500, {"ok": False, "message": f"Server error: {e}"}
+                await self._send(writer, status, body, keep_alive)
+                if not keep_alive:
+                    break
+        finally:
+            self._open.pop(task, None)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    async def _readline(reader: asyncio.StreamReader) -> bytes:
+        try:
+            return await reader.readline()
+        except ValueError:      # longer than the stream buffer limit (64 KiB)
+            raise HttpError(400, "Request line or header too long")
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> dict | None:
+        line = await self._readline(reader)
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HttpError(400, "Malformed request line")
+
+        headers = {}
+        for _ in range(MAX_HEADERS):
+            raw = await self._readline(reader)
+            if raw in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = raw.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise HttpError(400, "Too many headers")
+
+        try:
+            length = int(headers.get("content-length", "0") or 0)
+        except ValueError:
+            raise HttpError(400, "Bad Content-Length")
+        if length < 0 or length > MAX_BODY:
+            raise HttpError(413, "Body too large")
+        body = await reader.readexactly(length) if length else b""
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        url = urlsplit(target)
+        return {"method": method.upper(), "path": url.path.rstrip("/") or "/",
+                "query": parse_qs(url.query), "headers": headers, "body": body,
+                "keep_alive": keep_alive}
+
+    async def _send(self, writer: asyncio.StreamWriter, status: int, body: dict, keep_alive: bool):
+        payload = json.dumps(body).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + payload)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def _dispatch(self, request: dict) -> tuple[int, dict]:
+        path_found = False
+        for method, pattern, handler in self.routes:
+            match = pattern.fullmatch(request["path"])
+            if match:
+                path_found = True
+                if method == request["method"]:
+                    return await handler(request, *match.groups())
+        if path_found:
+            raise HttpError(405, "Method not allowed")
+        raise HttpError(404, "No such endpoint")
+
+    # -----------------------------
+    # request helpers
+    # -----------------------------
+    @staticmethod
+    def _json(request: dict, *fields: str) -> list:
+        try:
+            data = json.loads(request["body"] or b"{}")
+        except ValueError:
+            raise HttpError(400, "Body must be JSON")
+        if not isinstance(data, dict):
+            raise HttpError(400, "Body must be a JSON object")
+        missing = [f for f in fields if not isinstance(data.get(f), str)]
+        if missing:
+            raise HttpError(400, f"Missing field(s): {', '.join(missing)}")
+        return [data[f] for f in fields]
+
+    def _student_id(self, request: dict) -> str:
+        auth = request["headers"].get("authorization", "")
+        token = auth[7:] if auth.startswith("Bearer ") else ""
+        session = self.sessions.pop(token, None)
+        now = time.monotonic()
+        if session is None or now - session[1] > SESSION_IDLE:
+            raise HttpError(401, "Login first (Authorization: Bearer <token>)")
+        session[1] = now
+        self.sessions[token] = session      # back at the end: most recently used
+        return session[0]
+
+    def _new_session(self, student_id: str) -> str:
+        """New login token; expired tokens (and the oldest ones past MAX_SESSIONS) are dropped."""
+        now = time.monotonic()
+        while self.sessions:
+            oldest = next(iter(self.sessions))
+            if len(self.sessions) < MAX_SESSIONS and now - self.sessions[oldest][1] <= SESSION_IDLE:
+                break
+            del self.sessions[oldest]
+        token = secrets.token_urlsafe(24)
+        self.sessions[token] = [student_id, now]
+        return token
+
+    def _check_admin(self, request: dict) -> None:
+        if not self.admin_key:
+            raise HttpError(403, "Admin endpoints are off: start the server with --admin-key")
+        sent = request["headers"].get("x-admin-key", "").encode("latin-1")     # the bytes as received
+        if not secrets.compare_digest(sent, self.admin_key.encode("utf-8")):
+            raise HttpError(403, "Admin key required")
+
+    # -----------------------------
+    # student endpoints
+    # -----------------------------
+    async def register(self, request):
+        email, password, name = self._json(request, "email", "password", "name")
+        msg = await self._db(controllers.register_student, email.strip(), password, name.strip())
+        ok = msg.startswith("Registration successful")
+        return (201 if ok else 400), {"ok": ok, "message": msg}
+
+    async def login(self, request):
+        email, password = self._json(request, "email", "password")
+
+        def _login():
+            stu = controllers.login(email.strip(), password)
+            if stu is None:
+                return None
+            data = stu.to_dict()
+            del data["password"]
+            return data
+
+        student = await self._db(_login)
+        if student is None:
+            raise HttpError(401, "Student doesn't exist or password is incorrect")
+        token = self._new_session(student["id"])
+        return 200, {"ok": True, "token": token, "student": student}
+
+    async def logout(self, request):
+        self._student_id(request)
+        self.sessions.pop(request["headers"]["authorization"][7:], None)
+        return 200, {"ok": True, "message": "Logged out."}
+
+    async def list_subjects(self, request):
+        subjects = await self._db(controllers.list_subjects, self._student_id(request))
+        return 200, {"ok": True, "subjects": subjects}
+
+    async def enrol(self, request):
+        msg = await self._db(controllers.enrol_subject, self._student_id(request))
+        return 200, {"ok": msg.startswith("Enrolling"), "message": msg}
+
+    async def remove_subject(self, request, subject_id):
+        student_id = self._student_id(request)
+        if not subject_id.isdigit():
+            raise HttpError(400, "Subject ID must be a number")
+        msg = await self._db(controllers.remove_subject, student_id, subject_id)
+        return 200, {"ok": msg.startswith("Dropping"), "message": msg}
+
+    async def change_password(self, request):
+        student_id = self._student_id(request)
+        (new_password,) = self._json(request, "new_password")
+        msg = await self._db(controllers.change_password, student_id, new_password)
+        ok = msg.startswith("Password updated")
+        return (200 if ok else 400), {"ok": ok, "message": msg}
+
+    # -----------------------------
+    # admin endpoints
+    # -----------------------------
+    async def list_students(self, request):
+        self._check_admin(request)
+        try:
+            mode = int(request["query"].get("mode", ["1"])[0])
+        except ValueError:
+            mode = 0
+        if mode not in (1, 2, 3):
+            raise HttpError(400, "mode must be 1, 2 or 3")
+        students = await self._report(controllers.students_report, mode)
+        return 200, {"ok": True, "students": students}
+
+    async def ranking_page(self, request):
+        self._check_admin(request)
+        query = request["query"]
+        try:
+            page = int(query.get("page", ["1"])[0])
+            size = int(query.get("size", ["20"])[0])
+        except ValueError:
+            page = size = 0
+        if page < 1 or not 1 <= size <= 1000:
+            raise HttpError(400, "page must be >= 1 and size 1..1000")
+        order = query.get("order", ["asc"])[0]
+        if order not in ("asc", "desc"):
+            raise HttpError(400, "order must be asc or desc")
+        result = await self._db(controllers.ranking_page, page, size, order == "desc")
+        return 200, {"ok": True, **result}
+
+    async def find_students(self, request):
+        self._check_admin(request)
+        query = {k: v[0] for k, v in request["query"].items()}
+        try:
+            marks = None
+            if "min" in query or "max" in query:
+                marks = (float(query.get("min", 0)), float(query.get("max", 100)))
+            limit = int(query.get("limit", 100))
+            if not 0 <= limit <= 1000:
+                raise ValueError("limit must be 0..1000")
+            result = await self._db(controllers.find_students, query.get("name"), query.get("grade"),
+                                    query.get("status"), marks, query.get("subject"), limit)
+        except ValueError as e:
+            raise HttpError(400, str(e))
+        return 200, {"ok": True, **result}
+
+    async def cohort_stats(self, request):
+        self._check_admin(request)
+        stats = await self._db(controllers.cohort_stats)
+        return 200, {"ok": True, "stats": stats}
+
+    async def subject_report(self, request):
+        self._check_admin(request)
+        subject = request["query"].get("subject", [None])[0]
+        if subject is not None and not subject.isdigit():
+            raise HttpError(400, "subject must be a number")
+        subjects = await self._report(controllers.subject_report, subject)
+        return 200, {"ok": True, "subjects": subjects}
+
+    async def remove_student(self, request, student_id):
+        self._check_admin(request)
+        if not student_id.isdigit():
+            raise HttpError(400, "Student ID must be a number")
+        msg = await self._db(controllers.remove_student, student_id)
+        if msg == "Removed.":
+            # end the removed student's sessions
+            sid = f"{int(student_id):06d}"
+            for token in [t for t, s in self.sessions.items() if s[0] == sid]:
+                del self.sessions[token]
+        return 200, {"ok": msg == "Removed.", "message": msg}
+
+    async def clear_all(self, request):
+        self._check_admin(request)
+        msg = await self._db(controllers.clear_all)
+        self.sessions.clear()
+        return 200, {"ok": True, "message": msg}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLIUniApp HTTP/JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--admin-key", default=os.environ.get(ADMIN_KEY_ENV),
+                        help=f"X-Admin-Key for the /admin endpoints (default: ${ADMIN_KEY_ENV}; "
+                             f"without one they are off)")
+    args = parser.parse_args()
+    server = ApiServer(args.host, args.port, args.admin_key)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("Server stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+bench_analytics.py
+------------------
+Admin report work for show_students(2) (group by grade) and show_students(3)
+(PASS/FAIL partition), without printing:
+
+  loops     : the original code (sorted() + check_func.get_grade per student,
+              string lists built in a Python loop)
+  analytics : analytics.CohortAnalytics (NumPy when installed)
+  running   : analytics.CohortStats, the totals Database keeps up to date
+              (stats row only; the one-off count is shown as "(build)")
+
+Run from the src folder:
+    python benchmarks/bench_analytics.py --sizes 10000 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import analytics  # noqa: E402
+import check_func  # noqa: E402
+import classes  # noqa: E402
+import grading  # noqa: E402
+from synthetic import generate_records  # noqa: E402
+
+
+def loops_group(students):
+    out = []
+    for s in sorted(students, key=lambda x: x.overall):
+        g = check_func.get_grade(s.overall)
+        out.append(f"{g} --> [{s.name} : : {s.id} --> GRADE: {g} - MARK: {s.overall}]")
+    return out
+
+
+def loops_partition(students):
+    fails, passes = [], []
+    for s in students:
+        g = check_func.get_grade(s.overall)
+        line = f"{s.name} : : {s.id} --> GRADE: {g} - MARK: {s.overall}"
+        (passes if s.status else fails).append(line)
+    return [f"FAIL --> {fails}", f"PASS --> {passes}"]
+
+
+def loops_stats(students):
+    """What an admin had to do by hand before: histogram + pass count + mean."""
+    hist = {}
+    passed = 0
+    total = 0.0
+    for s in students:
+        g = check_func.get_grade(s.overall)
+        hist[g] = hist.get(g, 0) + 1
+        passed += s.status
+        total += s.overall
+    return hist, passed, total / max(len(students), 1)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Admin report timings")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 999_999])
+    args = parser.parse_args()
+
+    print(f"NumPy: {'yes' if grading.numpy_or_none() is not None else 'no (pure Python fallback)'}")
+    print(f"{'students':>10} {'report':>10} {'loops s':>9} {'analytics s':>12} {'running s':>10}")
+    for n in args.sizes:
+        students = [classes.Student.from_dict(r) for r in generate_records(n)]
+        build = timed(analytics.CohortAnalytics.from_students, students)
+        a = analytics.CohortAnalytics.from_students(students)
+        totals = analytics.CohortStats()
+        count = timed(lambda: [totals.add_student(s) for s in students])
+        rows = [
+            ("group", timed(loops_group, students), timed(a.render_grade_groups)),
+            ("partition", timed(loops_partition, students), timed(a.render_partition)),
+            ("stats", timed(loops_stats, students),
+             timed(lambda: (a.grade_histogram(), a.pass_count(), a.mean_std(), a.percentiles()))),
+        ]
+        running = timed(lambda: (totals.as_dict(), totals.mean_std(), totals.percentiles()))
+        print(f"{n:>10} {'(build)':>10} {'':>9} {build:>12.3f} {count:>10.3f}")
+        for name, old, new in rows:
+            last = f"{running:>10.5f}" if name == "stats" else f"{'-':>10}"
+            print(f"{n:>10} {name:>10} {old:>9.3f} {new:>12.3f} {last}")
+
+
+if __name__ == "__main__":
+    main()
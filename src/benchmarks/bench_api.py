@@ -0,0 +1,101 @@
+"""
+bench_api.py
+------------
+Load test for api_server.py on localhost: N concurrent student sessions,
+each on its own keep-alive connection, doing
+
+    register -> login -> enrol x4 -> list subjects -> drop one subject
+
+then one admin report. The server runs in this process (temp data folder,
+journal mode like the real front ends).
+
+Run from the src folder:
+    python benchmarks/bench_api.py --clients 2000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.chdir(tempfile.mkdtemp())        # before controllers opens students.data
+
+import api_server  # noqa: E402
+from synthetic import _letters  # noqa: E402
+
+
+ADMIN_KEY = "bench-admin"
+
+
+async def call(reader, writer, method, path, body=None, token=None, admin_key=None):
+    payload = json.dumps(body).encode() if body is not None else b""
+    head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(payload)}\r\n"
+    if token:
+        head += f"Authorization: Bearer {token}\r\n"
+    if admin_key:
+        head += f"X-Admin-Key: {admin_key}\r\n"
+    writer.write(head.encode() + b"\r\n" + payload)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def session(port, i, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    email = f"load.user{_letters(i)}@university.com"
+
+    async def timed(*args, **kw):
+        start = time.perf_counter()
+        result = await call(reader, writer, *args, **kw)
+        latencies.append(time.perf_counter() - start)
+        return result
+
+    await timed("POST", "/register", {"email": email, "password": "Password123", "name": f"User {i}"})
+    _, login = await timed("POST", "/login", {"email": email, "password": "Password123"})
+    token = login["token"]
+    for _ in range(4):
+        await timed("POST", "/me/enrol", token=token)
+    _, subs = await timed("GET", "/me/subjects", token=token)
+    await timed("DELETE", f"/me/subjects/{subs['subjects'][0]['id']}", token=token)
+    writer.close()
+
+
+async def run(clients):
+    server = api_server.ApiServer(port=0, admin_key=ADMIN_KEY)
+    await server.start()
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(session(server.port, i, latencies) for i in range(clients)))
+    elapsed = time.perf_counter() - start
+    reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+    status, report = await call(reader, writer, "GET", "/admin/students?mode=3", admin_key=ADMIN_KEY)
+    writer.close()
+    await server.close()
+
+    latencies.sort()
+    pct = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000  # noqa: E731
+    print(f"{clients} concurrent sessions, {len(latencies)} requests in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:,.0f} req/s)")
+    print(f"latency ms: p50={pct(0.50):.1f} p95={pct(0.95):.1f} p99={pct(0.99):.1f}")
+    print(f"admin report: HTTP {status}, "
+          f"{len(report['students']['pass']) + len(report['students']['fail'])} students")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP API load test")
+    parser.add_argument("--clients", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(run(args.clients))
+
+
+if __name__ == "__main__":
+    main()
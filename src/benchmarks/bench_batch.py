@@ -0,0 +1,71 @@
+"""
+bench_batch.py
+--------------
+Enrolment throughput (operations/second): one Database.enrol() call per
+operation vs Database.enrol_many() with the whole batch, for each back end:
+
+  json     : students.data rewritten on every save
+  journal  : students.data + append-only journal
+  sqlite   : students.db
+
+Run from the src folder:
+    python benchmarks/bench_batch.py
+    python benchmarks/bench_batch.py --students 20000 --ops 2000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import classes  # noqa: E402
+import storage  # noqa: E402
+from synthetic import generate_records  # noqa: E402
+
+BACKENDS = {
+    "json": lambda folder: storage.JsonFileStorage(os.path.join(folder, "students.data")),
+    "journal": lambda folder: storage.JsonFileStorage(os.path.join(folder, "students.data"), journal=True),
+    "sqlite": lambda folder: storage.SqliteStorage(os.path.join(folder, "students.db")),
+}
+
+
+def fresh_db(backend: str, records: list) -> classes.Database:
+    store = BACKENDS[backend](tempfile.mkdtemp())
+    store.save_all(records)
+    return classes.Database(storage=store)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single vs batch enrolment throughput")
+    parser.add_argument("--students", type=int, default=5_000)
+    parser.add_argument("--ops", type=int, default=500)
+    args = parser.parse_args()
+
+    records = list(generate_records(args.students))
+    for rec in records:             # everyone starts with free subject slots
+        rec["subjects"], rec["overall"], rec["status"] = [], 0.0, False
+    rng = random.Random(7)
+    ops = [(rng.choice(records)["id"], 1) for _ in range(args.ops)]
+
+    print(f"{args.students} students, {args.ops} enrol operations")
+    print(f"{'backend':>8} {'single ops/s':>13} {'batch ops/s':>12} {'speed-up':>9}")
+    for backend in BACKENDS:
+        db = fresh_db(backend, records)
+        start = time.perf_counter()
+        for sid, _count in ops:
+            db.enrol(sid)
+        single = args.ops / (time.perf_counter() - start)
+
+        db = fresh_db(backend, records)
+        start = time.perf_counter()
+        db.enrol_many(ops)
+        batch = args.ops / (time.perf_counter() - start)
+        print(f"{backend:>8} {single:>13.0f} {batch:>12.0f} {batch / single:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
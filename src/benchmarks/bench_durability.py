@@ -0,0 +1,82 @@
+"""
+bench_durability.py
+-------------------
+Enrol/drop throughput of each durability mode on each back end:
+
+  immediate : every change written straight away (default)
+  group     : changes coalesced, written every Database.GROUP_OPS changes or
+              GROUP_MS milliseconds
+  exit      : changes written once, by flush() at the end (timed too)
+
+Back ends: JSON file without journal (every write is a full snapshot), JSON
+file with journal, SQLite.
+
+Run from the src folder:
+    python benchmarks/bench_durability.py --students 10000 --ops 2000
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import classes  # noqa: E402
+from storage import open_storage  # noqa: E402
+from synthetic import generate_records  # noqa: E402
+
+BACKENDS = (("json", "students.data", False), ("json+journal", "students.data", True),
+            ("sqlite", "students.db", False))
+MODES = ("immediate", "group", "exit")
+
+
+def run(location: str, journal: bool, mode: str, students: int, ops: int) -> float:
+    folder = tempfile.mkdtemp()
+    try:
+        path = os.path.join(folder, location)
+        setup = classes.Database(storage=open_storage(path, journal=journal))
+        setup.add_students_many(list(generate_records(students)))
+        setup.storage.close()
+
+        db = classes.Database(storage=open_storage(path, journal=journal), durability=mode)
+        ids = list(db._by_id)
+        rng = random.Random(1)
+        picks = [rng.choice(ids) for _ in range(ops)]
+        start = time.perf_counter()
+        for i, sid in enumerate(picks):
+            if i % 2:
+                stu = db.get_student(sid)
+                if stu.subjects:
+                    db.remove_subject(sid, stu.subjects[-1].id)
+                    continue
+            db.enrol(sid)
+        db.flush()
+        elapsed = time.perf_counter() - start
+        db.storage.close()
+        return ops / elapsed
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput per durability mode")
+    parser.add_argument("--students", type=int, default=10_000)
+    parser.add_argument("--ops", type=int, default=2_000)
+    args = parser.parse_args()
+
+    print(f"{args.students} students, {args.ops} enrol/drop operations "
+          f"(group = every {classes.Database.GROUP_OPS} ops / {classes.Database.GROUP_MS} ms)")
+    print(f"{'back end':>13} " + " ".join(f"{m + ' ops/s':>16}" for m in MODES))
+    for name, location, journal in BACKENDS:
+        ops = args.ops if journal or location.endswith(".db") else max(args.ops // 20, 10)
+        rates = [run(location, journal, mode, args.students, ops) for mode in MODES]
+        note = f"  ({ops} ops: every write is a full snapshot)" if ops != args.ops else ""
+        print(f"{name:>13} " + " ".join(f"{r:>16,.0f}" for r in rates) + note)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+bench_grading.py
+----------------
+Grading cost:
+
+  if/elif      : the original check_func.get_grade chain, one mark at a time
+  table        : GradePolicy.grade (lookup table for whole marks), one at a time
+  bulk         : GradePolicy.grades, a whole list of marks at once
+                 (NumPy searchsorted if installed, else bisect)
+  overall      : the same three on overall marks (floats: bisect instead of the table)
+
+and Database.regrade (new bands + pass mark, one full rewrite) per population.
+
+Run from the src folder:
+    python benchmarks/bench_grading.py --marks 1000000 --students 10000 100000
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import classes  # noqa: E402
+from grading import GradePolicy  # noqa: E402
+from storage import JsonFileStorage  # noqa: E402
+from synthetic import write_students_file  # noqa: E402
+
+
+def if_elif_grade(mark):
+    if mark >= 85:
+        return "HD"
+    elif mark >= 75:
+        return "D"
+    elif mark >= 65:
+        return "C"
+    elif mark >= 50:
+        return "P"
+    else:
+        return "Z"
+
+
+def ns_per_mark(fn, marks) -> float:
+    start = time.perf_counter()
+    fn(marks)
+    return (time.perf_counter() - start) / len(marks) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grade policy: per-mark vs table vs bulk grading")
+    parser.add_argument("--marks", type=int, default=1_000_000)
+    parser.add_argument("--students", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    policy = GradePolicy()
+    rng = random.Random(1)
+    whole = [rng.randint(25, 100) for _ in range(args.marks)]
+    overall = [round(rng.uniform(0, 100), 2) for _ in range(args.marks)]
+    print(f"{args.marks} marks, ns per mark")
+    print(f"{'marks':>8} {'if/elif':>8} {'table':>8} {'bulk':>8}")
+    for name, marks in (("whole", whole), ("overall", overall)):
+        old = ns_per_mark(lambda ms: [if_elif_grade(m) for m in ms], marks)
+        table = ns_per_mark(lambda ms: [policy.grade(m) for m in ms], marks)
+        bulk = ns_per_mark(policy.grades, marks)
+        print(f"{name:>8} {old:>8.0f} {table:>8.0f} {bulk:>8.0f}")
+
+    new_policy = GradePolicy(cutoffs=(40, 60, 70, 80), labels=("F", "P", "CR", "DN", "HD"), pass_mark=40)
+    print(f"\n{'students':>9} {'regrade s':>10} {'PASS/FAIL changed':>18}")
+    for n in args.students:
+        folder = tempfile.mkdtemp()
+        try:
+            path = os.path.join(folder, "students.data")
+            write_students_file(path, n)
+            db = classes.Database(storage=JsonFileStorage(path))
+            start = time.perf_counter()
+            changed = db.regrade(new_policy)
+            print(f"{n:>9} {time.perf_counter() - start:>10.2f} {changed:>18}")
+            db.regrade(GradePolicy())       # back to the default for the next size
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
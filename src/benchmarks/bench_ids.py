@@ -0,0 +1,115 @@
+"""
+bench_ids.py
+------------
+Cost of one new student id as the 000001..999999 space fills up:
+
+  guess     : the original code (random number, try again if taken)
+  allocator : id_allocator.IdAllocator (bitmap, then shuffled free list)
+  build     : making the allocator from the taken ids (bitmap + free list),
+              which a Database does on its first new id
+  per id    : allocator cost per id with the build spread over the --ids ids
+
+Then a Database of --db-students students (50% of the id space by default)
+while another process keeps registering: every new id comes after a reload.
+  kept    : the allocator is updated from what the reload changed
+  rebuilt : the allocator is thrown away by the reload (the old behaviour) and
+            built again for the next id
+
+Run from the src folder:
+    python benchmarks/bench_ids.py --fill 0.25 0.9 0.99 0.999
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import classes  # noqa: E402
+from id_allocator import IdAllocator  # noqa: E402
+from storage import JsonFileStorage  # noqa: E402
+from synthetic import write_students_file  # noqa: E402
+
+SPACE = 999_999
+
+
+def guess(taken: set) -> str:
+    while True:
+        new_id = f"{random.randint(1, SPACE):06d}"
+        if new_id not in taken:
+            return new_id
+
+
+def after_reloads(db, other, rounds: int, keep: bool) -> tuple[float, float]:
+    """(reload ms, first new id ms) per round, 'other' registering one student before each."""
+    reload_ms = id_ms = 0.0
+    for i in range(rounds):
+        other.add_student(f"other.{'kept' if keep else 'rebuilt'}{i}@university.com", "Helloworld123", "Other")
+        if not keep:
+            db._ids = None
+        start = time.perf_counter()
+        db.refresh()
+        reload_ms += time.perf_counter() - start
+        start = time.perf_counter()
+        sid = db._generate_unique_student_id()
+        id_ms += time.perf_counter() - start
+        db.release_student_ids([sid])
+    return reload_ms / rounds * 1000, id_ms / rounds * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="New student id cost by occupancy")
+    parser.add_argument("--fill", type=float, nargs="+", default=[0.25, 0.9, 0.99, 0.999])
+    parser.add_argument("--ids", type=int, default=500, help="ids to hand out per run")
+    parser.add_argument("--db-students", type=int, default=500_000)
+    parser.add_argument("--rounds", type=int, default=10, help="reloads per Database case")
+    args = parser.parse_args()
+
+    print(f"{'occupancy':>10} {'guess us/id':>12} {'allocator us/id':>16} {'build ms':>9} {'per id us':>10}")
+    for fill in args.fill:
+        used = random.sample(range(1, SPACE + 1), int(SPACE * fill))
+        taken = {f"{i:06d}" for i in used}
+
+        start = time.perf_counter()
+        allocator = IdAllocator()
+        for i in used:
+            allocator.mark_used(i)
+        allocator.allocate()        # builds the free list when the space is dense
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(args.ids):
+            taken.add(guess(taken))
+        old = (time.perf_counter() - start) / args.ids * 1e6
+
+        start = time.perf_counter()
+        for _ in range(args.ids):
+            allocator.allocate()
+        took = time.perf_counter() - start
+        print(f"{fill:>10.1%} {old:>12.2f} {took / args.ids * 1e6:>16.2f} {build * 1000:>9.0f} "
+              f"{(took + build) / args.ids * 1e6:>10.2f}")
+
+    folder = tempfile.mkdtemp()
+    try:
+        path = os.path.join(folder, "students.data")
+        write_students_file(path, args.db_students)
+        db = classes.Database(storage=JsonFileStorage(path, journal=True))
+        other = classes.Database(storage=JsonFileStorage(path, journal=True))
+        start = time.perf_counter()
+        db.release_student_ids([db._generate_unique_student_id()])
+        print(f"\n{args.db_students} students: first new id after start-up {(time.perf_counter() - start) * 1000:.0f} ms "
+              f"(builds the allocator)")
+        print(f"{'allocator':>10} {'reload ms':>10} {'next id ms':>11}")
+        for name, keep in (("kept", True), ("rebuilt", False)):
+            reload_ms, id_ms = after_reloads(db, other, args.rounds, keep)
+            print(f"{name:>10} {reload_ms:>10.0f} {id_ms:>11.3f}")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
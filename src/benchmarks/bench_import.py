@@ -0,0 +1,65 @@
+"""
+bench_import.py
+---------------
+Time 'python main.py import' / 'export' on a generated CSV or NDJSON file
+(in a temp folder, journal mode like the real CLI).
+
+Run from the src folder:
+    python benchmarks/bench_import.py --students 100000
+    python benchmarks/bench_import.py --students 999999 --format ndjson
+"""
+
+import argparse
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MAIN = os.path.join(HERE, "..", "main.py")
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from synthetic import generate_records  # noqa: E402
+
+
+def write_input(path: str, n: int, fmt: str) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(["email", "password", "name"])
+            for rec in generate_records(n):
+                writer.writerow([rec["email"], rec["password"], rec["name"]])
+        else:
+            for rec in generate_records(n):
+                f.write(json.dumps({"email": rec["email"], "password": rec["password"],
+                                    "name": rec["name"]}) + "\n")
+
+
+def run(folder: str, *args: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, MAIN, *args], cwd=folder, check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import/export timing")
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--format", choices=("csv", "ndjson"), default="csv")
+    parser.add_argument("--chunk", type=int, default=10_000)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp()
+    src = os.path.join(folder, f"input.{args.format}")
+    write_input(src, args.students, args.format)
+
+    took = run(folder, "import", src, "--chunk", str(args.chunk))
+    print(f"import: {args.students} rows in {took:.2f}s ({args.students / took:,.0f} rows/s)")
+    took = run(folder, "export", os.path.join(folder, f"out.{args.format}"))
+    print(f"export: {took:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+bench_load.py
+-------------
+Start-up time and peak memory of opening a Database on a large students.data.
+
+  eager  : the original loader (json.load the whole file, build every Student)
+  lazy   : Database() -> streaming parse, Students built only when accessed
+  binary : Database() on the same students converted to students.bin
+           (fixed-width mmap-ed records, storage.BinaryRecordStorage)
+
+Each measurement runs in a fresh Python process so peak RSS is not shared.
+
+Run from the src folder:
+    python benchmarks/bench_load.py
+    python benchmarks/bench_load.py --sizes 10000 100000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(HERE, "..")
+sys.path.insert(0, SRC)
+
+from migrate_storage import migrate  # noqa: E402
+from synthetic import write_students_file  # noqa: E402
+
+CHILD = r"""
+import json, resource, sys, time
+sys.path.insert(0, {src!r})
+import os
+mode = {mode!r}
+if mode == "binary":
+    os.environ["STUDENTS_DATA"] = "students.bin"
+import classes
+start = time.perf_counter()
+if mode == "eager":
+    with open("students.data", encoding="utf-8") as f:
+        students = [classes.Student.from_dict(d) for d in json.load(f)]
+    count = len(students)
+else:
+    db = classes.Database()
+    count = len(db._by_id)
+elapsed = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss     # KiB on Linux
+print(json.dumps({{"count": count, "seconds": elapsed, "peak_rss_mb": rss / 1024}}))
+"""
+
+
+def measure(mode: str, folder: str) -> dict:
+    out = subprocess.run([sys.executable, "-c", CHILD.format(src=SRC, mode=mode)],
+                         cwd=folder, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Database start-up time and peak RSS")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 999_999])
+    args = parser.parse_args()
+
+    print(f"{'students':>10} {'file MB':>8} {'mode':>7} {'seconds':>8} {'peak MB':>8}")
+    for n in args.sizes:
+        folder = tempfile.mkdtemp()
+        path = os.path.join(folder, "students.data")
+        write_students_file(path, n)
+        size_mb = os.path.getsize(path) / 1e6
+        migrate(path, os.path.join(folder, "students.bin"))
+        for mode in ("eager", "lazy", "binary"):
+            r = measure(mode, folder)
+            print(f"{n:>10} {size_mb:>8.1f} {mode:>7} {r['seconds']:>8.2f} {r['peak_rss_mb']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
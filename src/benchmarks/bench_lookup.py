@@ -0,0 +1,65 @@
+"""
+bench_lookup.py
+---------------
+Lookup latency of Database.get_student / get_student_by_email / check_db_email
+for growing numbers of students. With the dict indexes the time per lookup
+should stay flat from 1k to 1M students (999,999 is the largest
+student id, so that is the top size).
+
+Run from the src folder:
+    python benchmarks/bench_lookup.py
+    python benchmarks/bench_lookup.py --sizes 1000 10000 --lookups 50000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import classes  # noqa: E402
+
+
+def build_db(n):
+    """Fill an empty in-memory Database with n students (nothing written to disk)."""
+    db = classes.Database()
+    db.students = [
+        classes.Student(f"first{i}.last@university.com", "Password123", f"Student {i}",
+                        [], i + 1, 0.0, False)
+        for i in range(n)
+    ]
+    return db
+
+
+def time_per_call(fn, keys):
+    start = time.perf_counter()
+    for k in keys:
+        fn(k)
+    return (time.perf_counter() - start) / len(keys) * 1e9   # ns per call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 999_999])
+    parser.add_argument("--lookups", type=int, default=100_000)
+    args = parser.parse_args()
+
+    # run inside an empty temp folder so we never read the real students.data
+    os.chdir(tempfile.mkdtemp())
+    print(f"{'students':>10} {'by id (ns)':>12} {'by email (ns)':>14} {'email free (ns)':>16}")
+    for n in args.sizes:
+        db = build_db(n)
+        rng = random.Random(n)
+        picks = [rng.randrange(n) for _ in range(args.lookups)]
+        ids = [f"{i + 1:06d}" for i in picks]
+        emails = [f"first{i}.last@university.com" for i in picks]
+        print(f"{n:>10} {time_per_call(db.get_student, ids):>12.0f} "
+              f"{time_per_call(db.get_student_by_email, emails):>14.0f} "
+              f"{time_per_call(db.check_db_email, emails):>16.0f}")
+
+
+if __name__ == "__main__":
+    main()
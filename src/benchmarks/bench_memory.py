@@ -0,0 +1,97 @@
+"""
+bench_memory.py
+---------------
+Memory per student of the in-memory model:
+
+  before : the original dict-backed Student/Subject (copied below as Legacy*)
+  after  : classes.Student/Subject with __slots__, int ids, shared grade table
+           and interned email local parts
+
+Counted by walking every object reachable from the student list with
+sys.getsizeof (each object counted once, so shared/interned strings and the
+shared grade strings are only paid for once).
+
+Run from the src folder:
+    python benchmarks/bench_memory.py                 # 999,999 students
+    python benchmarks/bench_memory.py --sizes 10000 100000
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import check_func  # noqa: E402
+import classes  # noqa: E402
+from synthetic import generate_records  # noqa: E402
+
+
+class LegacySubject:
+    def __init__(self, subject_id, mark):
+        self.id = f"{int(subject_id):03d}"
+        self.mark = int(mark)
+        self.grade = check_func.get_grade(self.mark)
+
+
+class LegacyStudent:
+    def __init__(self, email, password, name, subjects, student_id, overall, status):
+        self.email = email
+        self.password = password
+        self.name = name
+        self.subjects = subjects
+        self.id = f"{int(student_id):06d}"
+        self.overall = float(overall)
+        self.status = bool(status)
+
+
+def build(student_cls, subject_cls, n):
+    return [
+        student_cls(r["email"], r["password"], r["name"],
+                    [subject_cls(s["id"], s["mark"]) for s in r["subjects"]],
+                    r["id"], r["overall"], r["status"])
+        for r in generate_records(n)
+    ]
+
+
+def deep_size(root) -> int:
+    """Total size of root and everything it references (each object once)."""
+    seen = set()
+    stack = [root]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+        elif hasattr(obj, "__dict__"):
+            stack.append(obj.__dict__)
+            stack.extend(obj.__dict__.values())
+        elif isinstance(obj, dict):
+            stack.extend(obj.values())
+        for slot in getattr(type(obj), "__slots__", ()):
+            stack.append(getattr(obj, slot))
+    return total
+
+
+def bytes_per_student(student_cls, subject_cls, n):
+    return deep_size(build(student_cls, subject_cls, n)) / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory per Student object")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[999_999])
+    args = parser.parse_args()
+
+    print(f"{'students':>10} {'before B/stu':>13} {'after B/stu':>12} {'saved':>6}")
+    for n in args.sizes:
+        before = bytes_per_student(LegacyStudent, LegacySubject, n)
+        after = bytes_per_student(classes.Student, classes.Subject, n)
+        print(f"{n:>10} {before:>13.0f} {after:>12.0f} {1 - after / before:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
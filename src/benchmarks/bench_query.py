@@ -0,0 +1,95 @@
+"""
+bench_query.py
+--------------
+Database.find() (secondary indexes + planner) against a linear scan over every
+student, for a few typical admin searches:
+
+  name       : name_prefix="sam w"
+  subject    : enrolled_in=subject 42
+  grade+pass : grade="HD", status="PASS"
+  range+name : mark_between=(60, 61), name_prefix="ana"
+  wide       : status="PASS", mark_between=(50, 100)   (most students match)
+
+'build s' is the one-off index build on the first find() after a load.
+
+Run from the src folder:
+    python benchmarks/bench_query.py --sizes 100000 999999
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import classes  # noqa: E402
+import grading  # noqa: E402
+from storage import JsonFileStorage  # noqa: E402
+from synthetic import write_students_file  # noqa: E402
+
+QUERIES = {
+    "name": {"name_prefix": "sam w"},
+    "subject": {"enrolled_in": 42},
+    "grade+pass": {"grade": "HD", "status": "PASS"},
+    "range+name": {"mark_between": (60, 61), "name_prefix": "ana"},
+    "wide": {"status": "PASS", "mark_between": (50, 100)},
+}
+
+
+def scan(db, name_prefix=None, grade=None, status=None, mark_between=None, enrolled_in=None):
+    """The way without indexes: look at every student."""
+    out = []
+    for s in db.students:
+        if name_prefix and " " + name_prefix not in " " + s.name.lower():
+            continue
+        if grade and grading.policy().grade(s.overall) != grade:
+            continue
+        if status and s.status != (status == "PASS"):
+            continue
+        if mark_between and not mark_between[0] <= s.overall <= mark_between[1]:
+            continue
+        if enrolled_in is not None and all(sub._id != enrolled_in for sub in s.subjects):
+            continue
+        out.append(s.id)
+    return out
+
+
+def best_ms(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indexed find() vs linear scan")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 999_999])
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        folder = tempfile.mkdtemp()
+        try:
+            path = os.path.join(folder, "students.data")
+            write_students_file(path, n)
+            db = classes.Database(storage=JsonFileStorage(path))
+            start = time.perf_counter()
+            db.search_index()
+            print(f"\n{n} students, build s: {time.perf_counter() - start:.1f}")
+            db.students         # every Student built once, so the scan times only the scan
+            print(f"{'query':>11} {'matches':>8} {'find ms':>9} {'scan ms':>9}")
+            for name, query in QUERIES.items():
+                found = db.find_ids(**query)
+                indexed = best_ms(lambda: db.find_ids(**query))
+                scanned = best_ms(lambda: scan(db, **query), 1)
+                print(f"{name:>11} {len(found):>8} {indexed:>9.2f} {scanned:>9.0f}")
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+bench_ranking.py
+----------------
+Ranking report (show_students(2)) and top-k, by cohort size:
+
+  sort        : the original way - build every Student, sorted() by overall
+  page        : first page of 20 from Database.students_page (ranking index built)
+  top10       : Database.top_students(10)
+  update      : one enrol() + remove_subject() with the index kept up to date
+                (JSON file with journal, so the write itself is small)
+  build       : first ranked call after a load (index counted from the records)
+
+Run from the src folder:
+    python benchmarks/bench_ranking.py --sizes 10000 100000
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import classes  # noqa: E402
+from storage import JsonFileStorage  # noqa: E402
+from synthetic import write_students_file  # noqa: E402
+
+
+def per_call_ms(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sorted ranking index vs sorting every time")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--ops", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'students':>9} {'build ms':>9} {'sort ms':>9} {'page ms':>9} {'top10 ms':>9} {'update ms':>10}")
+    for n in args.sizes:
+        folder = tempfile.mkdtemp()
+        try:
+            path = os.path.join(folder, "students.data")
+            write_students_file(path, n)
+            db = classes.Database(storage=JsonFileStorage(path, journal=True))
+            start = time.perf_counter()
+            db.ranking()
+            build = (time.perf_counter() - start) * 1000
+            sort = per_call_ms(lambda: sorted(db.students, key=lambda x: x.overall), 3)
+            page = per_call_ms(lambda: db.students_page(1, 20), args.ops)
+            top = per_call_ms(lambda: db.top_students(10), args.ops)
+
+            rng = random.Random(1)
+            ids = list(db._by_id)
+
+            def update():
+                sid = rng.choice(ids)
+                db.enrol(sid)
+                db.remove_subject(sid, db.get_student(sid).subjects[-1].id)
+            upd = per_call_ms(update, args.ops)
+            print(f"{n:>9} {build:>9.1f} {sort:>9.1f} {page:>9.3f} {top:>9.3f} {upd:>10.3f}")
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+bench_reports.py
+----------------
+Admin reports through Database.report_lines (what show_students and the
+paged g report print), on a loaded data file:
+
+  first       : rendered from scratch (cache empty)
+  again       : the same report with nothing changed (served from the cache)
+  after enrol : the same report after one enrolment (mode 1 - names / ids /
+                emails - is still cached; the others are rendered again)
+
+Run from the src folder:
+    python benchmarks/bench_reports.py --students 100000
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import classes  # noqa: E402
+from storage import JsonFileStorage  # noqa: E402
+from synthetic import write_students_file  # noqa: E402
+
+REPORTS = [
+    ("s  list (mode 1)", 1, None),
+    ("g  by grade (mode 2)", 2, None),
+    ("g  one page of 20", 2, 3),
+    ("p  PASS/FAIL (mode 3)", 3, None),
+]
+
+
+def ms(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cached admin report rendering")
+    parser.add_argument("--students", type=int, default=100_000)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp()
+    try:
+        path = os.path.join(folder, "students.data")
+        write_students_file(path, args.students)
+        db = classes.Database(storage=JsonFileStorage(path, journal=True))
+        ids = list(db._by_id)
+        db.report_lines(1)      # build every Student and the ranking first, so 'first' is only rendering
+        db.ranking()
+
+        print(f"{args.students} students, ms per report")
+        print(f"{'report':>22} {'first':>9} {'again':>9} {'after enrol':>12}")
+        for i, (name, mode, page) in enumerate(REPORTS):
+            db.clear_report_cache()
+            first = ms(lambda: db.report_lines(mode, page))
+            again = ms(lambda: db.report_lines(mode, page))
+            sid = ids[i]
+            if db.enrol(sid).startswith("Students are allowed"):
+                db.remove_subject(sid, db.get_student(sid).subjects[0].id)
+            after = ms(lambda: db.report_lines(mode, page))
+            print(f"{name:>22} {first:>9.1f} {again:>9.3f} {after:>12.1f}")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
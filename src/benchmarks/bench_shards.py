@@ -0,0 +1,80 @@
+"""
+bench_shards.py
+---------------
+Sharded JSON storage (storage.ShardedStorage) against the single students.data
+file, both without a journal (so every change is a rewrite):
+
+  write : ms per enrol() - the single file rewrites everything, a sharded
+          store rewrites only the shard of that student
+  load  : Database start-up, shards read one after another (workers=1) or
+          at the same time (thread pool / process pool)
+
+Run from the src folder:
+    python benchmarks/bench_shards.py --students 100000 --shards 1 4 16 64
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import classes  # noqa: E402
+from migrate_storage import migrate  # noqa: E402
+from storage import JsonFileStorage, ShardedStorage  # noqa: E402
+from synthetic import write_students_file  # noqa: E402
+
+
+def time_writes(storage, ops: int) -> float:
+    db = classes.Database(storage=storage)
+    ids = list(db._by_id)
+    rng = random.Random(1)
+    start = time.perf_counter()
+    for _ in range(ops):
+        sid = rng.choice(ids)
+        if db.enrol(sid).startswith("Students are allowed"):
+            db.remove_subject(sid, db.get_student(sid).subjects[0].id)
+    return (time.perf_counter() - start) / ops * 1000
+
+
+def time_load(make_storage) -> float:
+    start = time.perf_counter()
+    classes.Database(storage=make_storage())
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded vs single-file JSON storage")
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--shards", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--ops", type=int, default=20)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp()
+    try:
+        single = os.path.join(folder, "students.data")
+        write_students_file(single, args.students)
+        print(f"{args.students} students, {args.ops} enrolments each")
+        print(f"CPUs: {os.cpu_count()}")
+        print(f"{'layout':>12} {'ms/write':>9} {'load s (1 worker)':>18} {'threads':>8} {'processes':>10}")
+        print(f"{'single file':>12} {time_writes(JsonFileStorage(single), args.ops):>9.1f} "
+              f"{time_load(lambda: JsonFileStorage(single)):>18.2f} {'-':>8} {'-':>10}")
+        for count in args.shards:
+            path = os.path.join(folder, f"s{count}.shards")
+            ShardedStorage(path, shards=count)
+            migrate(single, path)
+            write = time_writes(ShardedStorage(path), args.ops)
+            serial = time_load(lambda: ShardedStorage(path, workers=1))
+            threaded = time_load(lambda: ShardedStorage(path, pool="thread"))
+            processes = time_load(lambda: ShardedStorage(path, workers=os.cpu_count(), pool="process"))
+            print(f"{f'{count} shards':>12} {write:>9.1f} {serial:>18.2f} {threaded:>8.2f} {processes:>10.2f}")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+bench_snapshots.py
+------------------
+A long admin report (every student by overall, as students_report(2) builds it)
+running in one thread while another thread enrols/drops as fast as it can,
+both through one lock as controllers.db_lock does:
+
+  lock     : the report holds the lock while it reads the live Database
+  snapshot : the report holds the lock only for Database.snapshot(), then
+             reads the snapshot with no lock (copy-on-write)
+
+Per case: writes per second, write latency (p50 / p99 / max ms: a write waits
+for the lock), and how many reports finished. Also the cost of snapshot()
+itself and of the first write after it (the one that copies the index).
+
+Run from the src folder:
+    python benchmarks/bench_snapshots.py --students 100000 --seconds 5
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import classes  # noqa: E402
+from storage import JsonFileStorage  # noqa: E402
+from synthetic import write_students_file  # noqa: E402
+
+
+def report_rows(students) -> int:
+    return len([(s.id, s.name, s.overall, s.status) for s in students])
+
+
+def run(db, ids, seconds: float, use_snapshot: bool) -> tuple[float, list[float], int]:
+    lock = threading.Lock()
+    stop = threading.Event()
+    reports = [0]
+
+    def reader():
+        while not stop.is_set():
+            if use_snapshot:
+                with lock:
+                    snap = db.snapshot()
+                report_rows(snap.by_overall())
+            else:
+                with lock:
+                    report_rows(db.iter_by_overall())
+            reports[0] += 1
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    rng = random.Random(1)
+    latencies = []
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        sid = rng.choice(ids)
+        t0 = time.perf_counter()
+        with lock:
+            if db.enrol(sid).startswith("Students are allowed"):
+                db.remove_subject(sid, db.get_student(sid).subjects[0].id)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    thread.join()
+    return len(latencies) / elapsed, latencies, reports[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reports on snapshots vs under the lock")
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp()
+    try:
+        path = os.path.join(folder, "students.data")
+        write_students_file(path, args.students)
+        db = classes.Database(storage=JsonFileStorage(path, journal=True))
+        ids = list(db._by_id)
+        db.ranking()
+
+        start = time.perf_counter()
+        db.snapshot()
+        took = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        db.enrol(ids[0])
+        first = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        db.enrol(ids[1])
+        next_write = (time.perf_counter() - start) * 1000
+        print(f"{args.students} students: snapshot() {took:.3f} ms, first write after it "
+              f"{first:.1f} ms (copies the index), next write {next_write:.1f} ms")
+
+        print(f"{'report':>9} {'writes/s':>9} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7} {'reports':>8}")
+        for name, use_snapshot in (("lock", False), ("snapshot", True)):
+            rate, lat, reports = run(db, ids, args.seconds, use_snapshot)
+            lat.sort()
+            print(f"{name:>9} {rate:>9.0f} {statistics.median(lat):>7.2f} "
+                  f"{lat[int(len(lat) * 0.99)]:>7.1f} {lat[-1]:>7.1f} {reports:>8}")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+bench_startup.py
+----------------
+Start-up cost with a big students.data, each in a fresh interpreter:
+
+  python -c pass          : the interpreter alone
+  import main             : `python -X importtime -c "import main"`, total and
+                            the modules that take longest themselves
+  import login_page       : the same for the GUI entry (if tkinter is installed)
+  first prompt            : `python main.py` until "University System:" is shown
+  open Database           : `classes.Database(journal=True)` - what importing
+                            main / controllers used to do before the first prompt
+
+Run from the src folder:
+    python benchmarks/bench_startup.py --students 300000
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, SRC)
+
+from synthetic import write_students_file  # noqa: E402
+
+
+def wall(args, cwd, env) -> float:
+    start = time.perf_counter()
+    subprocess.run(args, cwd=cwd, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def import_times(module: str, cwd, env) -> list[tuple[int, int, str]]:
+    """[(self us, cumulative us, module)] from -X importtime (None if the import failed)."""
+    done = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=cwd, env=env, capture_output=True, text=True)
+    if done.returncode != 0:
+        return None
+    rows = []
+    for line in done.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, total, name = line[len("import time:"):].split("|")
+        rows.append((int(own), int(total), name.strip()))
+    return rows
+
+
+def first_prompt(cwd, env) -> float:
+    """Seconds from starting 'python main.py' until its first menu prompt is printed."""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, os.path.join(SRC, "main.py")], cwd=cwd, env=env,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    seen = b""
+    while b"University System:" not in seen:
+        chunk = os.read(proc.stdout.fileno(), 4096)
+        if not chunk:
+            break
+        seen += chunk
+    took = time.perf_counter() - start
+    proc.communicate(b"X\n")
+    return took
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Start-up time of main.py / login_page.py")
+    parser.add_argument("--students", type=int, default=300_000)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp()
+    try:
+        write_students_file(os.path.join(folder, "students.data"), args.students)
+        env = dict(os.environ, PYTHONPATH=SRC, PYTHONDONTWRITEBYTECODE="1")
+        env.pop("STUDENTS_DATA", None)
+        print(f"{args.students} students in students.data "
+              f"({os.path.getsize(os.path.join(folder, 'students.data')) / 1e6:.0f} MB)")
+        print(f"  python -c pass        {wall([sys.executable, '-c', 'pass'], folder, env) * 1000:8.0f} ms")
+        for module in ("main", "login_page"):
+            rows = import_times(module, folder, env)
+            if rows is None:
+                print(f"  import {module:<15} (cannot be imported here)")
+                continue
+            total = next(t for _own, t, name in rows if name == module)
+            print(f"  import {module:<15}{total / 1000:8.0f} ms   slowest: "
+                  + ", ".join(f"{name} {own / 1000:.0f}" for own, _t, name in sorted(rows, reverse=True)[:args.top]))
+        print(f"  first prompt          {first_prompt(folder, env) * 1000:8.0f} ms")
+        opened = wall([sys.executable, "-c", "import classes; classes.Database(journal=True)"], folder, env)
+        print(f"  open Database         {opened * 1000:8.0f} ms")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+bench_subjects.py
+-----------------
+Per-subject report (Database.subject_report) on a loaded data file:
+
+  loop     : building every Student and counting its subjects in a loop
+  1 worker : subject_report() in this process (only the subject lists parsed)
+  N workers: the same, chunks counted in a process pool of N and merged
+
+The pool only pays off with more than one CPU; the CPU count is printed.
+
+Run from the src folder:
+    python benchmarks/bench_subjects.py --students 100000 300000 --workers 2 4
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import classes  # noqa: E402
+from storage import JsonFileStorage  # noqa: E402
+from synthetic import write_students_file  # noqa: E402
+
+
+def naive_report(db) -> int:
+    counts = Counter()
+    for s in db.students:
+        for sub in s.subjects:
+            counts[sub.id, sub.mark] += 1
+    return len(counts)
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-subject report, serial vs process pool")
+    parser.add_argument("--students", type=int, nargs="+", default=[100_000, 300_000])
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp()
+    try:
+        print(f"CPUs: {os.cpu_count()}  (seconds, data file already loaded)")
+        print(f"{'students':>9} {'loop':>9} {'1 worker':>9} "
+              + " ".join(f"{f'{n} workers':>10}" for n in args.workers))
+        for n in args.students:
+            path = os.path.join(folder, f"students{n}.data")
+            write_students_file(path, n)
+            db = classes.Database(storage=JsonFileStorage(path))
+            # the report leaves the raw records raw, so the same Database serves every run
+            serial = timed(lambda: db.subject_report(workers=1))
+            pooled = [timed(lambda: db.subject_report(workers=w)) for w in args.workers]
+            naive = timed(lambda: naive_report(db))        # last: builds every Student
+            print(f"{n:>9} {naive:>9.2f} {serial:>9.2f} " + " ".join(f"{t:>10.2f}" for t in pooled))
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+suite.py
+--------
+One run over every Database hot path, with results written as JSON so two runs
+(e.g. before/after a change) can be compared.
+
+For each population size a students.data file is generated (synthetic.py,
+seeded, 0-4 subjects per student) in a temp folder, then a fresh Python
+process times:
+
+  open            Database(journal=True)  (what the CLI/GUI do at start)
+  load_students   Database.load_students()  (every Student built)
+  save_students   full snapshot write
+  add_student     register a new student
+  enrol           one random subject for a random student
+  remove_subject  drop one subject of a random student
+  find_student    Database._find_student by id
+  login           controllers.login(email, password)
+  show_1/2/3      Database.show_students(mode) rendered from scratch (the report
+                  cache is cleared, untimed, before every call; output thrown away)
+  show_1/2/3_cached
+                  the same report again with nothing changed (a cache hit)
+
+Every case reports count, total seconds, ops/second, latency p50/p95/p99/max
+(ms) and the process's peak RSS after the case (MB; Unix only).
+
+Run from the src folder:
+    python benchmarks/suite.py --sizes 1000 10000 100000 --out results.json
+    python benchmarks/suite.py --sizes 1000 10000 100000 --baseline results.json
+A case counts as a regression when its median (p50) latency is more than
+--tolerance (default 25%) above the baseline and at least --min-ms slower (so
+timer noise on microsecond cases is ignored); the exit code is then 1.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(HERE, "..")
+sys.path.insert(0, SRC)
+
+from synthetic import _letters, generate_records, write_students_file  # noqa: E402
+
+try:
+    import resource
+except ImportError:     # Windows: no peak RSS
+    resource = None
+
+# -----------------------------
+# measuring
+# -----------------------------
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / (1024 if sys.platform == "darwin" else 1)     # bytes on macOS, KiB on Linux
+
+
+def summarise(latencies: list[float]) -> dict:
+    """count, seconds, ops/s and latency percentiles (ms) of one case."""
+    data = sorted(latencies)
+    total = sum(data)
+
+    def pct(q):
+        return data[min(len(data) - 1, int(q * len(data)))] * 1000
+
+    return {
+        "count": len(data),
+        "seconds": total,
+        "ops_per_sec": len(data) / total if total else None,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "max_ms": data[-1] * 1000,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def timed_calls(fn, args_list, before=None) -> dict:
+    """Time fn(*args) for every args; before() (if given) runs, untimed, ahead of each call."""
+    latencies = []
+    for args in args_list:
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        fn(*args)
+        latencies.append(time.perf_counter() - start)
+    return summarise(latencies)
+
+
+# -----------------------------
+# child process: one population size
+# -----------------------------
+def run_cases(n: int, ops: int, repeat: int, seed: int) -> dict:
+    """Runs inside a fresh process whose cwd holds the generated students.data."""
+    import classes
+    random.seed(seed)
+    rng = random.Random(seed)
+    results = {}
+
+    start = time.perf_counter()
+    db = classes.Database(journal=True)
+    results["open"] = summarise([time.perf_counter() - start])
+    results["load_students"] = timed_calls(db.load_students, [()] * repeat)
+    results["save_students"] = timed_calls(db.save_students, [()] * repeat)
+
+    ids = list(db._by_id)
+    picks = [(rng.choice(ids),) for _ in range(ops)]
+    results["add_student"] = timed_calls(
+        db.add_student,
+        [(f"bench.user{_letters(i)}@university.com", "Password123", f"Bench {i}") for i in range(ops)])
+    results["enrol"] = timed_calls(db.enrol, picks)
+
+    drops = []
+    for (sid,) in picks:
+        stu = db._find_student(sid)
+        if stu.subjects:
+            drops.append((sid, rng.choice(stu.subjects).id))
+    results["remove_subject"] = timed_calls(db.remove_subject, drops or [(ids[0], "000")])
+    results["find_student"] = timed_calls(db._find_student, [(rng.choice(ids),) for _ in range(ops * 10)])
+
+    import controllers
+    controllers.open_database()     # its own Database on the same file, opened before timing
+    users = [(rec["email"], rec["password"]) for rec in
+             rng.sample(list(generate_records(n, seed)), min(ops, n))]
+    results["login"] = timed_calls(controllers.login, users)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for mode in (1, 2, 3):
+            results[f"show_{mode}"] = timed_calls(db.show_students, [(mode,)] * repeat,
+                                                  before=db.clear_report_cache)
+            results[f"show_{mode}_cached"] = timed_calls(db.show_students, [(mode,)] * repeat)
+    return results
+
+
+def measure(n: int, ops: int, repeat: int, seed: int) -> dict:
+    folder = tempfile.mkdtemp()
+    write_students_file(os.path.join(folder, "students.data"), n, seed)
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", str(n),
+         "--ops", str(ops), "--repeat", str(repeat), "--seed", str(seed)],
+        cwd=folder, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+# -----------------------------
+# reporting / baseline
+# -----------------------------
+def print_results(results: dict) -> None:
+    print(f"{'students':>9} {'case':>15} {'ops/s':>11} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'peak MB':>8}")
+    for size, cases in results.items():
+        for name, r in cases.items():
+            ops = f"{r['ops_per_sec']:,.0f}" if r["ops_per_sec"] else "-"
+            rss = f"{r['peak_rss_mb']:.0f}" if r["peak_rss_mb"] is not None else "-"
+            print(f"{size:>9} {name:>15} {ops:>11} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} "
+                  f"{r['p99_ms']:>9.3f} {rss:>8}")
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_ms: float) -> list[str]:
+    """Print p50 ms against the baseline; return the regressed 'size/case' names."""
+    regressions = []
+    print(f"\n{'students':>9} {'case':>15} {'base p50':>10} {'now p50':>10} {'change':>8}")
+    for size, cases in results.items():
+        for name, r in cases.items():
+            base = baseline.get(size, {}).get(name)
+            if base is None:
+                continue
+            before, now = base["p50_ms"], r["p50_ms"]
+            change = (now - before) / before if before else 0.0
+            flag = ""
+            if change > tolerance and now - before >= min_ms:
+                flag = "  REGRESSION"
+                regressions.append(f"{size}/{name}")
+            print(f"{size:>9} {name:>15} {before:>10.4f} {now:>10.4f} {change:>+8.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Database benchmark suite (JSON results)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--ops", type=int, default=500, help="calls per single-student case")
+    parser.add_argument("--repeat", type=int, default=3, help="calls per whole-database case")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slow-down per case before it counts as a regression")
+    parser.add_argument("--min-ms", type=float, default=0.05,
+                        help="ignore slow-downs smaller than this many ms")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        print(json.dumps(run_cases(args.child, args.ops, args.repeat, args.seed)))
+        return
+
+    results = {}
+    for n in args.sizes:
+        print(f"... {n} students", file=sys.stderr)
+        results[str(n)] = measure(n, args.ops, args.repeat, args.seed)
+    print_results(results)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": args.seed, "ops": args.ops, "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance, args.min_ms)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
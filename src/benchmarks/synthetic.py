@@ -0,0 +1,72 @@
+"""
+synthetic.py
+------------
+Seeded generator of realistic student records, shared by the benchmarks.
+
+Records have the same shape as Student.to_dict(): unique firstname.lastname
+emails, passwords that pass check_func.check_password, 0-4 subjects with
+marks 25..100 and the matching overall/status.
+"""
+
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import check_func  # noqa: E402
+
+FIRST = ["alex", "sam", "chris", "nicha", "priya", "liam", "mia", "noah", "emma", "kai",
+         "zoe", "omar", "lena", "ivan", "sara", "tom", "yuki", "ana", "ben", "ruth"]
+LAST = ["smith", "nguyen", "brown", "wong", "patel", "kumar", "lee", "jones", "garcia", "khan",
+        "chen", "taylor", "silva", "martin", "ali", "walker", "young", "king", "scott", "hall"]
+SUBJECT_COUNTS = [0, 1, 2, 3, 4]
+SUBJECT_WEIGHTS = [10, 10, 20, 25, 35]      # most students take 3-4 subjects
+
+
+def _letters(i: int) -> str:
+    """0 -> 'a', 25 -> 'z', 26 -> 'ba' ... (emails only allow letters)."""
+    out = ""
+    while True:
+        out = chr(ord("a") + i % 26) + out
+        i //= 26
+        if i == 0:
+            return out
+
+
+def generate_records(n: int, seed: int = 42):
+    """Yield n student dicts with unique ids (1..n, shuffled) and emails."""
+    if n > 999_999:
+        raise ValueError("student ids only go up to 999999")
+    rng = random.Random(seed)
+    ids = rng.sample(range(1, 1_000_000), n)
+    for i, sid in enumerate(ids):
+        first = rng.choice(FIRST)
+        last = rng.choice(LAST) + _letters(i)
+        count = rng.choices(SUBJECT_COUNTS, SUBJECT_WEIGHTS)[0]
+        sub_ids = rng.sample(range(1, 1000), count)
+        subjects = []
+        for sub_id in sub_ids:
+            mark = rng.randint(25, 100)
+            subjects.append({"id": f"{sub_id:03d}", "mark": mark, "grade": check_func.get_grade(mark)})
+        overall = round(sum(s["mark"] for s in subjects) / count, 2) if count else 0.0
+        yield {
+            "email": f"{first}.{last}@university.com",
+            "password": "Password" + f"{rng.randint(0, 999_999):03d}",
+            "name": f"{first.title()} {last.title()}",
+            "subjects": subjects,
+            "id": f"{sid:06d}",
+            "overall": overall,
+            "status": bool(count) and overall >= 50,
+        }
+
+
+def write_students_file(path: str, n: int, seed: int = 42) -> None:
+    """Write a students.data JSON list of n students, one record at a time."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for i, rec in enumerate(generate_records(n, seed)):
+            f.write(",\n    " if i else "\n    ")
+            f.write(json.dumps(rec))
+        f.write("\n]")
@@ -0,0 +1,212 @@
+"""
+bulk.py
+-------
+Streaming bulk import / export of students (CSV or newline-delimited JSON).
+
+Used by the 'import' and 'export' commands of main.py:
+    python main.py import new_students.csv --rejects bad_rows.csv --chunk 10000
+    python main.py export all_students.ndjson
+
+Import:
+- rows are read one at a time and handed to the Database in chunks of
+  'chunk_size' (Database.add_students_many -> one storage write per chunk),
+  so memory stays bounded by the chunk, not the file
+- every row is checked with check_func.check_email / check_password; rows
+  that fail (or whose email/id is already used) go to the rejects file with
+  an 'error' column, in the same format as the input
+- columns/keys: email, password, name, and optionally id and subjects
+  (CSV subjects: "001:75;002:60", NDJSON: [{"id": "001", "mark": 75}, ...])
+
+Export writes every student in the same format, so an export can be
+imported again (e.g. into another back end).
+"""
+
+import csv
+import json
+import os
+
+import check_func
+
+CSV_FIELDS = ["id", "email", "password", "name", "overall", "status", "subjects"]
+FORMATS = ("csv", "ndjson")
+
+
+def guess_format(path: str) -> str:
+    """'csv' for *.csv, otherwise 'ndjson' (*.ndjson, *.jsonl, ...)."""
+    return "csv" if path.lower().endswith(".csv") else "ndjson"
+
+
+def default_rejects_path(path: str) -> str:
+    root, ext = os.path.splitext(path)
+    return f"{root}.rejects{ext}"
+
+
+# -----------------------------
+# row <> record
+# -----------------------------
+def _subjects_from_csv(text: str) -> list[dict]:
+    subjects = []
+    for part in filter(None, (text or "").split(";")):
+        sub_id, mark = part.split(":")
+        subjects.append({"id": sub_id.strip(), "mark": int(mark)})
+    return subjects
+
+
+def _subjects_to_csv(subjects: list[dict]) -> str:
+    return ";".join(f"{s['id']}:{s['mark']}" for s in subjects)
+
+
+def _validate(row: dict) -> tuple[dict | None, str | None]:
+    """Turn an input row into a record for add_students_many, or return an error."""
+    email = str(row.get("email") or "").strip()
+    password = str(row.get("password") or "")
+    name = str(row.get("name") or "").strip()
+    if not name:
+        return None, "missing name"
+    if not check_func.check_email(email):
+        return None, "invalid email format"
+    if not check_func.check_password(password):
+        return None, "invalid password format"
+
+    rec = {"email": email.lower(), "password": password, "name": name}
+    try:
+        if row.get("id"):
+            student_id = int(row["id"])
+            if not 1 <= student_id <= 999_999:
+                return None, "id must be 1..999999"
+            rec["id"] = f"{student_id:06d}"
+        subjects = row.get("subjects") or []
+        if isinstance(subjects, str):
+            subjects = _subjects_from_csv(subjects)
+        subjects = [{"id": f"{int(s['id']):03d}", "mark": int(s["mark"])} for s in subjects]
+    except (ValueError, KeyError, TypeError):
+        return None, "invalid id or subjects"
+    if len(subjects) > 4:
+        return None, "more than 4 subjects"
+    if len({s["id"] for s in subjects}) != len(subjects):
+        return None, "duplicate subject id"
+    rec["subjects"] = subjects
+    return rec, None
+
+
+# -----------------------------
+# readers / writers
+# -----------------------------
+def _read_rows(f, fmt: str):
+    """Yield (row dict or None, error or None, original row for the rejects file)."""
+    if fmt == "csv":
+        for row in csv.DictReader(f):
+            yield row, None, row
+        return
+    for line in f:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield None, "invalid JSON", {"line": line.rstrip("\n")}
+            continue
+        if not isinstance(row, dict):
+            yield None, "not a JSON object", {"line": line.rstrip("\n")}
+            continue
+        yield row, None, row
+
+
+class _RejectWriter:
+    """Opens the rejects file only when the first bad row shows up."""
+
+    def __init__(self, path: str, fmt: str, fieldnames: list[str] | None):
+        self.path, self.fmt, self.fieldnames = path, fmt, fieldnames
+        self.f = None
+        self.writer = None
+        self.count = 0
+
+    def write(self, row: dict, error: str) -> None:
+        if self.f is None:
+            self.f = open(self.path, "w", encoding="utf-8", newline="")
+            if self.fmt == "csv":
+                fields = list(self.fieldnames or row.keys()) + ["error"]
+                self.writer = csv.DictWriter(self.f, fieldnames=fields, extrasaction="ignore")
+                self.writer.writeheader()
+        out = dict(row, error=error)
+        if self.fmt == "csv":
+            self.writer.writerow(out)
+        else:
+            self.f.write(json.dumps(out) + "\n")
+        self.count += 1
+
+    def close(self) -> None:
+        if self.f is not None:
+            self.f.close()
+
+
+# -----------------------------
+# public
+# -----------------------------
+def import_file(db, path: str, fmt: str | None = None, rejects_path: str | None = None,
+                chunk_size: int = 10_000) -> tuple[int, int]:
+    """
+    Stream students from path into db. Returns (imported, rejected).
+    Rejected rows are written to rejects_path (default: <file>.rejects.<ext>).
+    """
+    fmt = fmt or guess_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r} (use csv or ndjson)")
+    rejects_path = rejects_path or default_rejects_path(path)
+    imported = 0
+
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        fieldnames = None
+        if fmt == "csv":
+            fieldnames = next(csv.reader([f.readline()]), [])
+            f.seek(0)
+        rejects = _RejectWriter(rejects_path, fmt, fieldnames)
+        chunk: list[tuple[dict, dict]] = []     # (record, original row)
+
+        def commit():
+            nonlocal imported
+            ids = db.add_students_many([rec for rec, _row in chunk], compact=False)
+            for (_rec, row), sid in zip(chunk, ids):
+                if sid is None:
+                    rejects.write(row, "email or id already used (or too long for the storage)")
+                else:
+                    imported += 1
+            chunk.clear()
+
+        try:
+            for row, error, original in _read_rows(f, fmt):
+                if error is None:
+                    rec, error = _validate(row)
+                if error is not None:
+                    rejects.write(original, error)
+                    continue
+                chunk.append((rec, original))
+                if len(chunk) >= chunk_size:
+                    commit()
+            if chunk:
+                commit()
+        finally:
+            rejects.close()
+
+    if imported and db.storage.needs_compaction():
+        db.save_students()      # fold the import into one fresh snapshot
+    return imported, rejects.count
+
+
+def export_file(db, path: str, fmt: str | None = None) -> int:
+    """Write every student to path (one row/line at a time). Returns the count."""
+    fmt = fmt or guess_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r} (use csv or ndjson)")
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+        for rec in db.iter_records():
+            if fmt == "csv":
+                writer.writerow(dict(rec, subjects=_subjects_to_csv(rec.get("subjects", []))))
+            else:
+                f.write(json.dumps(rec) + "\n")
+            count += 1
+    return count
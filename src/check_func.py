@@ -13,26 +13,19 @@ Nicha: Checked
 
 import json
 import os
-import random
 import re
 
+import grading
+from id_allocator import pick_free
+
 # 1. Calculate grade from a mark
 
 def get_grade(mark):
     """
-    Decide the grade based on the mark.
-    HD = 85+, D = 75–84, C = 65–74, P = 50–64, Z = below 50.
+    Decide the grade based on the mark, using the grade policy in force (grading.py).
+    Default: HD = 85+, D = 75–84, C = 65–74, P = 50–64, Z = below 50.
     """
-    if mark >= 85:
-        return "HD"
-    elif mark >= 75:
-        return "D"
-    elif mark >= 65:
-        return "C"
-    elif mark >= 50:
-        return "P"
-    else:
-        return "Z"
+    return grading.policy().grade(mark)
 
 # 2. Validate student's email format
 
@@ -66,20 +59,14 @@ def check_password(password):
 def generate_student_id(existing_ids):
     """
     Create a unique 6-digit student ID, e.g. '000123'.
-    Avoids duplicates by checking existing IDs.
+    Avoids duplicates by skipping existing IDs (one random draw, no retries).
+    (Database keeps an id_allocator.IdAllocator instead of passing every id in.)
     """
-    while True:
-        new_id = f"{random.randint(1, 999999):06d}"
-        if new_id not in existing_ids:
-            return new_id
+    return f"{pick_free(1, 999999, (int(i) for i in existing_ids)):06d}"
 
 def generate_subject_id(existing_ids):
     """
     Create a unique 3-digit subject ID, e.g. '005'.
     Avoids duplicates for the same student.
     """
-    while True:
-        new_id = f"{random.randint(1, 999):03d}"
-        if new_id not in existing_ids:
-            return new_id
-        
+    return f"{pick_free(1, 999, (int(i) for i in existing_ids)):03d}"
@@ -11,29 +11,91 @@ Design notes:
 - I store all students as a JSON in 'students.data' (Text)
 - I recompute 'overall' and 'status' every time subjects change.
 - A student can enrol in at most 4 subjects (enforced in Database.enrol()).
+- Students are kept in two dict indexes (id -> Student, normalised email -> id)
+  so every lookup is O(1). 'students' is a list view built from the id index.
+- Loading streams the file one student at a time and keeps each one as raw JSON
+  text until it is first used (lazy), so start-up does not build every object.
+- Subject and Student use __slots__ (no per-object __dict__). Ids are kept as ints,
+  grades come from the grade policy's table, and only the part of the email before
+  '@university.com' is stored (interned). The public attributes are unchanged.
 - When program start load data from student.data to memory. After any changes, save everything back to the same file
+- Reading/writing goes through a storage back end (storage.py): the JSON file
+  (optionally with an append-only journal) or SQLite.
+- Journal mode (Database(journal=True)): each change appends ONE small line to
+  'students.data.journal' instead of rewriting the whole file. On start I load the
+  snapshot then replay the journal. The journal is folded back into the snapshot
+  (compaction) when it gets long or when save_students() is called.
+- Cohort figures (grade counts, pass/fail, mean, subject-mark counts) are kept as
+  running totals (analytics.CohortStats): counted once on first use, then every
+  add/enrol/drop/remove adjusts them, so stats() never walks all students.
+- subject_report() (students, marks and fail rate per subject) is counted when
+  asked for: the records are cut into chunks counted in a process pool, then merged.
+- A ranking index (analytics.RankingIndex: one sorted list keyed by overall) is
+  kept the same way, so the by-grade report, top-k and paging never sort.
+- Grades and PASS/FAIL come from the grade policy in force (grading.py:
+  configurable bands + pass mark, lookup table for whole marks). regrade()
+  switches policy and rewrites every stored grade/status in one write.
+- find() (admin search) uses secondary indexes (search_index.StudentIndex: name
+  prefixes, grade buckets, PASS/FAIL sets, subject -> students), built on the
+  first search and kept up to date like the ranking.
+- Readers can take a snapshot() (O(1)): a read-only view of one version. The
+  next change copies the id index / ranking (and each Student it changes)
+  instead of changing them in place (copy-on-write), so long reports run
+  without a lock while enrolments go on.
+- Rendered reports (report_lines / show_students) are kept in a small LRU cache
+  keyed by (mode, page, size, version); version goes up with every change, so a
+  report is only rendered again after something changed.
+- main.py and controllers.py hold their Database in a LazyDatabase: it is only
+  opened (and the storage read) on first use, so start-up does not wait for it.
+- New ids come from an allocator (id_allocator.py) instead of random guessing:
+  a bitmap of taken student ids, built on the first registration and kept
+  (updated, not rebuilt) when the data is reloaded.
+- Durability modes: "immediate" writes every change straight away (default);
+  "group" keeps changed students in a dirty set and writes them together every
+  GROUP_OPS changes or GROUP_MS milliseconds; "exit" writes them on flush()/exit.
 
 Nicha: Done Final ver.
 """
 
-import json
+import atexit
+import functools
+import os
 import random
+import sys
+import threading
+from collections import OrderedDict
+from itertools import islice
 
-import check_func
-# Validation functions:
-# - get_grade(mark): returns Z/P/C/D/HD
-# - check_email(), check_password():
-# - generate_student_id(), generate_subject_id()
+import grading
+import metrics
+from analytics import CohortAnalytics, CohortStats, RankingIndex, SubjectStats
+from grading import GradePolicy
+from id_allocator import IdAllocator, pick_free
+from search_index import StudentIndex
+from storage import Storage, open_storage
+
+
+EMAIL_DOMAIN = "@university.com"
 
 
 # ---------------------------------------------------------------------
 # 1) Subject Class
 
 class Subject:
+    __slots__ = ("_id", "mark")
+
     def __init__(self, subject_id: str, mark: int):
-        self.id = f"{int(subject_id):03d}"  # store as 3-digit string, e.g. "001"
+        self._id = int(subject_id)          # shown as 3-digit string, e.g. "001"
         self.mark = int(mark)
-        self.grade = check_func.get_grade(self.mark)
+
+    @property
+    def id(self) -> str:
+        return f"{self._id:03d}"
+
+    @property
+    def grade(self) -> str:
+        # lookup table of the policy in force (worked out once per policy)
+        return grading.policy().grade(self.mark)
 
     @staticmethod
     def from_dict(data: dict) -> "Subject":
@@ -52,20 +114,38 @@ class Student:
       - id: 6-digit string (e.g., "000123")
       - subjects: list[Subject]
       - overall: average of all subject marks (float, 0 if empty)
-      - status: True = PASS (overall >= 50), False = FAIL
+      - status: True = PASS (overall >= pass mark of the grade policy, 50 by default), False = FAIL
       - overall recal everytime subject change
       - status recal when overall change
     """
+    __slots__ = ("_email", "password", "name", "subjects", "_id", "overall", "status")
+
     def __init__(self, email: str, password: str, name: str,
                  subjects: list, student_id: str, overall: float, status: bool):
         self.email = email
         self.password = password
-        self.name = name
+        self.name = sys.intern(name)
         self.subjects: list[Subject] = subjects
-        self.id = f"{int(student_id):06d}"       # store as 6-digit string, e.g. "000123"
+        self._id = int(student_id)               # shown as 6-digit string, e.g. "000123"
         self.overall = float(overall)
         self.status = bool(status)
 
+    @property
+    def id(self) -> str:
+        return f"{self._id:06d}"
+
+    @property
+    def email(self) -> str:
+        e = self._email
+        return e if "@" in e else e + EMAIL_DOMAIN
+
+    @email.setter
+    def email(self, value: str) -> None:
+        # keep only the (interned) local part when the domain is the usual one
+        if value.endswith(EMAIL_DOMAIN):
+            value = value[:-len(EMAIL_DOMAIN)]
+        self._email = sys.intern(value)
+
     @staticmethod
     def from_dict(data: dict) -> "Student":
         """Rebuild a Student from its dict (including nested Subject dicts)."""
@@ -91,6 +171,11 @@ class Student:
             "status": self.status,
         }
 
+    def copy(self) -> "Student":
+        """Same data, own subject list (Subject objects are never changed in place, so they are shared)."""
+        return Student(self.email, self.password, self.name, list(self.subjects), self.id,
+                       self.overall, self.status)
+
     # Create method to keep overall + status consistent
     def _recompute_overall_and_status(self) -> None:
         """Recalculate overall average and pass/fail status."""
@@ -101,215 +186,1121 @@ class Student:
 
         total = sum(s.mark for s in self.subjects)
         self.overall = round(total / len(self.subjects), 2)
-        self.status = (self.overall >= 50)   # average >= 50 is PASS
+        self.status = grading.policy().passed(self.overall)   # average >= pass mark (50) is PASS
+
+
+# ---------------------------------------------------------------------
+# 2b) Snapshot (read-only view of one version)
+
+class Snapshot:
+    """
+    Every student as they were at one version of the Database (Database.snapshot()).
+    Taking one is O(1): it keeps the Database's id index (and ranking, if built)
+    as they are, and the Database copies them on its next change instead of
+    changing them (copy-on-write). So a snapshot never changes and can be read
+    from any thread with no lock while enrolments go on.
+    Students are built from raw records on the fly (not cached); treat every
+    Student it returns as read-only.
+    """
+    __slots__ = ("version", "_by_id", "_ranking", "_decode")
+
+    def __init__(self, version: int, by_id: dict, ranking: RankingIndex | None, decode):
+        self.version = version
+        self._by_id = by_id
+        self._ranking = ranking
+        self._decode = decode
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self):
+        """Every Student, in the order they were added."""
+        for rec in self._by_id.values():
+            yield self._student(rec)
+
+    def _student(self, rec) -> Student:
+        return rec if isinstance(rec, Student) else Student.from_dict(self._decode(rec))
+
+    def get(self, student_id: str) -> Student | None:
+        rec = self._by_id.get(f"{int(student_id):06d}")
+        return None if rec is None else self._student(rec)
+
+    def values(self):
+        """Every entry as stored in the id index: a Student or a raw record (see Database._by_id)."""
+        return self._by_id.values()
+
+    def records(self):
+        """Every student as a plain dict, without building Students."""
+        for rec in self._by_id.values():
+            yield rec.to_dict() if isinstance(rec, Student) else self._decode(rec)
+
+    def by_overall(self, descending: bool = False):
+        """Every Student by overall, lowest first (ties by id); streams from the ranking if it was built."""
+        if self._ranking is None:
+            yield from sorted(self, key=lambda s: (s.overall, s._id), reverse=descending)
+            return
+        by_id = self._by_id
+        for _overall, sid in (self._ranking.descending() if descending else self._ranking.ascending()):
+            yield self._student(by_id[sid])
+
+    def page_by_overall(self, page: int, size: int, descending: bool = False) -> list[Student]:
+        """Page 'page' (1 = first) of by_overall()."""
+        if page < 1 or size < 1:
+            return []
+        if self._ranking is None:
+            return list(islice(self.by_overall(descending), (page - 1) * size, page * size))
+        return [self._student(self._by_id[sid]) for _overall, sid in self._ranking.page(page, size, descending)]
+
+    def analytics(self) -> CohortAnalytics:
+        return CohortAnalytics.from_students(list(self))
 
 
 # ---------------------------------------------------------------------
 # 3) Database
 # ---------------------------------------------------------------------
+def _write_op(method):
+    """
+    Wrap a Database action that changes data:
+      take the storage's cross-process write lock -> reload if another process
+      wrote since we last looked -> copy what a snapshot still uses -> run the
+      action -> remember the new version.
+    So two processes can never overwrite each other's changes, and a snapshot
+    never sees one.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._mutex, self.storage.lock():
+            self.refresh()
+            self._unshare()
+            result = method(self, *args, **kwargs)
+            self._seen_version = self.storage.version()
+            self._version += 1
+        return result
+    return wrapper
+
+
 class Database:
     """
     This class owns the list of students in memory and takes care of reading/writing
-    to the 'students.data' file.
+    them through a storage back end (storage.py). Default: the 'students.data' JSON
+    file; set STUDENTS_DATA=students.db (or pass storage=SqliteStorage(...)) for SQLite.
 
     List methods that the CLI/GUI can call:
       - add_student(email, password, name)
+      - add_students_many([{email, password, name, (id), (subjects)}])   # bulk import, one save
       - enrol(student_id)
       - remove_subject(student_id, subject_id)
+      - enrol_many([(student_id, count)]), remove_subjects_many([(student_id, subject_id)])
+                                      # batch versions: one save per batch
       - change_password(student_id, new_password)
       - show_students (options)       # 1=list, 2=group-by-grade, 3=pass/fail
+      - snapshot()                    # O(1) read-only view, safe to read while others write
+      - report_lines(mode, page, size) # show_students output as lines, cached per version
+      - clear_report_cache()
+      - analytics()                   # grade histogram, pass/fail, mean/std/percentiles
+      - stats()                       # same figures from running totals (no scan)
+      - top_students(k), bottom_students(k), students_page(page, size), students_between(low, high)
+                                      # from the ranking index (no sort)
+      - find(name_prefix, grade, status, mark_between, enrolled_in)   # indexed search
+      - regrade(policy)                # new grade bands / pass mark, every student regraded
       - remove_student(student_id)
       - remove_all()
       - check_db_email
+      - get_student(student_id), get_student_by_email(email)   # O(1) lookups
+      - flush(), close()              # write queued changes (group / exit durability)
     """
     FILE_NAME = "students.data"
+    LOCATION_ENV = "STUDENTS_DATA"     # env var to point the CLI/GUI at another file / back end
+    DURABILITY_ENV = "STUDENTS_DURABILITY"
+    DURABILITY_MODES = ("immediate", "group", "exit")
+    GROUP_OPS = 100     # group mode: write after this many queued changes ...
+    GROUP_MS = 50       # ... or this long after the first one, whichever comes first
+    REPORT_CHUNK = 20_000           # subject_report: students per job ...
+    REPORT_PARALLEL_MIN = 50_000    # ... and below this many students, no process pool
+    REPORT_CACHE_SIZE = 64          # rendered reports kept (least recently used dropped first) ...
+    REPORT_CACHE_LINES = 1_000_000  # ... and lines kept in all of them together
 
-    def __init__(self):
-        self.students: list[Student] = self.load_students()
+    def __init__(self, journal: bool = False, storage: Storage | None = None,
+                 durability: str | None = None):
+        if storage is None:
+            location = os.environ.get(self.LOCATION_ENV, self.FILE_NAME)
+            storage = open_storage(location, journal=journal)
+        self.storage = storage
+        self.durability = durability or os.environ.get(self.DURABILITY_ENV, "immediate")
+        if self.durability not in self.DURABILITY_MODES:
+            raise ValueError(f"durability must be one of {', '.join(self.DURABILITY_MODES)}")
+        # changes not written yet (group / exit durability)
+        self._mutex = threading.RLock()               # actions vs the group-commit timer thread
+        self._dirty: dict[str, Student] = {}          # changed/added students by id
+        self._removed: set[str] = set()               # removed ids
+        self._pending_ops = 0
+        self._flush_timer: threading.Timer | None = None
+        if self.durability != "immediate":
+            atexit.register(self.flush)
+        # id index values are either a Student or the raw record read from storage
+        # (a dict, its JSON text or a binary record); raw records become Students the first time
+        # they are accessed.
+        self._by_id: dict[str, Student | dict | str | bytes] = {}   # "000123" -> Student / raw record
+        self._by_email: dict[str, str] = {}           # "john.smith@university.com" -> "000123"
+        self._seen_version = None                     # storage.version() we last read/wrote
+        self._stats: CohortStats | None = None        # running totals, counted on first stats()
+        self._ranking: RankingIndex | None = None     # sorted by overall, built on first ranked report
+        self._search: StudentIndex | None = None      # find() indexes, built on first search
+        self._ids: IdAllocator | None = None          # taken student ids, built on first new id
+        # copy-on-write snapshots (see snapshot())
+        self._version = 0                             # bumped by every change and reload
+        self._shared = False                          # a snapshot uses _by_id / _ranking as they are
+        self._owned: set[str] = set()                 # ids whose Student no snapshot can see
+        # rendered reports (see report_lines())
+        self._roster_version = 0                      # bumped only when students are added / removed
+        self._report_cache: OrderedDict[tuple, list[str]] = OrderedDict()
+        self._cached_lines = 0
+        self.reload()
 
     # -----------------------------
-    # load & save data JSON <> Dictionary <> Object
+    # students list <> indexes
     # -----------------------------
+    @property
+    def students(self) -> list[Student]:
+        """All students (in the order they were added), built from the id index."""
+        return [self._get(sid) for sid in self._by_id]
+
+    @students.setter
+    def students(self, value: list[Student]) -> None:
+        """Replace every student and rebuild both indexes."""
+        self._by_id = {}
+        self._by_email = {}
+        self._stats = CohortStats()
+        self._ranking = RankingIndex()
+        self._search = StudentIndex()
+        self._ids = None
+        self._shared = False
+        self._owned = set()
+        self._roster_version += 1    # even for an empty list (remove_all)
+        for stu in value:
+            self._index_student(stu)
+
+    @property
+    def version(self) -> int:
+        """Mutation counter: goes up with every change and reload (snapshots and cached reports use it)."""
+        return self._version
+
+    def snapshot(self) -> Snapshot:
+        """
+        O(1) read-only view of every student as they are now (see Snapshot). The
+        next change copies the id index and ranking once (a dict/list copy) and
+        every Student it touches, instead of changing what the snapshot holds.
+        """
+        with self._mutex:       # never half-way through a change
+            self._shared = True
+            self._owned = set()
+            return Snapshot(self._version, self._by_id, self._ranking, self.storage.decode)
+
+    def _unshare(self) -> None:
+        """Before a change: copy the id index (and ranking) if a snapshot uses them."""
+        if self._shared:
+            self._by_id = dict(self._by_id)
+            if self._ranking is not None:
+                self._ranking = self._ranking.copy()
+            self._shared = False
+
+    @staticmethod
+    def _normalise_email(email: str) -> str:
+        return email.strip().lower()
+
+    def _index_student(self, student: Student) -> None:
+        self._by_id[student.id] = student
+        self._roster_version += 1
+        self._by_email[self._normalise_email(student.email)] = student.id
+        self._stats_add(student)
+        if self._search is not None:
+            self._search.add_name(student._id, student.name)
+        if self._ids is not None:
+            self._ids.mark_used(student._id)
+
+    def _index_record(self, student_id: str, email: str, record: dict | str | bytes) -> None:
+        """Index a raw storage record WITHOUT building the Student yet."""
+        sid = f"{int(student_id):06d}"
+        self._by_id[sid] = record
+        self._by_email[self._normalise_email(email)] = sid
+
+    def _unindex_student(self, student: Student) -> None:
+        self._by_id.pop(student.id, None)
+        self._roster_version += 1
+        self._by_email.pop(self._normalise_email(student.email), None)
+        self._stats_discard(student)
+        if self._search is not None:
+            self._search.discard_name(student._id)
+        if self._ids is not None:
+            self._ids.release(student._id)
+
+    def _get(self, sid: str) -> Student | None:
+        """Return the Student for a 6-digit id, building it from its raw dict if needed."""
+        rec = self._by_id.get(sid)
+        if rec is None or isinstance(rec, Student):
+            return rec
+        rec = Student.from_dict(self.storage.decode(rec))
+        self._by_id[sid] = rec
+        return rec
+
+    def iter_records(self):
+        """Public: yield every student as a plain dict (e.g. for export), without building Students."""
+        return self._records()
+
+    def _records(self):
+        """Yield every student as a plain dict (raw ones are NOT turned into Students)."""
+        for rec in self._by_id.values():
+            if isinstance(rec, Student):
+                yield rec.to_dict()
+            else:
+                yield self.storage.decode(rec)
+
+    # -----------------------------
+    # load & save data  Storage <> Dictionary <> Object
+    # -----------------------------
+    @metrics.timed("db.load_students")
     def load_students(self) -> list:
         """
-        Read the JSON file. If not found, return an empty list.
-        Store students as a JSON list
+        Read every student from the storage. If nothing is stored yet (or the
+        file cannot be read), return an empty list.
+        (Builds every Student now; the Database itself uses reload() instead.)
         """
         try:
-            with open(self.FILE_NAME, "r", encoding="utf-8") as f:
-                raw = json.load(f)
-            return [Student.from_dict(s) for s in raw]
-        except FileNotFoundError:
-            return []
+            return [Student.from_dict(s) for s in self.storage.load()]
         except Exception as e:
             print(f"[load_students] Error: {e}")
             return []
 
+    @metrics.timed("db.load")
+    def reload(self) -> None:
+        """
+        (Re)read the storage into the indexes. Records are streamed one at a time
+        and kept as raw dicts; a Student is only built when it is accessed.
+        """
+        if self._dirty or self._removed:
+            self.flush()        # queued changes would be lost otherwise
+        old_ids = self._by_id   # the id allocator is kept and updated from the difference
+        self._by_id = {}
+        self._by_email = {}
+        self._stats = None      # counted again on the next stats()
+        self._ranking = None    # built again on the next ranked report
+        self._search = None     # built again on the next find()
+        self._shared = False    # snapshots keep the old index, the new one is ours
+        self._owned = set()
+        self._version += 1
+        self._roster_version += 1
+        try:
+            metrics.add("db.loads")
+            with self.storage.lock(shared=True):
+                self._seen_version = self.storage.version()
+                self._load_policy()
+                for sid, email, rec in self.storage.load_lazy():
+                    self._index_record(sid, email, rec)
+        except Exception as e:
+            print(f"[load_students] Error: {e}")
+        if self._ids is not None:
+            self._update_id_allocator(old_ids)
+
+    def _load_policy(self) -> None:
+        """Put the grade policy saved with the data (by regrade()) in force."""
+        try:
+            grading.use_stored(self.storage.load_policy())
+        except (OSError, ValueError, TypeError) as e:
+            print(f"[grading] Error: {e} (using {grading.POLICY_ENV} / the default grades)")
+            grading.use_stored(None)
+
+    def refresh(self) -> bool:
+        """
+        Reload ONLY if another process wrote since we last read/wrote (cheap
+        version check: lock-file counter + file stats). Returns True if reloaded.
+        """
+        version = self.storage.version()
+        if version is not None and version == self._seen_version:
+            return False
+        self.reload()
+        return True
+
+    @metrics.timed("db.save_students")
     def save_students(self) -> None:
-        """Write the current student list back to the JSON file."""
+        """Write the whole current student list to the storage (full snapshot)."""
+        self._clear_pending()       # the snapshot includes every queued change
         try:
-            with open(self.FILE_NAME, "w", encoding="utf-8") as f:
-                json.dump([s.to_dict() for s in self.students], f, indent=4)
+            with metrics.timer("db.to_dicts"):
+                records = list(self._records())
+            with self.storage.lock():
+                self.storage.save_all(records)
+                self.storage.mark_written()
+                self._seen_version = self.storage.version()
         except Exception as e:
             print(f"[save_students] Error: {e}")
 
+    def _persist_student(self, student: Student) -> None:
+        """Save one added/changed student (incremental put, or full save)."""
+        self._persist_students([student])
+
+    def _persist_students(self, students: list[Student], compact: bool = True) -> None:
+        """
+        Save several changed students in ONE storage write (incremental, or full save),
+        or queue them for the next flush() in group / exit durability.
+        compact=False skips the journal compaction check (bulk imports compact once at the end).
+        """
+        if not students:
+            return
+        if self.durability != "immediate":
+            for stu in students:
+                self._removed.discard(stu.id)
+                self._dirty[stu.id] = stu
+            self._queued(len(students))
+            return
+        self._write_changes(students, [], compact)
+
+    def _persist_removal(self, student_id: str) -> None:
+        """Save the removal of one student (incremental delete, or full save), or queue it."""
+        if self.durability != "immediate":
+            self._dirty.pop(student_id, None)
+            self._removed.add(student_id)
+            self._queued(1)
+            return
+        self._write_changes([], [student_id])
+
+    @metrics.timed("db.persist")
+    def _write_changes(self, students: list[Student], removed_ids: list[str],
+                       compact: bool = True) -> None:
+        """Write removals then changed students in ONE storage write (or a full save)."""
+        if not self.storage.incremental:
+            with self.storage.lock():
+                if self.storage.version() == self._seen_version:
+                    self.save_students()        # memory is the latest data: write it out
+                else:
+                    self._save_over_latest(students, removed_ids)
+            return
+        try:
+            with metrics.timer("db.to_dicts"):
+                records = [stu.to_dict() for stu in students]
+            with self.storage.lock():
+                for sid in removed_ids:
+                    self.storage.delete(sid)
+                if records:
+                    self.storage.put_many(records)
+                self.storage.mark_written()
+        except Exception as e:
+            print(f"[save_students] Error: {e}")
+            return
+        if compact and self.storage.needs_compaction():
+            self.save_students()
+
+    def _save_over_latest(self, students: list[Student], removed_ids: list[str]) -> None:
+        """
+        Full-save back end, and another process wrote since we last read (a queued
+        flush in group / exit durability): apply our changes to what is stored NOW
+        instead of writing our out-of-date memory over it. _seen_version is left
+        alone, so the next refresh() reloads and picks up the other writer too.
+        """
+        changed = {stu.id: stu.to_dict() for stu in students}
+        gone = set(removed_ids)
+        try:
+            with self.storage.lock():
+                records = []
+                for rec in self.storage.load():
+                    sid = f"{int(rec['id']):06d}"
+                    if sid not in gone:
+                        records.append(changed.pop(sid, rec))
+                records.extend(changed.values())    # students the stored data does not have yet
+                self.storage.save_all(records)
+                self.storage.mark_written()
+        except Exception as e:
+            print(f"[save_students] Error: {e}")
+
+    # -----------------------------
+    # write coalescing (group / exit durability)
+    # -----------------------------
+    def _queued(self, count: int) -> None:
+        """count more changes are waiting; in group mode write when enough are queued or time is up."""
+        self._pending_ops += count
+        if self.durability != "group":
+            return
+        if self._pending_ops >= self.GROUP_OPS:
+            self.flush()
+        elif self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.GROUP_MS / 1000, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _clear_pending(self) -> tuple[list[Student], list[str]]:
+        """Take the queued changes out (and stop the timer). Returns (students, removed ids)."""
+        with self._mutex:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            students, removed = list(self._dirty.values()), list(self._removed)
+            self._dirty, self._removed, self._pending_ops = {}, set(), 0
+        return students, removed
+
+    def flush(self) -> None:
+        """Write every queued change now (no-op in immediate durability or when nothing is queued)."""
+        with self._mutex:
+            students, removed = self._clear_pending()
+            if not (students or removed):
+                return
+            with self.storage.lock():
+                up_to_date = self.storage.version() == self._seen_version
+                self._write_changes(students, removed)
+                if up_to_date:      # else keep the old version so refresh() still sees the other writer
+                    self._seen_version = self.storage.version()
+
+    def close(self) -> None:
+        """Flush queued changes and release the storage."""
+        self.flush()
+        self.storage.close()
+
     # -----------------------------
     # helpers to find/check things (Private)
     # -----------------------------
     def _find_student(self, student_id: str) -> Student | None:
         """Return the student with the given 6-digit id string, or None."""
-        target = f"{int(student_id):06d}"
-        for s in self.students:
-            if s.id == target:
-                return s
-        return None
+        return self._get(f"{int(student_id):06d}")
+
+    def _find_for_change(self, student_id: str) -> Student | None:
+        """
+        _find_student for an action that changes the student in place: if a
+        snapshot may still show this Student, it is copied first (copy-on-write).
+        """
+        stu = self._find_student(student_id)
+        if stu is None or stu.id in self._owned:
+            return stu
+        stu = stu.copy()
+        self._by_id[stu.id] = stu
+        self._owned.add(stu.id)
+        return stu
+
+    def _storable(self, student: Student) -> bool:
+        """False (with a message) if the storage back end cannot hold this student, e.g. text too long."""
+        try:
+            self.storage.validate(student.to_dict())
+        except ValueError as e:
+            print(f"[save_students] Error: {e}")
+            return False
+        return True
 
     def _email_available(self, email: str) -> bool:
         """Return True if this email is not already used in the DB."""
-        return all(s.email.strip().lower() != email for s in self.students)
+        return self._normalise_email(email) not in self._by_email
+
+    def _id_allocator(self) -> IdAllocator:
+        """Taken student ids as a bitmap; built from the id index the first time, kept across reloads."""
+        if self._ids is None:
+            ids = IdAllocator()
+            for sid in self._by_id:
+                ids.mark_used(int(sid))
+            self._ids = ids
+        return self._ids
+
+    def _update_id_allocator(self, old_ids: dict) -> None:
+        """
+        After a reload: give back the ids that are gone and take the new ones,
+        instead of building the bitmap (and free list) again. Both differences
+        are worked out on the dict keys (C set operations); only the ids that
+        changed are touched. Ids reserved but not used yet stay reserved.
+        """
+        ids = self._ids
+        for sid in old_ids.keys() - self._by_id.keys():
+            ids.release(int(sid))
+        for sid in self._by_id.keys() - old_ids.keys():
+            ids.mark_used(int(sid))
 
     def _generate_unique_student_id(self) -> str:
-        """Generate a 6-digit ID not used by any student in the DB."""
-        used = {s.id for s in self.students}
-        while True:
-            new_id = f"{random.randint(1, 999_999):06d}"
-            if new_id not in used:
-                return new_id
+        """A 6-digit ID not used by any student in the DB (O(1), no guessing)."""
+        return f"{self._id_allocator().allocate():06d}"
+
+    def reserve_student_ids(self, count: int) -> list[str]:
+        """
+        Take a block of free ids at once (bulk import). They count as used until
+        a student gets them or release_student_ids() gives them back.
+        """
+        return [f"{i:06d}" for i in self._id_allocator().reserve(count)]
+
+    def release_student_ids(self, student_ids: list[str]) -> None:
+        """Give reserved ids that were not used back to the allocator."""
+        ids = self._id_allocator()
+        for sid in student_ids:
+            if sid not in self._by_id:
+                ids.release(int(sid))
 
     def _generate_unique_subject_id(self, student: Student) -> str:
         """Generate a 3-digit subject id unique within this student's subject list."""
-        used = {sub.id for sub in student.subjects}
-        while True:
-            new_id = f"{random.randint(1, 999):03d}"
-            if new_id not in used:
-                return new_id
+        return f"{pick_free(1, 999, (sub._id for sub in student.subjects)):03d}"
 
     # -----------------------------
     # public actions (used by CLI/GUI(controller.py))
     # -----------------------------
+    @metrics.timed("db.add_student")
+    @_write_op
     def add_student(self, email: str, password: str, name: str) -> str | None:
         """
         Create a new student and save the DB.
         Returns the new student id string, or None if email exists.
+        Raises ValueError if the storage cannot hold the student (e.g. a name too
+        long for a binary record); the message says why.
         (I assume validation for email/password is done before calling this.)
         """
         if not self._email_available(email):
             return None
         new_id = self._generate_unique_student_id()
         new_student = Student(email, password, name, [], new_id, 0.0, False)
-        self.students.append(new_student)
-        self.save_students()
+        try:
+            self.storage.validate(new_student.to_dict())
+        except ValueError:
+            self._id_allocator().release(new_student._id)
+            raise
+        self._index_student(new_student)
+        self._persist_student(new_student)
         return new_id
 
+    @metrics.timed("db.add_students_many")
+    @_write_op
+    def add_students_many(self, records: list[dict], compact: bool = True) -> list[str | None]:
+        """
+        Bulk version of add_student: records are dicts with email, password, name
+        and optionally id and subjects ([{"id": "001", "mark": 70}, ...]).
+        Returns, per record, the student id or None if the email (or given id) is
+        already used, the given id is not 1..999999 or the storage cannot hold the record. Everything new is
+        saved in ONE storage write.
+        (Like add_student, format validation is done by the caller.)
+        """
+        # 1) decide which records can be added (emails/ids also checked within the batch)
+        allocator = self._id_allocator()
+        accepted: list[tuple[int, dict, str | None]] = []
+        emails: set[str] = set()
+        given: set[str] = set()
+        for pos, rec in enumerate(records):
+            email = self._normalise_email(rec["email"])
+            if email in emails or not self._email_available(email):
+                continue
+            sid = None
+            if rec.get("id"):
+                if not allocator.low <= int(rec["id"]) <= allocator.high:
+                    continue    # not a 6-digit student id
+                sid = f"{int(rec['id']):06d}"
+                if sid in given or allocator.is_taken(int(sid)):    # used or reserved
+                    continue
+                given.add(sid)
+            emails.add(email)
+            accepted.append((pos, rec, sid))
+
+        # 2) claim the given ids, then reserve ONE block for the rest
+        for sid in given:
+            allocator.mark_used(int(sid))
+        fresh = iter(self.reserve_student_ids(len(accepted) - len(given)))
+
+        # 3) build and index the students
+        ids: list[str | None] = [None] * len(records)
+        new: list[Student] = []
+        for pos, rec, sid in accepted:
+            sid = sid or next(fresh)
+            subjects = [Subject(sub["id"], sub["mark"]) for sub in rec.get("subjects") or []]
+            stu = Student(rec["email"], rec["password"], rec["name"], subjects, sid, 0.0, False)
+            stu._recompute_overall_and_status()
+            if not self._storable(stu):
+                self._id_allocator().release(stu._id)
+                continue
+            self._index_student(stu)
+            new.append(stu)
+            ids[pos] = stu.id
+        self._persist_students(new, compact=compact)
+        return ids
+
+    @metrics.timed("db.change_password")
+    @_write_op
     def change_password(self, student_id: str, new_password: str) -> bool:
         """
         Update the password for a student if the id exists.
         I expect the caller to validate the password format first.
+        Raises ValueError if the storage cannot hold the new password (too long).
         """
-        stu = self._find_student(student_id)
+        stu = self._find_for_change(student_id)
         if not stu:
             print("Student ID not found.")
             return False
-        stu.password = new_password
-        self.save_students()
+        old, stu.password = stu.password, new_password
+        try:
+            self.storage.validate(stu.to_dict())
+        except ValueError:
+            stu.password = old
+            raise
+        self._persist_student(stu)
         return True
 
+    @metrics.timed("db.enrol")
+    @_write_op
     def enrol(self, student_id: str) -> str:
         """
         Enrol the student into ONE subject with a random mark.
         Enforces the 4-subject limit.
         Returns a user-friendly message for CLI.
         """
-        stu = self._find_student(student_id)
+        stu = self._find_for_change(student_id)
         if not stu:
             return "Student ID not found."
 
+        msg, changed = self._enrol_one(stu)
+        if changed:
+            self._persist_student(stu)
+        return msg
+
+    def _enrol_one(self, stu: Student) -> tuple[str, bool]:
+        """Add one subject in memory (no save). Returns (message, changed)."""
         if len(stu.subjects) >= 4:
-            return "Students are allowed to enrol in 4 subjects only."
+            return "Students are allowed to enrol in 4 subjects only.", False
 
         # Create a new subject with unique ID and random mark 25..100
         new_sub_id = self._generate_unique_subject_id(stu)
         new_mark = random.randint(25, 100)
+        self._stats_discard(stu)
         stu.subjects.append(Subject(new_sub_id, new_mark))
 
-        # Recompute overall + status, then save
+        # Recompute overall + status (the caller saves)
         stu._recompute_overall_and_status()
-        self.save_students()
+        self._stats_add(stu)
 
         return (f"Enrolling in Subject-{new_sub_id}\n"
-                f"You are now enrolled in {len(stu.subjects)} out of 4 subjects")
+                f"You are now enrolled in {len(stu.subjects)} out of 4 subjects"), True
 
+    @metrics.timed("db.remove_subject")
+    @_write_op
     def remove_subject(self, student_id: str, subject_id: str) -> str:
         """
         Remove one subject by its ID from the given student.
         Returns a message string for CLI display.
         """
-        stu = self._find_student(student_id)
+        stu = self._find_for_change(student_id)
         if not stu:
             return "Student ID not found."
 
+        msg, changed = self._remove_one(stu, subject_id)
+        if changed:
+            self._persist_student(stu)
+        return msg
+
+    def _remove_one(self, stu: Student, subject_id: str) -> tuple[str, bool]:
+        """Drop one subject in memory (no save). Returns (message, changed)."""
         target = f"{int(subject_id):03d}"
-        before = len(stu.subjects)
-        stu.subjects = [sub for sub in stu.subjects if sub.id != target]
+        remaining = [sub for sub in stu.subjects if sub.id != target]
 
-        if len(stu.subjects) == before:
-            return f"Subject {subject_id} does not exist"
+        if len(remaining) == len(stu.subjects):
+            return f"Subject {subject_id} does not exist", False
 
+        self._stats_discard(stu)
+        stu.subjects = remaining
         stu._recompute_overall_and_status()
-        self.save_students()
+        self._stats_add(stu)
         return (f"Dropping Subject {subject_id}\n"
-                f"You are now enrolled in {len(stu.subjects)} out of 4 subjects")
+                f"You are now enrolled in {len(stu.subjects)} out of 4 subjects"), True
+
+    # -----------------------------
+    # batch actions: many operations, ONE save
+    # -----------------------------
+    @metrics.timed("db.enrol_many")
+    @_write_op
+    def enrol_many(self, operations: list[tuple[str, int]]) -> list[str]:
+        """
+        operations: [(student_id, how_many_subjects), ...]
+        Each student still gets at most 4 subjects in total.
+        Returns one message per operation (same wording as enrol()), and saves
+        every changed student in a single storage write at the end. A count that
+        is not a whole number >= 0 only fails its own operation.
+        """
+        results = []
+        changed: dict[str, Student] = {}
+        for student_id, count in operations:
+            how_many = self._subject_count(count)
+            if how_many is None:
+                results.append(f"Invalid number of subjects: {count!r}")
+                continue
+            try:
+                stu = self._find_for_change(student_id)
+            except ValueError:
+                stu = None
+            if not stu:
+                results.append("Student ID not found.")
+                continue
+            lines = []
+            for _ in range(how_many):
+                msg, ok = self._enrol_one(stu)
+                lines.append(msg)
+                if not ok:
+                    break       # hit the 4-subject limit
+                changed[stu.id] = stu
+            results.append("\n".join(lines))
+        self._persist_students(list(changed.values()))
+        return results
+
+    @staticmethod
+    def _subject_count(count) -> int | None:
+        """count as an int if it is a whole number >= 0 (2, "2", 2.0), else None."""
+        try:
+            how_many = int(count)
+        except (TypeError, ValueError):
+            return None
+        if how_many < 0 or isinstance(count, bool) or (isinstance(count, float) and count != how_many):
+            return None
+        return how_many
+
+    @metrics.timed("db.remove_subjects_many")
+    @_write_op
+    def remove_subjects_many(self, operations: list[tuple[str, str]]) -> list[str]:
+        """
+        operations: [(student_id, subject_id), ...]
+        Returns one message per operation (same wording as remove_subject()),
+        and saves every changed student in a single storage write at the end.
+        """
+        results = []
+        changed: dict[str, Student] = {}
+        for student_id, subject_id in operations:
+            try:
+                stu = self._find_for_change(student_id)
+            except ValueError:
+                stu = None
+            if not stu:
+                results.append("Student ID not found.")
+                continue
+            try:
+                msg, ok = self._remove_one(stu, subject_id)
+            except ValueError:
+                msg, ok = f"Subject {subject_id} does not exist", False
+            if ok:
+                changed[stu.id] = stu
+            results.append(msg)
+        self._persist_students(list(changed.values()))
+        return results
+
+    @metrics.timed("db.get_student")
+    def get_student(self, student_id: str) -> Student | None:
+        """Public O(1) lookup by student id (any int-like form, e.g. "123")."""
+        return self._find_student(student_id)
+
+    @metrics.timed("db.get_student_by_email")
+    def get_student_by_email(self, email: str) -> Student | None:
+        """Public O(1) lookup by email (case and surrounding spaces ignored)."""
+        sid = self._by_email.get(self._normalise_email(email))
+        return None if sid is None else self._get(sid)
 
     def list_subjects(self, student_id: str) -> list[Subject]:
         stu = self._find_student(student_id)
         return [] if not stu else stu.subjects
 
+    @metrics.timed("db.show_students")
     def show_students(self, mode: int) -> None:
         """
         Print students according to mode:
           1 = simple list
           2 = group by overall grade (I print sorted by overall)
-          3 = partition into FAIL / PASS buckets using overall >= 50
+          3 = partition into FAIL / PASS buckets (status, i.e. overall >= pass mark)
+        Printed from a snapshot, so other threads can enrol/remove meanwhile, and
+        the same report is not rendered again until the data changes (report_lines).
         """
-        if len(self.students) == 0:
-            print("     < Nothing to Display >")
-            return
+        print("\n".join(self.report_lines(mode)))
+
+    @metrics.timed("db.report_lines")
+    def report_lines(self, mode: int, page: int | None = None, size: int = 20) -> list[str]:
+        """
+        show_students(mode) as lines; with 'page' (1 = first), only that page of 'size'
+        students (modes 1 and 2; mode 2 pages come straight from the ranking).
+        Rendered from a snapshot and kept in an LRU cache keyed by (mode, page, size,
+        version), so showing a report again before anything changed is a dict lookup.
+        Mode 1 (names, ids, emails) uses the roster version, which only moves when
+        students are added or removed, so enrolments do not render it again.
+        The list is shared with the cache: do not change it.
+        """
+        if mode == 2:
+            self.ranking()      # built now, so the snapshot streams it instead of sorting
+        page = None if mode not in (1, 2) else page
+        with self._mutex:       # a version always matches the data it was read with
+            key = (mode, page, size, self._report_version(mode))
+            lines = self._report_cache.get(key)
+            if lines is not None:
+                self._report_cache.move_to_end(key)
+                metrics.add("db.report_cache.hits")
+                return lines
+            snap = self.snapshot()
+        metrics.add("db.report_cache.misses")
+        lines = self._render_report(snap, mode, page, size)
+        with self._mutex:
+            self._cache_report(key, lines)
+        return lines
 
+    def _report_version(self, mode: int) -> int:
+        return self._roster_version if mode == 1 else self._version
+
+    def _render_report(self, snap: Snapshot, mode: int, page: int | None, size: int) -> list[str]:
+        if len(snap) == 0:
+            return ["     < Nothing to Display >"]
+        if page is not None and (page < 1 or size < 1):
+            return []
         if mode == 1:
             # Simple list
-            for s in self.students:
-                print(f"{s.name} : : {s.id} --> Email: {s.email}")
-
-        elif mode == 2:
+            students = iter(snap) if page is None else islice(snap, (page - 1) * size, page * size)
+            return [f"{s.name} : : {s.id} --> Email: {s.email}" for s in students]
+        if mode == 2:
             # Group by grade (I print sorted by overall, showing the overall grade)
-            sorted_students = sorted(self.students, key=lambda x: x.overall)
-            for s in sorted_students:
-                overall_grade = check_func.get_grade(s.overall)
-                print(f"{overall_grade} --> [{s.name} : : {s.id} --> GRADE: {overall_grade} - MARK: {s.overall}]")
-
-        else:
-            # Partition into PASS/FAIL
-            fails, passes = [], []
-            for s in self.students:
-                overall_grade = check_func.get_grade(s.overall)
-                line = f"{s.name} : : {s.id} --> GRADE: {overall_grade} - MARK: {s.overall}"
-                (passes if s.status else fails).append(line)
-
-            print(f"FAIL --> {fails}")
-            print(f"PASS --> {passes}")
+            students = snap.by_overall() if page is None else snap.page_by_overall(page, size)
+            return [self.ranking_line(s) for s in students]
+        # Partition into PASS/FAIL
+        return snap.analytics().render_partition()
+
+    def clear_report_cache(self) -> None:
+        """Forget every rendered report (the next report_lines renders again; benchmarks use it)."""
+        with self._mutex:
+            self._report_cache.clear()
+            self._cached_lines = 0
+
+    def _cache_report(self, key: tuple, lines: list[str]) -> None:
+        """Keep a rendered report; reports of older versions can never be asked for again, so they go."""
+        cache = self._report_cache
+        for old in [k for k in cache if k[3] != self._report_version(k[0])]:
+            self._cached_lines -= len(cache.pop(old))
+        if key[3] != self._report_version(key[0]) or len(lines) > self.REPORT_CACHE_LINES:
+            return      # changed while it was rendered / too big to keep
+        cache[key] = lines
+        self._cached_lines += len(lines)
+        while len(cache) > self.REPORT_CACHE_SIZE or self._cached_lines > self.REPORT_CACHE_LINES:
+            _key, dropped = cache.popitem(last=False)
+            self._cached_lines -= len(dropped)
+
+    # -----------------------------
+    # running cohort totals + ranking / search indexes
+    # -----------------------------
+    def _stats_add(self, student: Student) -> None:
+        if self._stats is not None:
+            self._stats.add_student(student)
+        if self._ranking is not None:
+            self._ranking.add_student(student)
+        if self._search is not None:
+            self._search.add_student_marks(student)
+
+    def _stats_discard(self, student: Student) -> None:
+        if self._stats is not None:
+            self._stats.discard_student(student)
+        if self._ranking is not None:
+            self._ranking.discard_student(student)
+        if self._search is not None:
+            self._search.discard_student_marks(student)
+
+    def cohort_stats(self) -> CohortStats:
+        """The running totals; counted from the records the first time (raw ones stay raw)."""
+        if self._stats is None:
+            stats = CohortStats()
+            for rec in self._by_id.values():
+                if isinstance(rec, Student):
+                    stats.add_student(rec)
+                else:
+                    stats.add_record(self.storage.decode(rec))
+            self._stats = stats
+        return self._stats
+
+    @metrics.timed("db.stats")
+    def stats(self) -> dict:
+        """
+        Cohort figures without a scan: {"students", "grades", "pass", "fail",
+        "overall_sum", "overall_mean", "enrolments", "subject_marks"}.
+        """
+        return self.cohort_stats().as_dict()
+
+    def ranking(self) -> RankingIndex:
+        """Students sorted by overall; built from the records the first time (raw ones stay raw)."""
+        if self._ranking is None:
+            ranking = RankingIndex()
+            ranking.add_many(self._overall_rows())
+            self._ranking = ranking
+        return self._ranking
+
+    def _overall_rows(self):
+        """(overall, id) of every student; raw records are decoded but not turned into Students."""
+        for sid, rec in self._by_id.items():
+            if isinstance(rec, Student):
+                yield rec.overall, rec._id
+            else:
+                yield float(self.storage.decode(rec).get("overall", 0)), sid
+
+    def search_index(self) -> StudentIndex:
+        """The find() indexes; built from the records the first time (the ranking too, same pass)."""
+        if self._search is None:
+            search = StudentIndex()
+            search.build(rec.to_dict() if isinstance(rec, Student) else self.storage.decode(rec)
+                         for rec in self._by_id.values())
+            if self._ranking is None:
+                ranking = RankingIndex()
+                ranking.add_many(search.overall_rows())
+                self._ranking = ranking
+            self._search = search
+        return self._search
+
+    @metrics.timed("db.find")
+    def find_ids(self, name_prefix: str | None = None, grade: str | None = None,
+                 status: str | bool | None = None, mark_between: tuple[float, float] | None = None,
+                 enrolled_in: str | int | None = None) -> list[str]:
+        """
+        Ids (sorted) of the students matching ALL the given conditions:
+          name_prefix  : start of the name or of any word in it ("ben", "mart", "ben m")
+          grade        : overall grade "Z" / "P" / "C" / "D" / "HD"
+          status       : "PASS" / "FAIL" (or True / False)
+          mark_between : (low, high) overall, both included
+          enrolled_in  : subject id ("042" or 42)
+        Raises ValueError for a condition that cannot match anything (bad grade, ...).
+        """
+        if grade is not None:
+            labels = {label.upper(): label for label in self.search_index().policy.labels}
+            if grade.strip().upper() not in labels:
+                raise ValueError(f"grade must be one of {', '.join(labels.values())}")
+            grade = labels[grade.strip().upper()]
+        if isinstance(status, str):
+            if status.strip().upper() not in ("PASS", "FAIL"):
+                raise ValueError("status must be PASS or FAIL")
+            status = status.strip().upper() == "PASS"
+        if mark_between is not None:
+            low, high = (float(m) for m in mark_between)
+            mark_between = (low, high)
+        if enrolled_in is not None:
+            enrolled_in = int(enrolled_in)
+        index = self.search_index()
+        ids, driver = index.search(self.ranking(), name_prefix, grade, status, mark_between, enrolled_in)
+        metrics.add(f"db.find.by_{driver}")
+        return [f"{sid:06d}" for sid in ids]
 
+    def find(self, name_prefix: str | None = None, grade: str | None = None,
+             status: str | bool | None = None, mark_between: tuple[float, float] | None = None,
+             enrolled_in: str | int | None = None, limit: int | None = None) -> list[Student]:
+        """find_ids() as Students (only the first 'limit' are built when given)."""
+        ids = self.find_ids(name_prefix, grade, status, mark_between, enrolled_in)
+        if limit is not None:
+            ids = ids[:limit]
+        return [self._get(sid) for sid in ids]
+
+    def _ranked(self, rows):
+        """(overall, id) rows -> Students (only these ones are built)."""
+        for _overall, sid in rows:
+            stu = self._get(sid)
+            if stu is not None:
+                yield stu
+
+    def iter_by_overall(self, descending: bool = False):
+        """Yield every Student by overall, lowest first (or highest first), one at a time."""
+        ranking = self.ranking()
+        return self._ranked(ranking.descending() if descending else ranking.ascending())
+
+    @metrics.timed("db.top_students")
+    def top_students(self, k: int = 10) -> list[Student]:
+        """The k students with the highest overall, best first."""
+        return list(self._ranked(self.ranking().top(k)))
+
+    @metrics.timed("db.bottom_students")
+    def bottom_students(self, k: int = 10) -> list[Student]:
+        """The k students with the lowest overall, lowest first."""
+        return list(self._ranked(self.ranking().bottom(k)))
+
+    @metrics.timed("db.students_page")
+    def students_page(self, page: int, size: int = 20, descending: bool = False) -> list[Student]:
+        """Page 'page' (1 = first) of 'size' students by overall, lowest first by default."""
+        return list(self._ranked(self.ranking().page(page, size, descending)))
+
+    def page_count(self, size: int = 20) -> int:
+        return self.ranking().page_count(size)
+
+    def students_between(self, low: float, high: float):
+        """Yield students with low <= overall <= high, lowest first."""
+        return self._ranked(self.ranking().between(low, high))
+
+    @staticmethod
+    def ranking_line(s: Student) -> str:
+        """One show_students(2) line: 'GRADE --> [name : : id --> GRADE: g - MARK: m]'."""
+        grade = grading.policy().grade(s.overall)
+        return f"{grade} --> [{s.name} : : {s.id} --> GRADE: {grade} - MARK: {s.overall}]"
+
+    def analytics(self) -> CohortAnalytics:
+        """Marks/status of all students (one snapshot) as arrays, for grouping and statistics."""
+        return self.snapshot().analytics()
+
+    @metrics.timed("db.subject_report")
+    def subject_report(self, workers: int | None = None, snapshot: Snapshot | None = None) -> list[dict]:
+        """
+        Every subject seen from its side, by subject id (SubjectStats.rows):
+        {"subject", "students", "mean", "min", "median", "max", "fail", "fail_rate", "grades"}.
+        The students are split into chunks of REPORT_CHUNK that are counted in a
+        process pool of 'workers' (default: one per CPU, from REPORT_PARALLEL_MIN
+        students up) and the partial counts merged. Raw JSON records go to the
+        workers as text and only their subject list is parsed there; no Student is built.
+        Counted from 'snapshot' (default: a new one), so no lock is needed meanwhile.
+        """
+        snap = snapshot or self.snapshot()
+        if workers is None:
+            workers = os.cpu_count() or 1 if len(snap) >= self.REPORT_PARALLEL_MIN else 1
+        chunks, chunk = [], []
+        for rec in snap.values():
+            if isinstance(rec, Student):
+                rec = [(sub.id, sub.mark) for sub in rec.subjects]
+            elif not isinstance(rec, str):
+                rec = [(sub["id"], sub["mark"]) for sub in self.storage.decode(rec).get("subjects", [])]
+            chunk.append(rec)
+            if len(chunk) == self.REPORT_CHUNK:
+                chunks.append(chunk)
+                chunk = []
+        if chunk:
+            chunks.append(chunk)
+        return SubjectStats.count_chunks(chunks, workers).rows()
+
+    # -----------------------------
+    # grade policy
+    # -----------------------------
+    @metrics.timed("db.regrade")
+    @_write_op
+    def regrade(self, policy: GradePolicy) -> int | None:
+        """
+        Put 'policy' in force and rewrite the stored subject grades and PASS/FAIL of
+        every student with it, in ONE full write (marks and overall do not change).
+        The policy is saved with the data (storage.save_policy), so every process
+        that loads this data grades, and works out PASS/FAIL, the same way.
+        All marks are graded in one call (GradePolicy.grades: NumPy / lookup table),
+        then the storage is re-read lazily, so no Student has to be built.
+        Returns how many students changed PASS/FAIL (None if the write failed).
+        """
+        self._clear_pending()       # the rewrite includes every queued change
+        with metrics.timer("db.to_dicts"):
+            records = list(self._records())
+        marks = [sub["mark"] for rec in records for sub in rec.get("subjects", [])]
+        grades = iter(policy.grades(marks))
+        changed = 0
+        for rec in records:
+            subjects = rec.get("subjects", [])
+            for sub in subjects:
+                sub["grade"] = next(grades)
+            status = bool(subjects) and policy.passed(float(rec.get("overall", 0)))
+            if status != bool(rec.get("status", False)):
+                changed += 1
+            rec["status"] = status
+        try:
+            self.storage.save_all(records)
+            self.storage.save_policy(policy.to_dict())
+            self.storage.mark_written()
+        except Exception as e:
+            print(f"[regrade] Error: {e}")
+            return None
+        self.reload()       # puts the saved policy in force; totals, ranking and search rebuilt on next use
+        return changed
+
+    @metrics.timed("db.remove_student")
+    @_write_op
     def remove_student(self, student_id: str) -> bool:
         """
         Remove a student by id. Returns True if removed, False if not found.
         """
-        target = f"{int(student_id):06d}"
-        for s in list(self.students):
-            if s.id == target:
-                self.students.remove(s)
-                self.save_students()
-                return True
-        return False
+        stu = self._find_student(student_id)
+        if not stu:
+            return False
+        self._unindex_student(stu)
+        self._persist_removal(stu.id)
+        return True
 
+    @metrics.timed("db.remove_all")
+    @_write_op
     def remove_all(self) -> str:
         self.students = []
         self.save_students()
@@ -317,7 +1308,40 @@ class Database:
     
     def check_db_email(self, email):
         """Return True if the email is available."""
-        for stu in self.students:
-            if stu.email.strip().lower() == email:
-                return False
-        return True
\ No newline at end of file
+        return self._email_available(email)
+
+# ---------------------------------------------------------------------
+# 4) LazyDatabase (opened on first use)
+
+class LazyDatabase:
+    """
+    Stands in for Database(*args, **kwargs) without opening it: the storage is
+    only read the first time anything is asked of it (or on open()). main.py and
+    controllers.py keep their shared database in one, so importing them (or
+    showing the first menu / window) does not wait for a big students.data.
+    Every attribute is passed to the real Database.
+    """
+    __slots__ = ("_args", "_kwargs", "_db", "_lock")
+
+    def __init__(self, *args, **kwargs):
+        object.__setattr__(self, "_args", args)
+        object.__setattr__(self, "_kwargs", kwargs)
+        object.__setattr__(self, "_db", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def open(self) -> Database:
+        """The real Database (opened now if it was not yet)."""
+        if self._db is None:
+            with self._lock:        # two threads asking first still open it once
+                if self._db is None:
+                    object.__setattr__(self, "_db", Database(*self._args, **self._kwargs))
+        return self._db
+
+    def is_open(self) -> bool:
+        return self._db is not None
+
+    def __getattr__(self, name):
+        return getattr(self.open(), name)
+
+    def __setattr__(self, name, value) -> None:
+        setattr(self.open(), name, value)
@@ -5,15 +5,46 @@ This file connects the menu buttons/GUI to the data logic.
 It uses Database, Student, and Subject classes from classes.py
 and the validation functions from check_func.py
 
+Every function here holds db_lock while it runs, so the shared Database is
+used by one thread at a time (the GUI runs these calls on a worker thread,
+see gui_worker.py). The long reports (students_report, subject_report) only
+hold it to take a snapshot and build their result from that without the lock.
+
 Nicha: Final checked
 """
 
-from classes import Database
+import functools
+import threading
+
+from classes import LazyDatabase
 import check_func
+import grading
+import metrics
+
+# The shared Database (journal mode: each change appends one line). It is opened
+# on first use, so importing this module does not read students.data.
+db = LazyDatabase(journal=True)
+
+# one controllers call at a time, from any thread (re-entrant: a call may call another)
+db_lock = threading.RLock()
+
+
+def _locked(fn):
+    """Run fn while holding db_lock."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with db_lock:
+            return fn(*args, **kwargs)
+    return wrapper
 
-# Create a shared Database object
-db = Database()
 
+def open_database():
+    """Open the shared Database now instead of on the first call (GUI / API start-up)."""
+    db.open()
+
+
+@metrics.timed("controllers.register_student")
+@_locked
 def register_student(email, password, name):
 
     """Register a new student if email and password are valid."""
@@ -25,49 +56,180 @@ def register_student(email, password, name):
         return "Invalid password format. Must start with uppercase, ≥5 letters, end with ≥3 digits"
     
     # 2. Add student to database
-    student_id = db.add_student(email, password, name)
+    try:
+        student_id = db.add_student(email, password, name)
+    except ValueError as e:        # the storage cannot hold it (e.g. name too long)
+        return f"Cannot register: {e}"
     if student_id is None:
         return "This email is already registered."
     
     return f"Registration successful! Your Student ID is {student_id}"
 
 
+@metrics.timed("controllers.login")
+@_locked
 def login(email, password):
     """Find and return the student if credentials match."""
-    for stu in db.students:
-        if stu.email == email and stu.password == password:
-            return stu
+    db.refresh()    # another process may have registered / changed this student
+    stu = db.get_student_by_email(email)
+    if stu and stu.password == password:
+        return stu
     return None
 
 
+@metrics.timed("controllers.enrol_subject")
+@_locked
 def enrol_subject(student_id):
     """Let the student enrol in a subject (max 4)."""
     return db.enrol(student_id)
 
 
+@metrics.timed("controllers.remove_subject")
+@_locked
 def remove_subject(student_id, subject_id):
     """Remove one subject by ID."""
     return db.remove_subject(student_id, subject_id)
 
 
+@metrics.timed("controllers.enrol_many")
+@_locked
+def enrol_many(operations):
+    """Batch enrol: [(student_id, count), ...] -> one message per operation, one save."""
+    return db.enrol_many(operations)
+
+
+@metrics.timed("controllers.remove_subjects_many")
+@_locked
+def remove_subjects_many(operations):
+    """Batch drop: [(student_id, subject_id), ...] -> one message per operation, one save."""
+    return db.remove_subjects_many(operations)
+
+
+@metrics.timed("controllers.change_password")
+@_locked
 def change_password(student_id, new_password):
     """Change the student’s password if valid."""
     if not check_func.check_password(new_password):
         return "Invalid password format."
-    success = db.change_password(student_id, new_password)
+    try:
+        success = db.change_password(student_id, new_password)
+    except ValueError as e:        # the storage cannot hold it (too long)
+        return f"Cannot change the password: {e}"
     return "Password updated successfully." if success else "Student not found."
 
 
+@metrics.timed("controllers.list_students")
+@_locked
 def list_students(mode=1):
     """Show students (mode: 1=list, 2=group, 3=pass/fail)."""
+    db.refresh()
     db.show_students(mode)
 
 
+def _snapshot(ranked=False):
+    """Up-to-date snapshot of the Database, taken under db_lock (reading it needs no lock)."""
+    with db_lock:
+        db.refresh()
+        if ranked:
+            db.ranking()
+        return db.snapshot()
+
+
+@metrics.timed("controllers.students_report")
+def students_report(mode=1):
+    """
+    Same reports as list_students, returned as data instead of printed:
+      1 -> [{"id", "name", "email"}]
+      2 -> [{"id", "name", "grade", "overall", "status"}] lowest overall first
+      3 -> {"fail": [...], "pass": [...]}
+    Built from a snapshot without holding db_lock, so other calls go on meanwhile.
+    """
+    snap = _snapshot(ranked=mode == 2)
+    if mode == 1:
+        return [{"id": r["id"], "name": r["name"], "email": r["email"]} for r in snap.records()]
+    if mode == 2:
+        return [_ranking_row(s) for s in snap.by_overall()]
+    stats = snap.analytics()
+    fails, passes = stats.partition()
+    return {"fail": stats.rows_as_dicts(fails), "pass": stats.rows_as_dicts(passes)}
+
+
+@metrics.timed("controllers.ranking_page")
+@_locked
+def ranking_page(page=1, size=20, descending=False):
+    """
+    One page of the ranking (students_report(2) rows), without building the rest:
+    {"page", "pages", "size", "students": [{"id", "name", "grade", "overall", "status"}]}
+    """
+    db.refresh()
+    return {"page": page, "pages": db.page_count(size), "size": size,
+            "students": [_ranking_row(s) for s in db.students_page(page, size, descending)]}
+
+
+@metrics.timed("controllers.find_students")
+@_locked
+def find_students(name_prefix=None, grade=None, status=None, mark_between=None, enrolled_in=None,
+                  limit=100):
+    """
+    Indexed search (Database.find): {"count", "students": first 'limit' rows as in ranking_page}.
+    Raises ValueError for a bad grade / status / subject id.
+    """
+    db.refresh()
+    ids = db.find_ids(name_prefix, grade, status, mark_between, enrolled_in)
+    return {"count": len(ids), "students": [_ranking_row(db.get_student(sid)) for sid in ids[:limit]]}
+
+
+def _ranking_row(s):
+    return {"id": s.id, "name": s.name, "grade": grading.policy().grade(s.overall),
+            "overall": s.overall, "status": "PASS" if s.status else "FAIL"}
+
+
+@metrics.timed("controllers.cohort_stats")
+@_locked
+def cohort_stats():
+    """Grade counts, pass/fail, mean overall and subject-mark counts (running totals, no scan)."""
+    db.refresh()
+    return db.stats()
+
+
+@metrics.timed("controllers.subject_report")
+def subject_report(subject_id=None):
+    """
+    Per-subject figures (Database.subject_report): [{"subject", "students", "mean", "min",
+    "median", "max", "fail", "fail_rate", "grades"}], or only the one subject asked for.
+    Counted from a snapshot without holding db_lock.
+    """
+    rows = db.subject_report(snapshot=_snapshot())
+    if subject_id is not None:
+        wanted = f"{int(subject_id):03d}"
+        rows = [row for row in rows if row["subject"] == wanted]
+    return rows
+
+
+@metrics.timed("controllers.get_student")
+@_locked
+def get_student(student_id):
+    """Latest copy of one student (None if removed meanwhile)."""
+    db.refresh()
+    return db.get_student(student_id)
+
+
+@metrics.timed("controllers.list_subjects")
+@_locked
+def list_subjects(student_id):
+    """Subjects of one student as dicts: [{"id", "mark", "grade"}]."""
+    return [sub.to_dict() for sub in db.list_subjects(student_id)]
+
+
+@metrics.timed("controllers.remove_student")
+@_locked
 def remove_student(student_id):
     """Remove one student."""
     return "Removed." if db.remove_student(student_id) else "Student not found."
 
 
+@metrics.timed("controllers.clear_all")
+@_locked
 def clear_all():
     """Clear all student data (admin only)."""
     return db.remove_all()
\ No newline at end of file
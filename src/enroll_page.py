@@ -6,88 +6,96 @@ Tkinter window for a logged-in student to manage enrolments.
 Design choices:
 - This GUI calls functions in controllers.py (not classes.Database directly).
 - After each action (enrol/remove/change password), we fetch fresh data.
+- Every controllers call runs in the background (gui_worker.UiWorker), so the
+  window does not freeze while the data file is written; the buttons are
+  disabled until the answer is back.
 """
 
 import tkinter as tk
 from tkinter import messagebox, simpledialog
 import controllers  # our logic layer, not mess with classes.py
+from gui_worker import UiWorker
 
-def _fetch_student_by_email(email):
-    """
-    Helper: get a fresh Student object by email.
-    Because controllers.login(email, pw) needs a password, we loop the DB here.
-    """
-    for stu in controllers.db.students:
-        if stu.email == email:
-            return stu
-    return None
+NOT_FOUND = "Student not found."
 
-def _refresh_student(student):
-    """Return the latest copy of this student from the DB by ID."""
-    # controllers keeps db in memory; reload the reference each time to avoid stale data
-    sid = student.id
-    for stu in controllers.db.students:
-        if stu.id == sid:
-            return stu
-    return None
-
-def show_subjects(student):
-    """Show the current list of enrolled subjects in a messagebox."""
-    fresh = _refresh_student(student)
-    if not fresh:
-        messagebox.showerror("Error", "Student not found.")
-        return
-
-    subs = controllers.db.list_subjects(fresh.id)
-    if not subs:
-        messagebox.showinfo("Subjects", "Showing 0 subjects")
-        return
 
-    lines = [f"Showing {len(subs)} subjects", ""]
-    for s in subs:
-        lines.append(f"[ Subject::{s.id} -- mark = {s.mark} -- grade = {s.grade} ]")
-    messagebox.showinfo("Subjects", "\n".join(lines))
+def _refresh_student(student):
+    """Return the latest copy of this student from the DB by ID (runs on the worker)."""
+    return controllers.get_student(student.id)
 
-def enrol_one(student):
+def show_subjects(student, worker):
+    """Show the current list of enrolled subjects in a messagebox."""
+    def work():
+        fresh = _refresh_student(student)
+        return None if not fresh else controllers.list_subjects(fresh.id)
+
+    def done(subs):
+        if subs is None:
+            messagebox.showerror("Error", NOT_FOUND)
+            return
+        if not subs:
+            messagebox.showinfo("Subjects", "Showing 0 subjects")
+            return
+        lines = [f"Showing {len(subs)} subjects", ""]
+        for s in subs:
+            lines.append(f"[ Subject::{s['id']} -- mark = {s['mark']} -- grade = {s['grade']} ]")
+        messagebox.showinfo("Subjects", "\n".join(lines))
+
+    worker.submit(work, on_done=done)
+
+def enrol_one(student, worker):
     """Ask controllers to enrol one new subject (max 4). Show the result message."""
-    fresh = _refresh_student(student)
-    if not fresh:
-        messagebox.showerror("Error", "Student not found.")
-        return
+    def work():
+        fresh = _refresh_student(student)
+        # controllers.enrol_subject returns message string
+        return None if not fresh else controllers.enrol_subject(fresh.id)
 
-    result = controllers.enrol_subject(fresh.id)
-    # controllers.enrol_subject returns message string
-    messagebox.showinfo("Enrollment", result)
+    def done(result):
+        if result is None:
+            messagebox.showerror("Error", NOT_FOUND)
+        else:
+            messagebox.showinfo("Enrollment", result)
 
-def remove_subject(student):
-    """Prompt for a subject ID and remove it via controllers."""
-    fresh = _refresh_student(student)
-    if not fresh:
-        messagebox.showerror("Error", "Student not found.")
-        return
+    worker.submit(work, on_done=done)
 
+def remove_subject(student, worker):
+    """Prompt for a subject ID and remove it via controllers."""
     sub_id = simpledialog.askstring("Remove Subject", "Enter Subject ID (e.g., 001):")
     if not sub_id:
         return  # user cancelled
-    msg = controllers.remove_subject(fresh.id, sub_id.strip())
-    messagebox.showinfo("Remove Subject", msg)
 
-def change_password(student):
-    """Prompt for a new password and update it via controllers (with validation)."""
-    fresh = _refresh_student(student)
-    if not fresh:
-        messagebox.showerror("Error", "Student not found.")
-        return
+    def work():
+        fresh = _refresh_student(student)
+        return None if not fresh else controllers.remove_subject(fresh.id, sub_id.strip())
+
+    def done(msg):
+        if msg is None:
+            messagebox.showerror("Error", NOT_FOUND)
+        else:
+            messagebox.showinfo("Remove Subject", msg)
 
+    worker.submit(work, on_done=done)
+
+def change_password(student, worker):
+    """Prompt for a new password and update it via controllers (with validation)."""
     new_pw = simpledialog.askstring("Change Password", "Enter new password:", show="*")
     if not new_pw:
         return
-    msg = controllers.change_password(fresh.id, new_pw.strip())
-    # controllers.change_password returns a message or validation error
-    if "Invalid" in msg:
-        messagebox.showerror("Change Password", msg)
-    else:
-        messagebox.showinfo("Change Password", msg)
+
+    def work():
+        fresh = _refresh_student(student)
+        return None if not fresh else controllers.change_password(fresh.id, new_pw.strip())
+
+    def done(msg):
+        # controllers.change_password returns a message or validation error
+        if msg is None:
+            messagebox.showerror("Error", NOT_FOUND)
+        elif "Invalid" in msg:
+            messagebox.showerror("Change Password", msg)
+        else:
+            messagebox.showinfo("Change Password", msg)
+
+    worker.submit(work, on_done=done)
 
 def enroll_window(parent, student):
     """
@@ -114,25 +122,22 @@ def enroll_window(parent, student):
 
     tk.Label(win, text=f"Welcome, {current_student.name}!", font=("Arial", 14)).pack(pady=10)
 
-    tk.Button(
-        win, text="Enroll", width=20,
-        command=lambda: enrol_one(current_student)
-    ).pack(pady=4)
-
-    tk.Button(
-        win, text="Show Subjects", width=20,
-        command=lambda: show_subjects(current_student)
-    ).pack(pady=4)
-
-    tk.Button(
-        win, text="Remove Subject", width=20,
-        command=lambda: remove_subject(current_student)
-    ).pack(pady=4)
-
-    tk.Button(
-        win, text="Change Password", width=20,
-        command=lambda: change_password(current_student)
-    ).pack(pady=4)
+    # one worker per window: its action buttons are disabled while a call runs
+    worker = UiWorker(win)
+
+    actions = [
+        ("Enroll", enrol_one),
+        ("Show Subjects", show_subjects),
+        ("Remove Subject", remove_subject),
+        ("Change Password", change_password),
+    ]
+    for text, action in actions:
+        button = tk.Button(
+            win, text=text, width=20,
+            command=lambda action=action: action(current_student, worker)
+        )
+        button.pack(pady=4)
+        worker.buttons.append(button)
 
     tk.Button(
         win, text="Close", width=20,
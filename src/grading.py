@@ -0,0 +1,171 @@
+"""
+grading.py
+----------
+The grade policy: which mark gets which grade, and which overall mark passes.
+
+GradePolicy(cutoffs, labels, pass_mark)
+  cutoffs   : lowest mark of every grade above the first, ascending
+              default (50, 65, 75, 85)
+  labels    : one more than cutoffs, lowest grade first
+              default ("Z", "P", "C", "D", "HD")
+  pass_mark : overall mark needed for PASS (default 50)
+
+- grade(mark)      : a lookup table for the whole marks 0..100 (worked out once
+                     per policy), bisect for anything else (overall 67.25, ...)
+- codes(marks)     : grade index of a whole list/array of marks at once
+                     (NumPy searchsorted when installed, else bisect; NumPy is
+                     only imported on the first call)
+- passed(overall)  : overall >= pass_mark
+
+One policy is in force for the program (policy() / set_policy()). It is read at
+start from the JSON file named by STUDENTS_GRADE_POLICY, if set:
+    {"cutoffs": [50, 65, 75, 85], "labels": ["Z", "P", "C", "D", "HD"], "pass_mark": 50}
+Database.regrade(new_policy) switches policy, rewrites the stored grades and
+PASS/FAIL of every student in one write and saves the policy with the data
+('<data>.policy'). Every Database load puts the saved policy in force
+(use_stored), so it wins over STUDENTS_GRADE_POLICY, which is only used for
+data that was never regraded.
+"""
+
+import bisect
+import json
+import os
+
+np = None               # NumPy (optional dependency), imported on first bulk grading
+_numpy_tried = False
+
+POLICY_ENV = "STUDENTS_GRADE_POLICY"
+
+
+def numpy_or_none():
+    """
+    NumPy if it is installed, else None. Imported the first time it is needed,
+    not at start: the import alone takes about 0.1 s.
+    """
+    global np, _numpy_tried
+    if not _numpy_tried:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+        _numpy_tried = True
+    return np
+
+
+class GradePolicy:
+    __slots__ = ("cutoffs", "labels", "pass_mark", "_by_mark")
+
+    def __init__(self, cutoffs=(50, 65, 75, 85), labels=("Z", "P", "C", "D", "HD"),
+                 pass_mark: float = 50):
+        cutoffs = tuple(float(c) if c != int(c) else int(c) for c in cutoffs)
+        labels = tuple(str(label) for label in labels)
+        if len(labels) != len(cutoffs) + 1:
+            raise ValueError("labels must have exactly one more entry than cutoffs")
+        if any(a >= b for a, b in zip(cutoffs, cutoffs[1:])):
+            raise ValueError("cutoffs must be in increasing order")
+        if len(set(labels)) != len(labels):
+            raise ValueError("labels must be different from each other")
+        self.cutoffs = cutoffs
+        self.labels = labels
+        self.pass_mark = pass_mark
+        # grade of every whole mark 0..100, shared by all subjects
+        self._by_mark = tuple(labels[bisect.bisect_right(cutoffs, m)] for m in range(101))
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, GradePolicy) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"GradePolicy(cutoffs={self.cutoffs}, labels={self.labels}, pass_mark={self.pass_mark})"
+
+    # -----------------------------
+    # one mark
+    # -----------------------------
+    def grade(self, mark) -> str:
+        """Grade label of one mark (subject mark or overall)."""
+        if mark.__class__ is int and 0 <= mark <= 100:
+            return self._by_mark[mark]
+        return self.labels[bisect.bisect_right(self.cutoffs, mark)]
+
+    def code(self, mark) -> int:
+        """Index of the grade in labels (0 = lowest)."""
+        return bisect.bisect_right(self.cutoffs, mark)
+
+    def passed(self, overall: float) -> bool:
+        return overall >= self.pass_mark
+
+    # -----------------------------
+    # many marks at once
+    # -----------------------------
+    def codes(self, marks):
+        """Grade index of every mark (NumPy array if NumPy is installed, else a list)."""
+        np = numpy_or_none()
+        if np is not None:
+            return np.searchsorted(self.cutoffs, np.asarray(marks, dtype=float), side="right")
+        cutoffs = self.cutoffs
+        return [bisect.bisect_right(cutoffs, m) for m in marks]
+
+    def grades(self, marks) -> list[str]:
+        """Grade label of every mark."""
+        np = numpy_or_none()
+        if np is not None:
+            return np.asarray(self.labels, dtype=object)[self.codes(marks)].tolist()
+        by_mark, grade = self._by_mark, self.grade
+        return [by_mark[m] if m.__class__ is int and 0 <= m <= 100 else grade(m) for m in marks]
+
+    # -----------------------------
+    # saving / loading
+    # -----------------------------
+    def to_dict(self) -> dict:
+        return {"cutoffs": list(self.cutoffs), "labels": list(self.labels), "pass_mark": self.pass_mark}
+
+    @staticmethod
+    def from_dict(data: dict) -> "GradePolicy":
+        default = GradePolicy()
+        return GradePolicy(data.get("cutoffs", default.cutoffs), data.get("labels", default.labels),
+                           data.get("pass_mark", default.pass_mark))
+
+    @staticmethod
+    def load(path: str) -> "GradePolicy":
+        with open(path, encoding="utf-8") as f:
+            return GradePolicy.from_dict(json.load(f))
+
+
+DEFAULT = GradePolicy()
+
+
+def _from_env() -> GradePolicy:
+    path = os.environ.get(POLICY_ENV)
+    if not path:
+        return DEFAULT
+    try:
+        return GradePolicy.load(path)
+    except (OSError, ValueError, TypeError) as e:
+        print(f"[grading] Error: {e} (using the default grades)")
+        return DEFAULT
+
+
+_configured = _from_env()   # STUDENTS_GRADE_POLICY, or the defaults
+_policy = _configured
+
+
+def policy() -> GradePolicy:
+    """The policy in force."""
+    return _policy
+
+
+def set_policy(new_policy: GradePolicy) -> None:
+    """Put a policy in force (stored data is NOT changed - see Database.regrade)."""
+    global _policy
+    _policy = new_policy
+
+
+def use_stored(data: dict | None) -> None:
+    """
+    Put the policy saved with the data in force (called by Database on every
+    load), or the configured one (STUDENTS_GRADE_POLICY / defaults) if the data
+    has none. Raises ValueError / TypeError for a broken policy.
+    """
+    if data is not None and not isinstance(data, dict):
+        raise TypeError("a grade policy must be a JSON object")
+    set_policy(_configured if data is None else GradePolicy.from_dict(data))
@@ -0,0 +1,73 @@
+"""
+gui_worker.py
+-------------
+Keeps the Tkinter windows responsive while controllers work.
+
+A controllers call can take a while (it may rewrite students.data), and Tk
+cannot redraw or react to clicks until a handler returns. So the GUI pages
+hand the call to UiWorker:
+- the call runs on ONE background thread shared by all windows (calls never
+  overlap, and controllers.db_lock guards the Database as well)
+- the window's buttons are disabled until it finishes (no double submits)
+- the Tk thread checks for the result with widget.after() every POLL_MS and
+  then runs the on_done callback there (Tk widgets are only touched from the
+  Tk thread)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import TclError, messagebox
+
+POLL_MS = 20
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gui-db")
+
+
+class UiWorker:
+    """Runs controllers calls for one window; its buttons are disabled while a call runs."""
+
+    def __init__(self, widget, buttons=()):
+        self.widget = widget
+        self.buttons = list(buttons)
+        self.busy = False
+
+    def _set_buttons(self, state: str) -> None:
+        for button in self.buttons:
+            try:
+                button.configure(state=state)
+            except TclError:        # window closed meanwhile
+                pass
+
+    def submit(self, fn, *args, on_done=None) -> bool:
+        """
+        Run fn(*args) in the background, then on_done(result) on the Tk thread.
+        An exception is shown in an error box. Returns False if a call is still running.
+        """
+        if self.busy:
+            return False
+        self.busy = True
+        self._set_buttons("disabled")
+        future = _executor.submit(fn, *args)
+
+        def check():
+            if not future.done():
+                try:
+                    self.widget.after(POLL_MS, check)
+                except TclError:    # window closed: the call still finishes, nobody shows it
+                    self.busy = False
+                return
+            self.busy = False
+            self._set_buttons("normal")
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"[gui_worker] Error: {e}")
+                messagebox.showerror("Error", f"Something went wrong: {e}")
+                return
+            if on_done is not None:
+                on_done(result)
+
+        try:
+            self.widget.after(POLL_MS, check)
+        except TclError:            # window already gone: the result is not needed
+            self.busy = False
+        return True
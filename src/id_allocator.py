@@ -0,0 +1,117 @@
+"""
+id_allocator.py
+---------------
+Hands out free ids without guessing.
+
+The old way (random number, try again if taken) gets slower and slower as the
+id space fills up, and never finishes once it is full.
+
+IdAllocator (student ids 000001..999999):
+- a bitmap (one byte per id, ~1 MB) says which ids are taken -> O(1) check
+- while less than half the ids are taken, a random guess is free at least half
+  the time, so guessing stays cheap (2 tries on average at worst)
+- after that it switches to a shuffled list of the free ids and takes from the
+  end of it -> O(1) per id however full the space is
+- reserve(n) takes a whole block at once (bulk import), release() gives an id
+  back when a student is removed
+
+pick_free(low, high, used) is for small spaces with few used ids (subject ids
+of one student): one random draw, then skip over the used ids. No retries.
+"""
+
+import random
+from array import array
+
+
+def pick_free(low: int, high: int, used) -> int:
+    """Random id in low..high that is not in used (each free id equally likely)."""
+    used = sorted({u for u in used if low <= u <= high})
+    free = high - low + 1 - len(used)
+    if free <= 0:
+        raise ValueError(f"No free id left in {low}..{high}")
+    n = random.randint(low, low + free - 1)     # the n-th free id ...
+    for u in used:
+        if u <= n:
+            n += 1                              # ... moved past every used id below it
+        else:
+            break
+    return n
+
+
+class IdAllocator:
+    """Free/taken ids in low..high (ints)."""
+
+    DENSE = 0.5     # above this share taken, stop guessing and use the free list
+
+    def __init__(self, low: int = 1, high: int = 999_999):
+        self.low = low
+        self.high = high
+        self._taken = bytearray(high + 1)
+        self._used = 0
+        self._free: array | None = None     # shuffled free ids (may hold stale, taken ones)
+
+    @property
+    def capacity(self) -> int:
+        return self.high - self.low + 1
+
+    def __len__(self) -> int:
+        """Number of ids taken."""
+        return self._used
+
+    def is_taken(self, value: int) -> bool:
+        return bool(self._taken[value])
+
+    def mark_used(self, value: int) -> bool:
+        """Take a specific id (e.g. one loaded from storage). False if already taken."""
+        if not self.low <= value <= self.high:
+            raise ValueError(f"id {value} outside {self.low}..{self.high}")
+        if self._taken[value]:
+            return False
+        self._taken[value] = 1
+        self._used += 1
+        return True
+
+    def release(self, value: int) -> None:
+        """Give an id back (student removed)."""
+        if not self.low <= value <= self.high or not self._taken[value]:
+            return
+        self._taken[value] = 0
+        self._used -= 1
+        if self._free is not None:
+            # put it at a random place so the free list stays shuffled
+            self._free.append(value)
+            j = random.randrange(len(self._free))
+            self._free[j], self._free[-1] = self._free[-1], self._free[j]
+
+    def allocate(self) -> int:
+        """Take one random free id."""
+        if self._used >= self.capacity:
+            raise ValueError("No free student id left")
+        if self._free is None and self._used < self.capacity * self.DENSE:
+            while True:
+                value = random.randint(self.low, self.high)
+                if not self._taken[value]:
+                    break
+        else:
+            if self._free is None:
+                self._build_free_list()
+            while True:
+                value = self._free.pop()
+                if not self._taken[value]:  # skip ids taken by mark_used() since
+                    break
+        self._taken[value] = 1
+        self._used += 1
+        return value
+
+    def reserve(self, count: int) -> list[int]:
+        """Take count ids at once (bulk import). Give unused ones back with release()."""
+        if self._used + count > self.capacity:
+            raise ValueError(f"Only {self.capacity - self._used} free student ids left")
+        return [self.allocate() for _ in range(count)]
+
+    def _build_free_list(self) -> None:
+        """One pass over the bitmap (done once, when the space gets dense)."""
+        taken = self._taken
+        free = array("l", (i for i in range(self.low, self.high + 1) if not taken[i]))
+        random.shuffle(free)
+        self._free = free
@@ -6,15 +6,20 @@ GUI login window for GUIUniApp.
 Design:
 - GUI only talks to controllers.py (not directly to classes.Database()).
 - We validate inputs (empty, regex) before calling controllers.login().
+- controllers.login() runs in the background (gui_worker.UiWorker): it may
+  re-read the data file, and the window should not freeze meanwhile.
 - On success, we open the enrolment window and hide this login window.
+- Start-up: the window appears before students.data is read (controllers opens
+  the Database in the background), and the enrolment / register pages are only
+  imported when first opened.
 """
 
 from tkinter import *
 from tkinter import ttk, messagebox
 import check_func
 import controllers          # <- our layer
-from enroll_page import enroll_window
-from register_page import register_window
+from gui_worker import UiWorker
+# enroll_page / register_page are imported when their window is first opened
 
 
 def build_login_window():
@@ -48,29 +53,40 @@ def build_login_window():
             messagebox.showerror("Login Failed", "Incorrect email or password format")
             return
 
-        # 3) attempt login via controllers
-        student = controllers.login(email, pw)
-        if student is None:
-            # either email not found or wrong password
-            # (controllers.login checks both together)
-            messagebox.showerror("Login Failed", "Student doesn't exist or password is incorrect")
-            return
+        # 3) attempt login via controllers (on the worker thread)
+        def done(student):
+            if student is None:
+                # either email not found or wrong password
+                # (controllers.login checks both together)
+                messagebox.showerror("Login Failed", "Student doesn't exist or password is incorrect")
+                return
 
-        # 4) success: open enrolment window and hide login
-        root.withdraw()
-        enroll_window(root, student)
+            # 4) success: open enrolment window and hide login
+            from enroll_page import enroll_window
+            root.withdraw()
+            enroll_window(root, student)
+
+        worker.submit(controllers.login, email, pw, on_done=done)
 
     def handle_register():
+        from register_page import register_window
         root.withdraw()
         register_window(root)
 
     # buttons / links
-    ttk.Button(root, text="Login", command=handle_login).place(x=120, y=100)
+    login_button = ttk.Button(root, text="Login", command=handle_login)
+    login_button.place(x=120, y=100)
 
     Label(root, text="Don't have an account?").place(x=40, y=140)
     Button(root, text="Register now", fg="blue", cursor="hand2",
            relief=FLAT, command=handle_register).place(x=170, y=138)
 
+    # Login is disabled while a login is running (Enter is ignored then too)
+    worker = UiWorker(root, [login_button])
+    # the window shows straight away; the data file is read in the background
+    # (Login stays disabled until it is)
+    worker.submit(controllers.open_database)
+
     # enable pressing Enter to login
     root.bind("<Return>", lambda _e: handle_login())
 
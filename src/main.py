@@ -4,21 +4,126 @@ main.py — CLI entry for CLIUniApp
 Connects:
 - check_func.py   validation (email/password)
 - classes.py      Student, Subject, Database ** Read classes_design_note**
+- bulk.py         streaming CSV / NDJSON import and export
+- metrics.py      optional timings/counters and per-action cProfile
+
+Usage:
+    python main.py                                   # interactive menus
+    python main.py import FILE [--format csv|ndjson] [--rejects FILE] [--chunk N]
+    python main.py export FILE [--format csv|ndjson]
+    python main.py regrade POLICY.json               # new grade bands / pass mark for all students
+    python main.py --metrics [--metrics-out FILE]    # print (or save as JSON) timings on exit
+    python main.py --profile [--profile-dir DIR]     # cProfile every menu action separately
 """
 
+import argparse
+import sys
+
+import bulk
 import check_func
 import classes
+import grading
+import metrics
+from analytics import SubjectStats
+
+# One shared database instance for this file (journal mode: each change appends one line).
+# Opened on first use, so the first menu shows up without reading students.data.
+database = classes.LazyDatabase(journal=True)
+
+# cProfile per menu action (only when started with --profile)
+PROFILER = metrics.ActionProfiler()
 
-# One shared database instance for this file
-database = classes.Database()
+# students per page in the admin ranking report
+PAGE_SIZE = 20
 
 
 # -------------------------
 #  START
 # -------------------------
-def main():
-    print("Welcome to CLIUniApp")
-    show_cli()
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if args.metrics or args.metrics_out:
+        metrics.enable()        # before the database opens, so its load is in the numbers too
+    PROFILER.enabled = args.profile
+    try:
+        if args.command == "import":
+            import_cli(args)
+        elif args.command == "export":
+            export_cli(args)
+        elif args.command == "regrade":
+            regrade_cli(args)
+        else:
+            print("Welcome to CLIUniApp")
+            show_cli()
+    finally:
+        if args.profile:
+            PROFILER.dump(args.profile_dir)
+        if args.metrics or args.metrics_out:
+            metrics.dump(args.metrics_out)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="main.py", description="CLIUniApp")
+    parser.add_argument("--metrics", action="store_true",
+                        help="record call counts, latencies, saves and bytes written; print them on exit")
+    parser.add_argument("--metrics-out", metavar="FILE", help="write the metrics as JSON to FILE instead")
+    parser.add_argument("--profile", action="store_true", help="cProfile each menu action separately")
+    parser.add_argument("--profile-dir", metavar="DIR", default="profiles",
+                        help="where the .prof files go (default: profiles)")
+    sub = parser.add_subparsers(dest="command")
+
+    imp = sub.add_parser("import", help="bulk add students from a CSV / NDJSON file")
+    imp.add_argument("file")
+    imp.add_argument("--format", choices=bulk.FORMATS, help="default: from the file extension")
+    imp.add_argument("--rejects", help="where rejected rows go (default: FILE.rejects.EXT)")
+    imp.add_argument("--chunk", type=int, default=10_000, help="rows per commit (default 10000)")
+
+    exp = sub.add_parser("export", help="write all students to a CSV / NDJSON file")
+    exp.add_argument("file")
+    exp.add_argument("--format", choices=bulk.FORMATS, help="default: from the file extension")
+
+    reg = sub.add_parser("regrade", help="apply a grade policy (JSON file) to every stored student")
+    reg.add_argument("policy", help='e.g. {"cutoffs": [50, 65, 75, 85], "labels": ["Z", "P", "C", "D", "HD"], '
+                                    '"pass_mark": 50}')
+    return parser.parse_args(argv)
+
+
+# -------------------------
+#  BULK IMPORT / EXPORT
+# -------------------------
+def import_cli(args):
+    rejects = args.rejects or bulk.default_rejects_path(args.file)
+    imported, rejected = bulk.import_file(database, args.file, args.format, rejects, max(1, args.chunk))
+    print(f"Imported {imported} students.")
+    if rejected:
+        print(f"Rejected {rejected} rows -> {rejects}")
+
+
+def export_cli(args):
+    count = bulk.export_file(database, args.file, args.format)
+    print(f"Exported {count} students to {args.file}")
+
+
+def regrade_cli(args):
+    try:
+        policy = grading.GradePolicy.load(args.policy)
+    except (OSError, ValueError, TypeError) as e:
+        print(f"Cannot read the grade policy: {e}")
+        return
+    changed = database.regrade(policy)
+    if changed is None:
+        return
+    print(f"Regraded every student with {policy}; PASS/FAIL changed for {changed}.")
+    print(f"The policy is saved with the data ({database.storage.policy_file}), so the CLI, GUI and "
+          f"API server all grade this way from now on.")
+
+
+def read_option(prompt, menu):
+    """input() for a menu choice; with --profile the choice starts a new profiled action."""
+    PROFILER.stop()
+    option = input(prompt).strip()
+    PROFILER.start(f"{menu} {option.lower()}")
+    return option
 
 
 # -------------------------
@@ -26,7 +131,7 @@ def main():
 # -------------------------
 def show_cli():
     while True:
-        option = input("University System: (A)dmin, (S)tudent, or (X)exit: ").strip().upper()
+        option = read_option("University System: (A)dmin, (S)tudent, or (X)exit: ", "main").upper()
         if option == "A":
             admin_cli()
         elif option == "S":
@@ -44,7 +149,7 @@ def show_cli():
 def student_cli():
     """(l)ogin, (r)egister, e(x)it"""
     while True:
-        option = input("Student System (l/r/x): ").strip().lower()
+        option = read_option("Student System (l/r/x): ", "student").lower()
         if option == "l":
             login_cli()
         elif option == "r":
@@ -77,7 +182,13 @@ def register_cli():
 
         # 3) create
         name = input("Full Name: ").strip()
-        database.add_student(email, password, name)
+        try:
+            if database.add_student(email, password, name) is None:
+                print("This email already exists. Please try login instead.")
+                return
+        except ValueError as e:     # the storage cannot hold it (e.g. name too long)
+            print(f"Cannot register: {e}")
+            continue
         print(f"Student {name} registered successfully!\n")
         return
 
@@ -88,8 +199,8 @@ def register_cli():
 def login_cli():
     print("\n=== Student Login ===")
 
-    # always refresh from disk before login
-    database.students = database.load_students()
+    # pick up changes other processes (GUI, another CLI) made; no re-read if nothing changed
+    database.refresh()
 
     email = input("Email: ").strip().lower()
     password = input("Password: ")
@@ -98,7 +209,7 @@ def login_cli():
         print("Incorrect email or password format.")
         return
 
-    student = next((stu for stu in database.students if stu.email.strip().lower() == email), None)
+    student = database.get_student_by_email(email)
     if not student:
         print("Student not found.")
         return
@@ -119,7 +230,7 @@ def subject_enrolment_cli(student):
 
     print("\n=== Subject Enrolment Menu ===")
     while True:
-        option = input("Student Menu (c/e/r/s/x): ").strip().lower()
+        option = read_option("Student Menu (c/e/r/s/x): ", "enrolment").lower()
 
         if option == "c":
             new_pw = input("Enter new password: ").strip()
@@ -130,7 +241,11 @@ def subject_enrolment_cli(student):
             if not check_func.check_password(new_pw):
                 print("Invalid password format.")
                 continue
-            ok = database.change_password(student.id, new_pw)
+            try:
+                ok = database.change_password(student.id, new_pw)
+            except ValueError as e:     # the storage cannot hold it (too long)
+                print(f"Cannot change the password: {e}")
+                continue
             print("Password updated successfully." if ok else "Student not found.")
 
         elif option == "e":
@@ -138,14 +253,14 @@ def subject_enrolment_cli(student):
             msg = database.enrol(student.id)
             print(msg)
             # refresh local copy of student
-            student = next((s for s in database.students if s.id == student.id), student)
+            student = database.get_student(student.id) or student
 
         elif option == "r":
             subject_id = input("Enter subject ID to remove (e.g., 001): ").strip()
             msg = database.remove_subject(student.id, subject_id)
             print(msg)
             # refresh local copy
-            student = next((s for s in database.students if s.id == student.id), student)
+            student = database.get_student(student.id) or student
 
         elif option == "s":
             subs = database.list_subjects(student.id)
@@ -170,7 +285,8 @@ def subject_enrolment_cli(student):
 def admin_cli():
     print("\n=== Admin System ===")
     while True:
-        option = input(" Admin Menu (c/g/p/r/s/x): ").strip().lower()
+        option = read_option(" Admin Menu (c/f/g/p/r/s/t/u/x): ", "admin").lower()
+        database.refresh()      # reports show what other processes wrote too
 
         if option == "c":
             confirm = input("Are you sure to clear all student data? (y/n): ").strip().lower()
@@ -180,13 +296,19 @@ def admin_cli():
             else:
                 print("Cancelled.")
 
+        elif option == "f":
+            print("Search students (leave a field empty to skip it):")
+            search_students()
+
         elif option == "g":
             print("Group students by grade:")
-            database.show_students(2)
+            print_ranking_pages()
+            print_cohort_summary()
 
         elif option == "p":
             print("Partition students (PASS/FAIL):")
             database.show_students(3)
+            print_cohort_summary()
 
         elif option == "r":
             student_id = input("Enter Student ID to remove: ").strip()
@@ -199,6 +321,13 @@ def admin_cli():
             print("List of students:")
             database.show_students(1)
 
+        elif option == "t":
+            print_top_students()
+
+        elif option == "u":
+            print("Students per subject:")
+            print_subject_report()
+
         elif option == "x":
             print("Returning to main menu...")
             return
@@ -207,6 +336,99 @@ def admin_cli():
             print("Invalid option, please try again.")
 
 
+def print_ranking_pages():
+    """show_students(2) one page at a time (Enter = next page, b = back, q = stop); pages are cached."""
+    page_through(database.page_count(PAGE_SIZE), lambda page: database.report_lines(2, page, PAGE_SIZE))
+
+
+def page_through(pages, lines_of_page):
+    """Print page 1..pages (lines_of_page(n) -> lines); Enter = next page, b = back, q = stop."""
+    if pages == 0:
+        print("     < Nothing to Display >")
+        return
+    page = 1
+    while True:
+        for line in lines_of_page(page):
+            print(line)
+        if pages == 1:
+            return
+        choice = input(f"-- page {page}/{pages} -- (Enter=next, b=back, q=stop): ").strip().lower()
+        if choice == "q":
+            return
+        if choice == "b":
+            page = max(page - 1, 1)
+        elif page == pages:
+            return
+        else:
+            page += 1
+
+
+def search_students():
+    """Admin search: any mix of name prefix, grade, PASS/FAIL, mark range and subject."""
+    database.open()         # the grade policy saved with the data is in force once it is read
+    name = input("Name starts with: ").strip() or None
+    grade = input(f"Grade ({'/'.join(grading.policy().labels)}): ").strip() or None
+    status = input("Status (PASS/FAIL): ").strip() or None
+    low = input("Overall mark from: ").strip()
+    high = input("Overall mark to: ").strip()
+    subject = input("Enrolled in subject ID: ").strip() or None
+    try:
+        marks = (float(low or 0), float(high or 100)) if low or high else None
+        ids = database.find_ids(name, grade, status, marks, subject)
+    except ValueError as e:
+        print(f"Invalid search: {e}")
+        return
+    print(f"{len(ids)} student(s) found")
+
+    def lines(page):
+        start = (page - 1) * PAGE_SIZE
+        return [database.ranking_line(database.get_student(sid)) for sid in ids[start:start + PAGE_SIZE]]
+    if ids:
+        page_through(-(-len(ids) // PAGE_SIZE), lines)
+
+
+def print_top_students():
+    """Best (or lowest) k students by overall, straight from the ranking index."""
+    answer = input("How many students? (e.g. 10, or -10 for the lowest): ").strip()
+    try:
+        k = int(answer)
+    except ValueError:
+        print("Please enter a whole number.")
+        return
+    students = database.top_students(k) if k >= 0 else database.bottom_students(-k)
+    if not students:
+        print("     < Nothing to Display >")
+    for rank, s in enumerate(students, 1):
+        print(f"{rank:>3}. {database.ranking_line(s)}")
+
+
+def print_subject_report():
+    """Students, marks and fail rate of one subject, or of every subject a page at a time."""
+    answer = input("Subject ID (Enter = all subjects): ").strip()
+    if answer and not answer.isdigit():
+        print("Please enter a subject number.")
+        return
+    rows = database.subject_report()
+    if answer:
+        rows = [row for row in rows if row["subject"] == f"{int(answer):03d}"]
+    if not rows:
+        print("     < Nothing to Display >")
+        return
+
+    def lines(page):
+        start = (page - 1) * PAGE_SIZE
+        return [SubjectStats.render_row(row) for row in rows[start:start + PAGE_SIZE]]
+    page_through(-(-len(rows) // PAGE_SIZE), lines)
+
+
+def print_cohort_summary():
+    """Grade counts, pass rate, mean/std/percentiles under the g/p reports."""
+    stats = database.cohort_stats()     # running totals, no pass over the students
+    if stats.count:
+        for line in stats.render_summary():
+            print(line)
+
+
 # -------------------------
 #  RUN
 # -------------------------
@@ -0,0 +1,200 @@
+"""
+metrics.py
+----------
+Opt-in instrumentation for Database, storage and controllers.
+
+Off by default: a timed() function then only checks one flag before calling
+through. Turn it on with metrics.enable(), STUDENTS_METRICS=1, or
+'python main.py --metrics'.
+
+Recorded while on:
+  operations : per name ("db.enrol", "controllers.login", "storage.save_all", ...)
+               call count, total/mean/max ms and a latency histogram
+  counters   : plain totals ("storage.saves", "storage.bytes_written",
+               "storage.records_written", "db.loads", ...)
+
+metrics.snapshot() returns all of it as plain dicts; metrics.dump() prints it
+(or writes JSON to a file).
+
+ActionProfiler (used by 'python main.py --profile DIR') runs cProfile for one
+menu action at a time and keeps separate stats per action.
+"""
+
+import functools
+import io
+import json
+import os
+import time
+
+ENV = "STUDENTS_METRICS"
+ENABLED = os.environ.get(ENV, "") not in ("", "0")
+
+# histogram upper bounds in ms (last bucket: everything slower)
+BUCKETS_MS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+
+_ops: dict[str, list] = {}          # name -> [count, total_s, max_s, bucket counts]
+_counters: dict[str, float] = {}
+
+
+def enable(on: bool = True) -> None:
+    global ENABLED
+    ENABLED = on
+
+
+def reset() -> None:
+    _ops.clear()
+    _counters.clear()
+
+
+# -----------------------------
+# recording
+# -----------------------------
+def record(name: str, seconds: float) -> None:
+    """Add one call of 'name' that took 'seconds'."""
+    op = _ops.get(name)
+    if op is None:
+        op = _ops[name] = [0, 0.0, 0.0, [0] * (len(BUCKETS_MS) + 1)]
+    op[0] += 1
+    op[1] += seconds
+    op[2] = max(op[2], seconds)
+    ms = seconds * 1000
+    for i, bound in enumerate(BUCKETS_MS):
+        if ms <= bound:
+            break
+    else:
+        i = len(BUCKETS_MS)
+    op[3][i] += 1
+
+
+def add(name: str, amount: float = 1) -> None:
+    """Increase a counter (only while metrics are on)."""
+    if ENABLED:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def timed(name: str):
+    """Decorator: record every call of the function under 'name'."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+class timer:
+    """Context manager version of timed(): 'with metrics.timer("db.to_dicts"): ...'."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        if ENABLED:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.start is not None:
+            record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+# -----------------------------
+# reading
+# -----------------------------
+def _bucket_label(i: int) -> str:
+    return f"<={BUCKETS_MS[i]:g}ms" if i < len(BUCKETS_MS) else f">{BUCKETS_MS[-1]:g}ms"
+
+
+def snapshot() -> dict:
+    """{"operations": {name: {count, total_ms, mean_ms, max_ms, histogram}}, "counters": {...}}"""
+    operations = {}
+    for name, (count, total, biggest, buckets) in sorted(_ops.items()):
+        operations[name] = {
+            "count": count,
+            "total_ms": total * 1000,
+            "mean_ms": total / count * 1000,
+            "max_ms": biggest * 1000,
+            "histogram": {_bucket_label(i): n for i, n in enumerate(buckets) if n},
+        }
+    return {"operations": operations, "counters": dict(sorted(_counters.items()))}
+
+
+def render() -> list[str]:
+    """snapshot() as text lines."""
+    snap = snapshot()
+    lines = [f"{'operation':<28} {'calls':>7} {'total ms':>10} {'mean ms':>9} {'max ms':>9}  histogram"]
+    for name, op in snap["operations"].items():
+        hist = " ".join(f"{label}:{n}" for label, n in op["histogram"].items())
+        lines.append(f"{name:<28} {op['count']:>7} {op['total_ms']:>10.2f} "
+                     f"{op['mean_ms']:>9.3f} {op['max_ms']:>9.3f}  {hist}")
+    for name, value in snap["counters"].items():
+        lines.append(f"{name:<28} {value:>7g}")
+    return lines
+
+
+def dump(path: str | None = None) -> None:
+    """Print the metrics, or write them as JSON to path ("-" or None = print)."""
+    if path and path != "-":
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(snapshot(), f, indent=2)
+        print(f"Metrics written to {path}")
+    else:
+        print("\n".join(render()))
+
+
+# -----------------------------
+# cProfile per action
+# -----------------------------
+class ActionProfiler:
+    """
+    start(name) profiles until the next start()/stop(); stats are kept per name.
+    main.py starts one after every menu choice and stops it at the next prompt.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._stats: dict[str, "pstats.Stats"] = {}
+        self._current: tuple[str, "cProfile.Profile"] | None = None
+
+    def start(self, name: str) -> None:
+        if not self.enabled:
+            return
+        self.stop()
+        import cProfile     # only loaded with --profile
+        profile = cProfile.Profile()
+        self._current = (name, profile)
+        profile.enable()
+
+    def stop(self) -> None:
+        if self._current is None:
+            return
+        name, profile = self._current
+        profile.disable()
+        self._current = None
+        if name in self._stats:
+            self._stats[name].add(profile)
+        else:
+            import pstats
+            self._stats[name] = pstats.Stats(profile, stream=io.StringIO())
+
+    def dump(self, folder: str, top: int = 10) -> None:
+        """Write <folder>/<action>.prof for each action and print its top functions."""
+        self.stop()
+        os.makedirs(folder, exist_ok=True)
+        for name, stats in sorted(self._stats.items()):
+            safe = "".join(c if c.isalnum() else "_" for c in name)
+            path = os.path.join(folder, f"{safe}.prof")
+            stats.dump_stats(path)
+            out = io.StringIO()
+            stats.stream = out
+            stats.sort_stats("cumulative").print_stats(top)
+            print(f"\n=== profile: {name} ({path}) ===")
+            print(out.getvalue().strip())
@@ -0,0 +1,46 @@
+"""
+migrate_storage.py
+------------------
+Copy every student from one storage back end to another.
+
+Usage (from the src folder):
+    python migrate_storage.py students.data students.db     # JSON (+journal) -> SQLite
+    python migrate_storage.py students.db students.data     # SQLite -> JSON
+    python migrate_storage.py students.data students.bin    # JSON -> fixed-width binary records
+    python migrate_storage.py students.bin students.data    # binary -> JSON
+
+The back end is picked from the file extension (see storage.open_storage).
+The JSON journal, if present, is replayed, so the copy is up to date. The grade
+policy saved with the data (see Database.regrade), if any, is copied too.
+Afterwards point the CLI/GUI at the new file with STUDENTS_DATA=<file>.
+"""
+
+import sys
+
+from storage import open_storage
+
+
+def migrate(source: str, target: str) -> int:
+    """Copy all students from source to target. Returns the number copied."""
+    records = list(open_storage(source).load())
+    policy = open_storage(source).load_policy()
+    dest = open_storage(target)
+    dest.save_all(records)
+    if policy is not None:
+        dest.save_policy(policy)
+    dest.close()
+    return len(records)
+
+
+def main(argv: list[str]) -> int:
+    if len(argv) != 2:
+        print(__doc__)
+        return 1
+    source, target = argv
+    count = migrate(source, target)
+    print(f"Copied {count} students from {source} to {target}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -6,7 +6,8 @@ Tkinter window for student registration.
 Flow:
 - User types Name, Email, Password
 - We validate (empty, email, password)
-- We call controllers.register_student(email, password, name)
+- We call controllers.register_student(email, password, name) in the background
+  (gui_worker.UiWorker), so the window stays responsive while it saves
 - On success: show ID and return to login
 """
 
@@ -14,6 +15,7 @@ from tkinter import *
 from tkinter import ttk, messagebox
 import check_func              # for email/password validation
 import controllers             # for saving the new student to DB
+from gui_worker import UiWorker
 
 
 def register_window(parent):
@@ -71,22 +73,27 @@ def register_window(parent):
             )
             return
 
-        # 3) Ask controllers to create the student
+        # 3) Ask controllers to create the student (on the worker thread)
         #    It returns either a success message with ID or an error message.
-        result = controllers.register_student(email, pw, name)
+        def done(result):
+            if result.startswith("Registration successful"):
+                messagebox.showinfo("Registered", result)
+                _on_close()  # back to login
+            else:
+                messagebox.showerror("Register Failed", result)
 
-        if result.startswith("Registration successful"):
-            messagebox.showinfo("Registered", result)
-            _on_close()  # back to login
-        else:
-            messagebox.showerror("Register Failed", result)
+        worker.submit(controllers.register_student, email, pw, name, on_done=done)
 
     def handle_cancel():
         _on_close()
 
-    ttk.Button(win, text="Register", command=handle_register).place(x=120, y=150, width=90)
+    register_button = ttk.Button(win, text="Register", command=handle_register)
+    register_button.place(x=120, y=150, width=90)
     ttk.Button(win, text="Cancel", command=handle_cancel).place(x=230, y=150, width=90)
 
+    # Register is disabled while the request is running
+    worker = UiWorker(win, [register_button])
+
     # Press Enter to submit
     win.bind("<Return>", lambda _e: handle_register())
 
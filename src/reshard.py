@@ -0,0 +1,53 @@
+"""
+reshard.py
+----------
+Change the number of shard files of a sharded student store (offline: stop the
+CLI/GUI/API server first).
+
+Usage (from the src folder):
+    python reshard.py students.shards 16
+
+Every student is read from the current shards, written into a new folder with
+the new shard count, then the folders are swapped (the old one is removed).
+The journal of each shard, if any, is folded in.
+"""
+
+import os
+import shutil
+import sys
+
+from storage import ShardedStorage
+
+
+def reshard(folder: str, count: int) -> int:
+    """Rewrite folder with 'count' shards. Returns the number of students moved."""
+    folder = folder.rstrip("/\\")
+    if not os.path.exists(os.path.join(folder, ShardedStorage.MANIFEST)):
+        raise FileNotFoundError(f"{folder} is not a sharded store")
+    old = ShardedStorage(folder)
+    with old.lock():
+        records = list(old.load())
+        tmp = folder + ".reshard-tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        ShardedStorage(tmp, shards=count).save_all(records)
+        backup = folder + ".old"
+        shutil.rmtree(backup, ignore_errors=True)
+        os.replace(folder, backup)
+        os.replace(tmp, folder)
+        shutil.rmtree(backup)
+        old.mark_written()      # running readers see a new version and reload
+    return len(records)
+
+
+def main(argv: list[str]) -> int:
+    if len(argv) != 2 or not argv[1].isdigit() or int(argv[1]) < 1:
+        print(__doc__)
+        return 1
+    folder, count = argv[0], int(argv[1])
+    moved = reshard(folder, count)
+    print(f"Resharded {folder}: {moved} students in {count} shards")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
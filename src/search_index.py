@@ -0,0 +1,208 @@
+"""
+search_index.py
+---------------
+Secondary indexes behind Database.find() (admin search).
+
+StudentIndex keeps, for every student id:
+- names    : one sorted list of "word... \\t000123" keys, one key starting at
+             each word of the lower-case name ("ben martina", "martina"), so a
+             name prefix - of the first name, the surname or the whole name - is
+             ONE bisect range (a flattened trie: same prefix search, no node
+             objects per letter)
+- grades   : overall grade (grading.policy()) -> set of ids (grade buckets)
+- status   : PASS / FAIL -> set of ids
+- subjects : subject id -> set of ids enrolled in it (inverted index)
+- overall  : array of overall marks in hundredths, indexed by id (2 bytes each),
+             to check a mark range on a candidate
+Mark ranges are found with the Database's RankingIndex (analytics.py).
+
+search() is the planner: it counts how many students each given condition
+matches (a set size or a bisect range - no scan), walks the smallest one and
+checks the other conditions on those candidates only. Ids are ints inside.
+"""
+
+import bisect
+from array import array
+
+import grading
+from analytics import cents_range
+
+ID_SPAN = 1_000_000     # student ids are 000001..999999
+
+
+def normalise_name(name: str) -> str:
+    """Lower case, single spaces (how names are indexed and searched)."""
+    return " ".join(name.lower().split())
+
+
+class StudentIndex:
+    """Name / grade / status / subject indexes of all students (see the module notes)."""
+
+    def __init__(self):
+        self.policy = grading.policy()                  # grade buckets use the policy at build time
+        self._names: list[str] = []                     # sorted "suffix\t000123"
+        self._name_of: dict[int, str] = {}              # id -> " " + normalised name
+        self._grades: dict[str, set[int]] = {g: set() for g in self.policy.labels}
+        self._status: dict[bool, set[int]] = {True: set(), False: set()}
+        self._subjects: dict[int, set[int]] = {}
+        self._overall = array("H", bytes(2 * ID_SPAN))
+
+    def __len__(self) -> int:
+        return len(self._name_of)
+
+    # -----------------------------
+    # keeping it up to date
+    # -----------------------------
+    @staticmethod
+    def _name_keys(name: str, sid: int) -> list[str]:
+        words = name.split(" ")
+        return [f"{' '.join(words[i:])}\t{sid:06d}" for i in range(len(words))]
+
+    def add_name(self, sid: int, name: str) -> None:
+        name = normalise_name(name)
+        self._name_of[sid] = " " + name
+        for key in self._name_keys(name, sid):
+            bisect.insort(self._names, key)
+
+    def discard_name(self, sid: int) -> None:
+        name = self._name_of.pop(sid, None)
+        if name is None:
+            return
+        for key in self._name_keys(name[1:], sid):
+            i = bisect.bisect_left(self._names, key)
+            if i < len(self._names) and self._names[i] == key:
+                del self._names[i]
+
+    def add_marks(self, sid: int, overall: float, status: bool, subject_ids) -> None:
+        """Index the mark-dependent part (call again after every enrol/drop)."""
+        self._overall[sid] = round(overall * 100)
+        self._grades[self.policy.grade(overall)].add(sid)
+        self._status[bool(status)].add(sid)
+        for sub in subject_ids:
+            self._subjects.setdefault(int(sub), set()).add(sid)
+
+    def discard_marks(self, sid: int, overall: float, status: bool, subject_ids) -> None:
+        """Take out what add_marks() put in (same values)."""
+        self._grades[self.policy.grade(overall)].discard(sid)
+        self._status[bool(status)].discard(sid)
+        for sub in subject_ids:
+            holders = self._subjects.get(int(sub))
+            if holders is not None:
+                holders.discard(sid)
+                if not holders:
+                    del self._subjects[int(sub)]
+
+    def add_student(self, student) -> None:
+        self.add_name(student._id, student.name)
+        self.add_student_marks(student)
+
+    def discard_student(self, student) -> None:
+        self.discard_student_marks(student)
+        self.discard_name(student._id)
+
+    def add_student_marks(self, student) -> None:
+        self.add_marks(student._id, student.overall, student.status, [s.id for s in student.subjects])
+
+    def discard_student_marks(self, student) -> None:
+        self.discard_marks(student._id, student.overall, student.status, [s.id for s in student.subjects])
+
+    def build(self, records) -> None:
+        """Fill an empty index from plain record dicts (one sort for the names)."""
+        names = self._names
+        for rec in records:
+            sid = int(rec["id"])
+            name = normalise_name(rec["name"])
+            self._name_of[sid] = " " + name
+            names.extend(self._name_keys(name, sid))
+            self.add_marks(sid, float(rec.get("overall", 0)), bool(rec.get("status", False)),
+                           [sub["id"] for sub in rec.get("subjects", [])])
+        names.sort()
+
+    def overall_rows(self):
+        """(overall, id) of every indexed student (to build a RankingIndex in the same pass)."""
+        overall = self._overall
+        for sid in self._name_of:
+            yield overall[sid] / 100, sid
+
+    # -----------------------------
+    # searching
+    # -----------------------------
+    def _name_range(self, prefix: str) -> tuple[int, int]:
+        names = self._names
+        return bisect.bisect_left(names, prefix), bisect.bisect_left(names, prefix + "\uffff")
+
+    def _name_ids(self, prefix: str):
+        lo, hi = self._name_range(prefix)
+        names = self._names
+        return {int(names[i][-6:]) for i in range(lo, hi)}
+
+    def plan(self, ranking, name_prefix=None, grade=None, status=None,
+             mark_between=None, enrolled_in=None) -> list[tuple[str, int]]:
+        """
+        [(condition, students it matches)] for the given conditions, most selective
+        first. (A name prefix counts keys, so a student matching two words counts twice.)
+        """
+        steps = []
+        if name_prefix is not None:
+            lo, hi = self._name_range(normalise_name(name_prefix))
+            steps.append(("name_prefix", hi - lo))
+        if grade is not None:
+            steps.append(("grade", len(self._grades.get(grade, ()))))
+        if status is not None:
+            steps.append(("status", len(self._status[status])))
+        if mark_between is not None:
+            steps.append(("mark_between", ranking.count_between(*mark_between)))
+        if enrolled_in is not None:
+            steps.append(("enrolled_in", len(self._subjects.get(enrolled_in, ()))))
+        steps.sort(key=lambda step: step[1])
+        return steps
+
+    def search(self, ranking, name_prefix=None, grade=None, status=None,
+               mark_between=None, enrolled_in=None) -> tuple[list[int], str]:
+        """
+        (sorted matching ids, condition used to find the candidates).
+        grade: "Z".."HD", status: bool, mark_between: (low, high), enrolled_in: int.
+        No condition at all matches every student.
+        """
+        if name_prefix is not None:
+            name_prefix = normalise_name(name_prefix)
+        steps = self.plan(ranking, name_prefix, grade, status, mark_between, enrolled_in)
+        if not steps:
+            return sorted(self._name_of), "all"
+        driver = steps[0][0]
+
+        # candidates from the most selective index
+        if driver == "name_prefix":
+            candidates = self._name_ids(name_prefix)
+        elif driver == "grade":
+            candidates = self._grades.get(grade, set())
+        elif driver == "status":
+            candidates = self._status[status]
+        elif driver == "mark_between":
+            candidates = set(ranking.ids_between(*mark_between))
+        else:
+            candidates = self._subjects.get(enrolled_in, set())
+
+        # every other condition checked on the candidates only. Set conditions (and a
+        # mark range not much bigger than the candidates) by intersection, which runs
+        # in C; what is left one candidate at a time.
+        rest = dict(steps[1:])
+        if "grade" in rest:
+            candidates = candidates & self._grades.get(grade, set())
+        if "status" in rest:
+            candidates = candidates & self._status[status]
+        if "enrolled_in" in rest:
+            candidates = candidates & self._subjects.get(enrolled_in, set())
+        if "mark_between" in rest and rest["mark_between"] <= 4 * len(candidates):
+            candidates = candidates.intersection(ranking.ids_between(*mark_between))
+            del rest["mark_between"]
+        matches = list(candidates)
+        if "mark_between" in rest:
+            low, high = cents_range(*mark_between)
+            overall = self._overall
+            matches = [sid for sid in matches if low <= overall[sid] <= high]
+        if "name_prefix" in rest:
+            needle, name_of = " " + name_prefix, self._name_of
+            matches = [sid for sid in matches if needle in name_of[sid]]
+        matches.sort()
+        return matches, driver
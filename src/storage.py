@@ -0,0 +1,1034 @@
+"""
+storage.py
+----------
+Storage back ends used by classes.Database.
+
+Database only deals with Student objects; a storage only deals with plain
+student dicts (the same shape as Student.to_dict()). That keeps the two
+layers independent, so the file format can change without touching the
+CLI/GUI code.
+
+Back ends:
+1) JsonFileStorage:  the original 'students.data' JSON list, optionally with
+                     an append-only journal next to it
+2) SqliteStorage:    stdlib sqlite3 database, one row per student and per
+                     subject, only the rows of a changed student are rewritten
+3) BinaryRecordStorage: fixed-width records in an mmap-ed file, slot number =
+                     student id, a change rewrites only that student's record
+4) ShardedStorage:   students split over N JSON shard files by id, a change
+                     rewrites only its shard, shards are loaded in parallel
+
+open_storage(location) picks the back end from the file extension.
+
+Several processes (CLI, GUI, API server) may share one data file. Each back
+end therefore has:
+- lock()     an advisory lock on '<file>.lock' (exclusive for writers,
+             shared for readers), held around read-modify-write
+- version()  a cheap token that changes whenever any process writes, so a
+             Database only reloads when someone else actually changed the data
+"""
+
+import contextlib
+import json
+import mmap
+import os
+import re
+import sqlite3
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import grading
+import metrics
+
+try:
+    import fcntl                # POSIX
+except ImportError:             # pragma: no cover - Windows
+    fcntl = None
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+
+
+# ---------------------------------------------------------------------
+# Cross-process lock + write counter
+
+class FileLock:
+    """
+    Advisory lock on a small '<data file>.lock' file.
+
+    - re-entrant: a Database holding the write lock can reload (which asks for
+      the shared lock) without deadlocking itself
+    - threads of the same process are serialised with an RLock first
+    - the lock file also holds a write counter (bumped by every writer), which
+      is part of the storage version()
+    Without fcntl/msvcrt the lock is process-local only.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+
+    @contextlib.contextmanager
+    def hold(self, shared: bool = False):
+        with self._thread_lock:
+            if self._depth:             # already held by us: just nest
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+                return
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                self._acquire(fd, shared)
+                self._depth = 1
+                try:
+                    yield
+                finally:
+                    self._depth = 0
+                    self._release(fd)
+            finally:
+                os.close(fd)
+
+    @staticmethod
+    def _acquire(fd: int, shared: bool) -> None:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        elif msvcrt is not None:        # no shared locks on Windows: always exclusive
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+
+    @staticmethod
+    def _release(fd: int) -> None:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        elif msvcrt is not None:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+    def counter(self) -> int:
+        """Current write counter (0 if the lock file does not exist yet)."""
+        try:
+            with open(self.path, "rb") as f:
+                return int(f.read(32).strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def bump(self) -> None:
+        """Increase the write counter. Call while holding the exclusive lock."""
+        value = str(self.counter() + 1).encode()
+        with open(self.path, "r+b") as f:
+            f.write(value)
+            f.truncate()
+
+
+def _fsync_dir(path: str) -> None:
+    """Make a rename inside path's folder durable (POSIX; no-op where unsupported)."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _stat_token(path: str) -> tuple | None:
+    """(mtime_ns, size, inode) of a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+# ---------------------------------------------------------------------
+# Interface
+
+class Storage:
+    """
+    What Database needs from a storage:
+      - load()              -> iterable of student dicts, in insertion order
+                               (may be a generator that streams the file)
+      - load_lazy()         -> iterable of (id, email, record) where record is
+                               a dict or a raw form (JSON text, binary record)
+      - decode(record)      raw record from load_lazy() -> student dict
+      - validate(record)    raise ValueError if this back end cannot store it
+      - save_all(records)   write every student (full snapshot)
+      - put(record)         add or replace ONE student     (incremental only)
+      - put_many(records)   add or replace several students in one write
+      - delete(student_id)  remove ONE student             (incremental only)
+      - needs_compaction()  True when the caller should call save_all()
+      - lock(shared)        context manager: cross-process lock for read-modify-write
+      - version()           token that changes when anybody writes (None = unknown)
+      - mark_written()      tell other processes we wrote (call under lock())
+      - load_policy() / save_policy(policy)
+                            the grade policy the stored grades were worked out
+                            with ('<data>.policy', next to the lock file)
+      - close()
+
+    'incremental' tells Database whether put()/delete() can be used. If it is
+    False, Database falls back to save_all() after every change.
+    """
+    incremental = False
+    policy_file: str | None = None      # set by every back end: '<data file or folder>.policy'
+
+    def load(self):
+        raise NotImplementedError
+
+    def load_lazy(self):
+        for rec in self.load():
+            yield rec["id"], rec["email"], rec
+
+    def decode(self, record) -> dict:
+        """Turn a record from load_lazy() into a dict (JSON text is parsed here)."""
+        return json.loads(record) if isinstance(record, str) else record
+
+    def validate(self, record: dict) -> None:
+        pass
+
+    def save_all(self, records: list[dict]) -> None:
+        raise NotImplementedError
+
+    def put(self, record: dict) -> None:
+        raise NotImplementedError
+
+    def put_many(self, records: list[dict]) -> None:
+        for rec in records:
+            self.put(rec)
+
+    def delete(self, student_id: str) -> None:
+        raise NotImplementedError
+
+    def needs_compaction(self) -> bool:
+        return False
+
+    def lock(self, shared: bool = False):
+        return contextlib.nullcontext()
+
+    def version(self):
+        return None
+
+    def mark_written(self) -> None:
+        pass
+
+    def load_policy(self) -> dict | None:
+        """The grade policy saved with the data (Database.regrade), or None if there is none."""
+        if self.policy_file is None:
+            return None
+        try:
+            with open(self.policy_file, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save_policy(self, policy: dict) -> None:
+        """Save the grade policy next to the data (temp file + fsync + rename). Call under lock()."""
+        if self.policy_file is None:
+            return
+        tmp = self.policy_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(policy, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.policy_file)
+        _fsync_dir(self.policy_file)
+
+    def close(self) -> None:
+        pass
+
+
+# ---------------------------------------------------------------------
+# 1) JSON file (+ optional journal)
+
+class JsonFileStorage(Storage):
+    """
+    Students as one JSON list in 'students.data'.
+
+    Journal mode: each put/delete appends ONE small line to
+    'students.data.journal' (fsynced before it returns). load() reads the snapshot then replays the
+    journal; save_all() writes a fresh snapshot (temp file + fsync + rename,
+    so it is never left half-written) and empties the journal.
+
+    load() is a generator: the snapshot is parsed one student at a time
+    (iter_json_array), so the whole file is never held as one big list.
+    """
+    JOURNAL_SUFFIX = ".journal"
+    COMPACT_AT = 10_000     # ask for a snapshot after this many journal records
+
+    def __init__(self, file_name: str = "students.data", journal: bool = False):
+        self.file_name = file_name
+        self.journal = journal
+        self.journal_file = file_name + self.JOURNAL_SUFFIX
+        self.incremental = journal
+        self._journal_len = 0
+        self._lock = FileLock(file_name + ".lock")
+        self.policy_file = file_name + ".policy"
+
+    def load(self):
+        """Yield snapshot students (with journal changes applied), then journal-only ones."""
+        for _sid, _email, rec in self._stream(with_text=False):
+            yield rec
+
+    def load_lazy(self):
+        """Like load(), but snapshot records come back as their (compact) JSON text."""
+        return self._stream(with_text=True)
+
+    def _stream(self, with_text: bool):
+        overrides, cleared = self._read_journal()
+        if not cleared:
+            try:
+                f = open(self.file_name, "r", encoding="utf-8")
+            except FileNotFoundError:
+                f = None
+            if f is not None:
+                with f:
+                    for item in iter_json_array(f, with_text=with_text):
+                        rec, keep = item if with_text else (item, item)
+                        sid = f"{int(rec['id']):06d}"
+                        if sid in overrides:
+                            keep = overrides.pop(sid)
+                            if keep is None:
+                                continue    # deleted in the journal
+                        yield sid, rec["email"], keep
+        # students added by the journal only
+        for sid, rec in overrides.items():
+            if rec is not None:
+                yield sid, rec["email"], rec
+
+    @metrics.timed("storage.save_all")
+    def save_all(self, records: list[dict]) -> None:
+        # one student per line: still a normal JSON list, but written with the
+        # fast C encoder (indent=4 forces the slow pure-Python one)
+        # atomic: write a temp file, fsync it, then rename over the snapshot, so a
+        # crash leaves either the old or the new file, never a torn one
+        tmp = self.file_name + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("[")
+            for i, rec in enumerate(records):
+                f.write(",\n    " if i else "\n    ")
+                f.write(json.dumps(rec))
+            f.write("\n]" if records else "]")
+            if metrics.ENABLED:
+                metrics.add("storage.bytes_written", f.tell())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.file_name)
+        _fsync_dir(self.file_name)
+        metrics.add("storage.saves")
+        metrics.add("storage.records_written", len(records))
+        self._truncate_journal()
+
+    def put(self, record: dict) -> None:
+        self._append_journal({"op": "put", "student": record})
+
+    def put_many(self, records: list[dict]) -> None:
+        self._append_journal(*({"op": "put", "student": rec} for rec in records))
+
+    def delete(self, student_id: str) -> None:
+        self._append_journal({"op": "del", "id": student_id})
+
+    def needs_compaction(self) -> bool:
+        return self._journal_len >= self.COMPACT_AT
+
+    def lock(self, shared: bool = False):
+        return self._lock.hold(shared)
+
+    def version(self):
+        """Write counter + stat of snapshot and journal (also catches writers without the lock)."""
+        return self._lock.counter(), _stat_token(self.file_name), _stat_token(self.journal_file)
+
+    def mark_written(self) -> None:
+        self._lock.bump()
+
+    # -----------------------------
+    # journal helpers
+    # -----------------------------
+    def _read_journal(self) -> tuple[dict, bool]:
+        """
+        Fold the journal into {id: latest student dict, or None if deleted}.
+        Records (one JSON object per line):
+          {"op": "put", "student": {...}}   add or replace one student
+          {"op": "del", "id": "000123"}     remove one student
+          {"op": "clear"}                   remove everybody
+        Returns (overrides, cleared); cleared=True means ignore the snapshot.
+        A half-written last line (crash during append) is ignored.
+        """
+        self._journal_len = 0
+        overrides: dict[str, dict | None] = {}
+        cleared = False
+        try:
+            f = open(self.journal_file, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return overrides, cleared
+
+        with f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    break   # torn tail
+                op = rec.get("op")
+                if op == "put":
+                    stu = rec["student"]
+                    sid = f"{int(stu['id']):06d}"
+                    if sid in overrides and overrides[sid] is None:
+                        del overrides[sid]      # re-added after a delete: goes to the end
+                    overrides[sid] = stu
+                elif op == "del":
+                    overrides[f"{int(rec['id']):06d}"] = None
+                elif op == "clear":
+                    overrides.clear()
+                    cleared = True
+                self._journal_len += 1
+        return overrides, cleared
+
+    @metrics.timed("storage.journal_append")
+    def _append_journal(self, *records: dict) -> None:
+        """
+        Append records as lines with ONE write call, then fsync: once this returns the
+        change is on disk, the same promise save_all() gives for a snapshot. (In group /
+        exit durability Database appends a whole batch at once, so it is one fsync per flush.)
+        """
+        lines = "".join(json.dumps(rec, separators=(",", ":")) + "\n" for rec in records)
+        created = not os.path.exists(self.journal_file)
+        with open(self.journal_file, "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        if created:
+            _fsync_dir(self.journal_file)
+        self._journal_len += len(records)
+        metrics.add("storage.journal_appends")
+        metrics.add("storage.records_written", len(records))
+        if metrics.ENABLED:
+            metrics.add("storage.bytes_written", len(lines.encode("utf-8")))
+
+    def _truncate_journal(self) -> None:
+        """Empty the journal after a full snapshot was written."""
+        if os.path.exists(self.journal_file):
+            open(self.journal_file, "w", encoding="utf-8").close()
+        self._journal_len = 0
+
+
+_SKIP = re.compile(r"[\s,]*")
+
+
+def iter_json_array(f, chunk_size: int = 1 << 16, with_text: bool = False):
+    """
+    Yield the items of a top-level JSON list one by one, reading the file in
+    chunks. Memory use is one chunk plus one item, whatever the file size.
+    with_text=True yields (item, source text of the item) instead.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+    started = False
+
+    while True:
+        pos = _SKIP.match(buf, pos).end() if started else len(buf) - len(buf[pos:].lstrip())
+        if pos < len(buf):
+            if not started:
+                if buf[pos] != "[":
+                    raise ValueError("Expecting a JSON list")
+                started = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                if eof:
+                    raise
+            else:
+                yield (item, buf[pos:end]) if with_text else item
+                pos = end
+                continue
+        elif eof:
+            raise ValueError("Unexpected end of JSON list")
+        # item cut by the chunk edge (or buffer used up): keep the tail, read more
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buf = buf[pos:] + chunk
+        pos = 0
+
+
+# ---------------------------------------------------------------------
+# 2) SQLite
+
+# One connection per database file per process, shared by every SqliteStorage.
+_connections: dict[str, sqlite3.Connection] = {}
+_locks: dict[str, threading.Lock] = {}       # one lock per shared connection
+_connections_lock = threading.Lock()
+
+
+def _shared_connection(path: str) -> tuple[sqlite3.Connection, threading.Lock]:
+    """Open (once) and return the process-wide connection for this file."""
+    key = os.path.abspath(path)
+    with _connections_lock:
+        conn = _connections.get(key)
+        if conn is None:
+            # isolation_level=None: we issue BEGIN/COMMIT ourselves
+            conn = sqlite3.connect(key, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.executescript(SqliteStorage.SCHEMA)
+            _connections[key] = conn
+            _locks[key] = threading.Lock()
+        return conn, _locks[key]
+
+
+class SqliteStorage(Storage):
+    """
+    Students and subjects as indexed rows in an SQLite file (WAL mode).
+
+    A put() deletes and re-inserts only that student's rows, so the cost of a
+    change does not depend on the number of students. All SQL below is
+    constant text with '?' parameters, so sqlite3's statement cache reuses
+    the prepared statements.
+    """
+    incremental = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS students (
+            id       TEXT PRIMARY KEY,
+            email    TEXT NOT NULL UNIQUE,
+            password TEXT NOT NULL,
+            name     TEXT NOT NULL,
+            overall  REAL NOT NULL DEFAULT 0,
+            status   INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS subjects (
+            student_id TEXT NOT NULL REFERENCES students(id) ON DELETE CASCADE,
+            pos        INTEGER NOT NULL,
+            id         TEXT NOT NULL,
+            mark       INTEGER NOT NULL,
+            grade      TEXT NOT NULL,
+            PRIMARY KEY (student_id, pos)
+        );
+    """
+
+    _UPSERT_STUDENT = (
+        "INSERT INTO students (id, email, password, name, overall, status) "
+        "VALUES (?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(id) DO UPDATE SET email=excluded.email, password=excluded.password, "
+        "name=excluded.name, overall=excluded.overall, status=excluded.status"
+    )
+    _INSERT_SUBJECT = "INSERT INTO subjects (student_id, pos, id, mark, grade) VALUES (?, ?, ?, ?, ?)"
+    _DELETE_SUBJECTS = "DELETE FROM subjects WHERE student_id = ?"
+    _DELETE_STUDENT = "DELETE FROM students WHERE id = ?"
+
+    def __init__(self, path: str = "students.db"):
+        self.path = path
+        self.conn, self._lock = _shared_connection(path)
+        self._file_lock = FileLock(path + ".lock")
+        self.policy_file = path + ".policy"
+
+    def lock(self, shared: bool = False):
+        return self._file_lock.hold(shared)
+
+    def version(self):
+        """Write counter + SQLite data_version (changes when another connection commits)."""
+        with self._lock:
+            data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        return self._file_lock.counter(), data_version
+
+    def mark_written(self) -> None:
+        self._file_lock.bump()
+
+    def load(self) -> list[dict]:
+        with self._lock:
+            students = {}
+            for sid, email, password, name, overall, status in self.conn.execute(
+                    "SELECT id, email, password, name, overall, status FROM students ORDER BY rowid"):
+                students[sid] = {"email": email, "password": password, "name": name,
+                                 "subjects": [], "id": sid, "overall": overall,
+                                 "status": bool(status)}
+            for student_id, sub_id, mark, grade in self.conn.execute(
+                    "SELECT student_id, id, mark, grade FROM subjects ORDER BY student_id, pos"):
+                if student_id in students:
+                    students[student_id]["subjects"].append({"id": sub_id, "mark": mark, "grade": grade})
+        return list(students.values())
+
+    @metrics.timed("storage.save_all")
+    def save_all(self, records: list[dict]) -> None:
+        with self._lock, self._transaction():
+            self.conn.execute("DELETE FROM subjects")
+            self.conn.execute("DELETE FROM students")
+            for rec in records:
+                self._write_one(rec)
+        metrics.add("storage.saves")
+        metrics.add("storage.records_written", len(records))
+
+    def put(self, record: dict) -> None:
+        self.put_many([record])
+
+    @metrics.timed("storage.put_many")
+    def put_many(self, records: list[dict]) -> None:
+        with self._lock, self._transaction():
+            for record in records:
+                self.conn.execute(self._DELETE_SUBJECTS, (record["id"],))
+                self._write_one(record)
+        metrics.add("storage.records_written", len(records))
+
+    def delete(self, student_id: str) -> None:
+        with self._lock, self._transaction():
+            self.conn.execute(self._DELETE_STUDENT, (student_id,))
+
+    def close(self) -> None:
+        """Connections are shared per process, so only checkpoint the WAL here."""
+        with self._lock:
+            self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    # -----------------------------
+    # helpers
+    # -----------------------------
+    def _write_one(self, rec: dict) -> None:
+        self.conn.execute(self._UPSERT_STUDENT, (
+            rec["id"], rec["email"], rec["password"], rec["name"],
+            float(rec.get("overall", 0)), int(bool(rec.get("status", False)))))
+        self.conn.executemany(self._INSERT_SUBJECT, [
+            (rec["id"], pos, s["id"], s["mark"], s["grade"])
+            for pos, s in enumerate(rec.get("subjects", []))])
+
+    def _transaction(self):
+        return _Transaction(self.conn)
+
+
+class _Transaction:
+    """BEGIN ... COMMIT, or ROLLBACK if the block raised."""
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN")
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+# ---------------------------------------------------------------------
+# 3) Fixed-width binary records (mmap)
+
+class BinaryRecordStorage(Storage):
+    """
+    One fixed-size record per student in a binary file; the slot number IS the
+    student id, so student 000123 always lives at DATA_AT + 123 * RECORD_SIZE.
+
+    File: header (magic) | used map (one byte per possible id) | records
+
+    The file is mmap-ed:
+    - a lookup by id reads one record (no parsing of anything else)
+    - put()/delete() overwrite only that record (and its used byte) in place
+      and msync those pages
+    - load_lazy() scans the 1 MB used map (bytes.find), then hands each used
+      record to Database as raw bytes (decoded on access)
+    - save_all() writes a new file (temp + fsync + rename), like the JSON back end
+    Slots without a student are never written, so the file stays sparse.
+
+    Record layout (little endian, RECORD_SIZE bytes, rest zero):
+      used u8, subject count u8, status u8, pad, id u32, overall f64,
+      subject ids 4 x u16, marks 4 x i16, email 88s, name 80s, password 52s
+    Text is UTF-8, zero padded; anything longer raises ValueError.
+    Students are loaded in id order (not insertion order).
+    """
+    incremental = True
+
+    MAGIC = b"STUREC01"
+    HEADER = 64
+    MAX_SLOTS = 1_000_000       # ids 0..999999
+    USED_AT = HEADER            # used map: byte i = 1 if slot i holds a student
+    DATA_AT = 1_003_520         # first record (page aligned, after the used map)
+    RECORD = struct.Struct("<BBBxId4H4h88s80s52s")
+    RECORD_SIZE = 256
+    GROW = 4096                 # slots added when the file has to grow
+    _EMAIL_AT = struct.calcsize("<BBBxId4H4h")     # offset of the email field inside a record
+    _EMAIL_LEN = 88
+
+    def __init__(self, path: str = "students.bin"):
+        self.path = path
+        self._file_lock = FileLock(path + ".lock")
+        self.policy_file = path + ".policy"
+        self._io = threading.RLock()
+        self._f = None
+        self._mm: mmap.mmap | None = None
+        self._ident = None
+        self._sync_mapping()
+
+    # -----------------------------
+    # mapping
+    # -----------------------------
+    def _sync_mapping(self) -> None:
+        """(Re)map the file if it was replaced (save_all) or resized by another process."""
+        with self._io:
+            if not os.path.exists(self.path):
+                with open(self.path, "wb") as f:
+                    f.write(self.MAGIC.ljust(self.HEADER, b"\0"))
+                    f.truncate(self.DATA_AT)
+            st = os.stat(self.path)
+            if self._mm is not None and (st.st_ino, st.st_dev) == self._ident \
+                    and st.st_size == len(self._mm):
+                return
+            self._close_mapping()
+            self._f = open(self.path, "r+b")
+            self._mm = mmap.mmap(self._f.fileno(), 0)
+            self._ident = (st.st_ino, st.st_dev)
+            if self._mm[:len(self.MAGIC)] != self.MAGIC:
+                self._close_mapping()
+                raise ValueError(f"{self.path} is not a student record file")
+
+    def _close_mapping(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._f.close()
+        self._mm = self._f = self._ident = None
+
+    def _slots(self) -> int:
+        return (len(self._mm) - self.DATA_AT) // self.RECORD_SIZE
+
+    def _ensure_slot(self, slot: int) -> None:
+        """Grow the file (and mapping) so the slot exists; never shrinks another process's growth."""
+        if slot < self._slots():
+            return
+        want = -(-(slot + 1) // self.GROW) * self.GROW
+        size = max(os.fstat(self._f.fileno()).st_size, self.DATA_AT + want * self.RECORD_SIZE)
+        self._f.truncate(size)          # sparse on most file systems
+        self._mm.close()
+        self._mm = mmap.mmap(self._f.fileno(), 0)
+
+    def _msync(self, offset: int, length: int) -> None:
+        start = offset - offset % mmap.ALLOCATIONGRANULARITY
+        self._mm.flush(start, offset + length - start)
+
+    # -----------------------------
+    # records <> dicts
+    # -----------------------------
+    def _text(self, value: str, size: int, field: str) -> bytes:
+        data = value.encode("utf-8")
+        if len(data) > size:
+            raise ValueError(f"{field} longer than {size} bytes cannot be stored in {self.path}")
+        return data
+
+    def encode(self, rec: dict) -> bytes:
+        subjects = rec.get("subjects", [])
+        if len(subjects) > 4:
+            raise ValueError("at most 4 subjects fit in a binary record")
+        ids = [int(s["id"]) for s in subjects] + [0] * (4 - len(subjects))
+        marks = [int(s["mark"]) for s in subjects] + [0] * (4 - len(subjects))
+        packed = self.RECORD.pack(
+            1, len(subjects), bool(rec.get("status", False)), int(rec["id"]),
+            float(rec.get("overall", 0)), *ids, *marks,
+            self._text(rec["email"], self._EMAIL_LEN, "email"),
+            self._text(rec["name"], 80, "name"),
+            self._text(rec["password"], 52, "password"))
+        return packed.ljust(self.RECORD_SIZE, b"\0")
+
+    def validate(self, record: dict) -> None:
+        self.encode(record)
+
+    def decode(self, record) -> dict:
+        if not isinstance(record, bytes):
+            return super().decode(record)
+        (_used, count, status, sid, overall, *rest) = self.RECORD.unpack_from(record)
+        ids, marks = rest[0:4], rest[4:8]
+        email, name, password = (b.rstrip(b"\0").decode("utf-8") for b in rest[8:11])
+        return {
+            "email": email,
+            "password": password,
+            "name": name,
+            "subjects": [{"id": f"{ids[i]:03d}", "mark": marks[i], "grade": grading.policy().grade(marks[i])}
+                         for i in range(count)],
+            "id": f"{sid:06d}",
+            "overall": overall,
+            "status": bool(status),
+        }
+
+    # -----------------------------
+    # Storage interface
+    # -----------------------------
+    def _used_slots(self):
+        """Slot numbers in use, from the used map."""
+        used = self._mm[self.USED_AT:self.USED_AT + min(self._slots(), self.MAX_SLOTS)]
+        slot = used.find(1)
+        while slot != -1:
+            yield slot
+            slot = used.find(1, slot + 1)
+
+    def load_lazy(self):
+        with self._io:
+            self._sync_mapping()
+            mm, size, at = self._mm, self.RECORD_SIZE, self._EMAIL_AT
+            for slot in self._used_slots():
+                off = self.DATA_AT + slot * size
+                raw = mm[off:off + size]
+                yield f"{slot:06d}", raw[at:at + self._EMAIL_LEN].rstrip(b"\0").decode("utf-8"), raw
+
+    def load(self):
+        for _sid, _email, raw in self.load_lazy():
+            yield self.decode(raw)
+
+    def get(self, student_id: str) -> dict | None:
+        """One student straight from its slot (nothing else is read)."""
+        with self._io:
+            self._sync_mapping()
+            slot = int(student_id)
+            if slot >= self._slots():
+                return None
+            off = self.DATA_AT + slot * self.RECORD_SIZE
+            raw = self._mm[off:off + self.RECORD_SIZE]
+            return self.decode(raw) if raw[0] else None
+
+    @metrics.timed("storage.save_all")
+    def save_all(self, records: list[dict]) -> None:
+        tmp = self.path + ".tmp"
+        top = max((int(r["id"]) for r in records), default=0)
+        slots = -(-(top + 1) // self.GROW) * self.GROW
+        used = bytearray(self.MAX_SLOTS)
+        with open(tmp, "wb") as f:
+            f.write(self.MAGIC.ljust(self.HEADER, b"\0"))
+            f.truncate(self.DATA_AT + slots * self.RECORD_SIZE)
+            for rec in records:
+                slot = int(rec["id"])
+                f.seek(self.DATA_AT + slot * self.RECORD_SIZE)
+                f.write(self.encode(rec))
+                used[slot] = 1
+            f.seek(self.USED_AT)
+            f.write(used)
+            f.flush()
+            os.fsync(f.fileno())
+        with self._io:
+            self._close_mapping()
+            os.replace(tmp, self.path)
+            _fsync_dir(self.path)
+            self._sync_mapping()
+        metrics.add("storage.saves")
+        metrics.add("storage.records_written", len(records))
+        metrics.add("storage.bytes_written", len(records) * self.RECORD_SIZE)
+
+    def put(self, record: dict) -> None:
+        self.put_many([record])
+
+    @metrics.timed("storage.put_many")
+    def put_many(self, records: list[dict]) -> None:
+        encoded = [(int(rec["id"]), self.encode(rec)) for rec in records]   # fail before writing
+        with self._io:
+            self._sync_mapping()
+            for slot, data in encoded:
+                self._ensure_slot(slot)
+                off = self.DATA_AT + slot * self.RECORD_SIZE
+                self._mm[off:off + self.RECORD_SIZE] = data
+                self._mm[self.USED_AT + slot] = 1
+                self._msync(off, self.RECORD_SIZE)
+                self._msync(self.USED_AT + slot, 1)
+        metrics.add("storage.records_written", len(records))
+        metrics.add("storage.bytes_written", len(records) * self.RECORD_SIZE)
+
+    def delete(self, student_id: str) -> None:
+        with self._io:
+            self._sync_mapping()
+            slot = int(student_id)
+            if slot < self._slots():
+                off = self.DATA_AT + slot * self.RECORD_SIZE
+                self._mm[self.USED_AT + slot] = 0
+                self._mm[off:off + self.RECORD_SIZE] = bytes(self.RECORD_SIZE)
+                self._msync(self.USED_AT + slot, 1)
+                self._msync(off, self.RECORD_SIZE)
+
+    def lock(self, shared: bool = False):
+        return self._file_lock.hold(shared)
+
+    def version(self):
+        """Write counter (in-place writes may not change the file's mtime) + file stat."""
+        return self._file_lock.counter(), _stat_token(self.path)
+
+    def mark_written(self) -> None:
+        self._file_lock.bump()
+
+    def close(self) -> None:
+        with self._io:
+            if self._mm is not None:
+                self._mm.flush()
+            self._close_mapping()
+
+
+# ---------------------------------------------------------------------
+# 4) Sharded JSON files
+
+class ShardedStorage(Storage):
+    """
+    Students spread over N JSON shard files in one folder ('students.shards/'):
+
+        students.shards/manifest.json        {"shards": N}
+        students.shards/shard-000.data ...   same format as students.data
+
+    A student lives in shard  int(id) % N.
+    - put/delete rewrite ONLY the shard(s) they touch (read that shard, change
+      it, write it back atomically), so a change costs O(students / N)
+      - with journal=True each shard keeps its own journal instead
+    - load reads all shards at the same time (thread pool, or a process pool
+      with pool="process" / STUDENTS_SHARD_POOL=process so the JSON parsing
+      runs on several CPUs); students come back shard by shard
+    - save_all (e.g. remove_all) writes every shard
+    The shard count is fixed when the folder is created (STUDENTS_SHARDS, default
+    8); change it offline with reshard.py.
+    """
+    MANIFEST = "manifest.json"
+    SHARDS_ENV = "STUDENTS_SHARDS"
+    POOL_ENV = "STUDENTS_SHARD_POOL"
+    DEFAULT_SHARDS = 8
+
+    def __init__(self, folder: str = "students.shards", journal: bool = False,
+                 shards: int | None = None, workers: int | None = None, pool: str | None = None):
+        self.folder = folder
+        self.journal = journal
+        self.incremental = True
+        self._file_lock = FileLock(folder.rstrip("/\\") + ".lock")
+        self.policy_file = folder.rstrip("/\\") + ".policy"
+        manifest = os.path.join(folder, self.MANIFEST)
+        if os.path.exists(manifest):
+            with open(manifest, encoding="utf-8") as f:
+                count = int(json.load(f)["shards"])
+        else:
+            count = shards or int(os.environ.get(self.SHARDS_ENV, self.DEFAULT_SHARDS))
+            if count < 1:
+                raise ValueError("shard count must be at least 1")
+            os.makedirs(folder, exist_ok=True)
+            with open(manifest, "w", encoding="utf-8") as f:
+                json.dump({"shards": count}, f)
+        self.count = count
+        self.workers = workers or min(count, (os.cpu_count() or 1) + 4)
+        self.pool = pool or os.environ.get(self.POOL_ENV, "thread")
+        if self.pool not in ("thread", "process"):
+            raise ValueError("pool must be 'thread' or 'process'")
+        self.shards = [JsonFileStorage(self.shard_path(i), journal=journal) for i in range(count)]
+
+    def shard_path(self, index: int) -> str:
+        return os.path.join(self.folder, f"shard-{index:03d}.data")
+
+    def shard_of(self, student_id) -> int:
+        return int(student_id) % self.count
+
+    def _split(self, records) -> dict[int, list[dict]]:
+        groups: dict[int, list[dict]] = {}
+        for rec in records:
+            groups.setdefault(self.shard_of(rec["id"]), []).append(rec)
+        return groups
+
+    def _each(self, fn, items) -> list:
+        """fn(item) for every item, on a thread pool (file I/O and C json overlap)."""
+        items = list(items)
+        if len(items) <= 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(items))) as pool:
+            return list(pool.map(fn, items))
+
+    # -----------------------------
+    # Storage interface
+    # -----------------------------
+    def load(self):
+        for _sid, _email, rec in self._load_shards(with_text=False):
+            yield rec
+
+    def load_lazy(self):
+        return self._load_shards(with_text=True)
+
+    def _load_shards(self, with_text: bool):
+        jobs = [(shard.file_name, self.journal, with_text) for shard in self.shards]
+        if self.pool == "process" and self.workers > 1 and len(jobs) > 1:
+            from concurrent.futures import ProcessPoolExecutor     # loads multiprocessing: only when used
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(jobs))) as pool:
+                parts = list(pool.map(_read_shard, jobs))
+        else:
+            parts = self._each(_read_shard, jobs)
+        for rows in parts:
+            yield from rows
+
+    @metrics.timed("storage.save_all")
+    def save_all(self, records: list[dict]) -> None:
+        groups = self._split(records)
+        self._each(lambda i: self.shards[i].save_all(groups.get(i, [])), range(self.count))
+
+    def put(self, record: dict) -> None:
+        self.put_many([record])
+
+    @metrics.timed("storage.put_many")
+    def put_many(self, records: list[dict]) -> None:
+        for index, group in self._split(records).items():
+            if self.journal:
+                self.shards[index].put_many(group)
+            else:
+                self._rewrite(index, {f"{int(r['id']):06d}": r for r in group}, set())
+
+    def delete(self, student_id: str) -> None:
+        index = self.shard_of(student_id)
+        if self.journal:
+            self.shards[index].delete(student_id)
+        else:
+            self._rewrite(index, {}, {f"{int(student_id):06d}"})
+
+    def _rewrite(self, index: int, puts: dict[str, dict], deletes: set[str]) -> None:
+        """Read one shard, apply the changes, write it back (the other shards are untouched)."""
+        shard = self.shards[index]
+        records = []
+        for rec in shard.load():
+            sid = f"{int(rec['id']):06d}"
+            if sid in deletes:
+                continue
+            records.append(puts.pop(sid, rec))
+        records.extend(puts.values())
+        shard.save_all(records)
+
+    def needs_compaction(self) -> bool:
+        return any(shard.needs_compaction() for shard in self.shards)
+
+    def lock(self, shared: bool = False):
+        return self._file_lock.hold(shared)
+
+    def version(self):
+        return (self._file_lock.counter(),
+                tuple(_stat_token(s.file_name) for s in self.shards),
+                tuple(_stat_token(s.journal_file) for s in self.shards) if self.journal else None)
+
+    def mark_written(self) -> None:
+        self._file_lock.bump()
+
+
+def _read_shard(job: tuple[str, bool, bool]) -> list[tuple]:
+    """(shard file, journal, with_text) -> [(id, email, record)]. Module level so a process pool can run it."""
+    path, journal, with_text = job
+    shard = JsonFileStorage(path, journal=journal)
+    if with_text:
+        return list(shard.load_lazy())
+    return [(rec["id"], rec["email"], rec) for rec in shard.load()]
+
+
+# ---------------------------------------------------------------------
+# Picking a back end
+
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+BINARY_EXTENSIONS = (".bin",)
+SHARDED_EXTENSIONS = (".shards",)
+
+
+def open_storage(location: str = "students.data", journal: bool = False) -> Storage:
+    """
+    Return the storage for a file name:
+      *.db / *.sqlite / *.sqlite3  -> SqliteStorage
+      *.bin                        -> BinaryRecordStorage
+      *.shards (a folder)          -> ShardedStorage (journal on/off per shard)
+      anything else                -> JsonFileStorage (journal on/off)
+    """
+    if location.lower().endswith(SQLITE_EXTENSIONS):
+        return SqliteStorage(location)
+    if location.lower().endswith(BINARY_EXTENSIONS):
+        return BinaryRecordStorage(location)
+    if location.lower().rstrip("/\\").endswith(SHARDED_EXTENSIONS):
+        return ShardedStorage(location.rstrip("/\\"), journal=journal)
+    return JsonFileStorage(location, journal=journal)